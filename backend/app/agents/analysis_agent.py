@@ -2,13 +2,27 @@
 """
 Analysis Agent with enhanced debugging
 """
-from typing import List, Any
+from typing import List, Any, Dict, Optional
 from datetime import datetime
+from collections import defaultdict
 import asyncio
+import math
 
 from agents.base_agent import BaseAgent
-from models import WorkflowState, Article, AnalyzedArticle
+from config import settings
+from database import db
+from models import (
+    WorkflowState,
+    Article,
+    AnalyzedArticle,
+    NewsletterConfig,
+    UserPreferences,
+)
 from tools.openai_client import OpenAIClient
+from tools.article_ranker import ArticleRanker
+from tools.relevance_model import RelevanceModel, ACCEPT, UNCERTAIN
+from tools.section_classifier import SectionClassifier
+from tools.analysis_cache import analysis_cache
 
 
 class AnalysisAgent(BaseAgent):
@@ -17,12 +31,37 @@ class AnalysisAgent(BaseAgent):
     def __init__(self):
         super().__init__("AnalysisAgent")
         self.openai_client = None
+        self.ranker = ArticleRanker()
+        self.relevance_model = None
+        self.section_classifier = None
+        self.stats = {
+            "runs": 0,
+            "llm_calls": 0,
+            "calls_saved": 0,
+            "calls_cancelled": 0,
+            "early_exits": 0,
+            "prefilter_accepted": 0,
+            "prefilter_rejected": 0,
+            "prefilter_accepts_deferred": 0,
+            "sections_local": 0,
+            "sections_llm": 0,
+        }
 
     async def initialize(self):
         """Initialize analysis agent resources"""
         await super().initialize()
         self.openai_client = OpenAIClient()
         await self.openai_client.initialize()
+
+        if settings.relevance_prefilter_enabled:
+            self.relevance_model = RelevanceModel()
+            await self.relevance_model.bootstrap(await db.get_article_analyses())
+
+        classifier = SectionClassifier()
+        if classifier.load(settings.section_classifier_path):
+            self.section_classifier = classifier
+            print(f"✅ Section classifier loaded ({len(classifier.classes)} sections)")
+
         print("✅ Analysis agent initialized")
 
     async def execute(
@@ -39,29 +78,27 @@ class AnalysisAgent(BaseAgent):
                 print("⚠️ No articles to analyze")
                 return []
 
-            analyzed_articles = []
-            failed_analyses = 0
+            # Never send more than the candidate budget to the LLM
+            articles = self.ranker.select_candidates(
+                articles,
+                workflow_state.user_preferences,
+                workflow_state.newsletter_config,
+            )
 
-            # Process articles in batches
-            batch_size = 5
-            for i in range(0, len(articles), batch_size):
-                batch = articles[i : i + batch_size]
-                print(
-                    f"📝 Processing batch {i//batch_size + 1}/{(len(articles) + batch_size - 1)//batch_size} ({len(batch)} articles)"
+            self.stats["runs"] += 1
+            if settings.adaptive_analysis and workflow_state.newsletter_config.sections:
+                analyzed_articles, failed_analyses = await self._analyze_adaptive(
+                    articles, workflow_state
+                )
+            else:
+                analyzed_articles, failed_analyses = await self._analyze_all(
+                    articles, workflow_state
                 )
-
-                batch_results = await self._process_batch(batch, workflow_state)
-
-                # Count successful vs failed
-                successful = len(batch_results)
-                failed = len(batch) - successful
-                failed_analyses += failed
-
-                analyzed_articles.extend(batch_results)
-                print(f"✅ Batch complete: {successful} successful, {failed} failed")
 
             print(f"📊 Analysis summary:")
-            print(f"   Total articles processed: {len(articles)}")
+            print(
+                f"   Total articles processed: {len(analyzed_articles) + failed_analyses}"
+            )
             print(f"   Successful analyses: {len(analyzed_articles)}")
             print(f"   Failed analyses: {failed_analyses}")
 
@@ -81,6 +118,20 @@ class AnalysisAgent(BaseAgent):
                 f"📊 Relevance filtering result: {len(relevant_articles)}/{len(analyzed_articles)} articles passed threshold"
             )
 
+            # Enforce max_articles on what reaches the newsletter
+            max_articles = workflow_state.newsletter_config.max_articles
+            if len(relevant_articles) > max_articles:
+                relevant_articles = sorted(
+                    relevant_articles,
+                    key=lambda x: (
+                        x.relevance_score * 0.4
+                        + x.personalization_score * 0.4
+                        + x.impact_score / 10 * 0.2
+                    ),
+                    reverse=True,
+                )[:max_articles]
+                print(f"✂️ Keeping top {max_articles} relevant articles")
+
             if not relevant_articles:
                 print("⚠️ No articles passed relevance threshold!")
                 print(
@@ -104,85 +155,277 @@ class AnalysisAgent(BaseAgent):
             print(f"   Traceback: {traceback.format_exc()}")
             raise
 
-    async def _process_batch(
+    async def _analyze_all(
         self, articles: List[Article], workflow_state: WorkflowState
-    ) -> List[AnalyzedArticle]:
-        """Process a batch of articles with debugging"""
+    ):
+        """Analyze every candidate in fixed-size batches"""
         analyzed_articles = []
+        failed_analyses = 0
 
-        for i, article in enumerate(articles, 1):
-            try:
-                print(f"   Analyzing {i}/{len(articles)}: {article.title[:50]}...")
-
-                # Analyze article using OpenAI
-                analysis_result = await self.openai_client.analyze_article(
-                    article,
-                    workflow_state.user_preferences,
-                    workflow_state.newsletter_config.sections,
-                )
+        batch_size = 5
+        for i in range(0, len(articles), batch_size):
+            batch = articles[i : i + batch_size]
+            print(
+                f"📝 Processing batch {i//batch_size + 1}/{(len(articles) + batch_size - 1)//batch_size} ({len(batch)} articles)"
+            )
 
-                print(
-                    f"   ✅ Analysis complete: relevance={analysis_result.get('relevance_score', 0):.2f}, section={analysis_result.get('best_section', 'Unknown')}"
-                )
+            batch_results = await self._process_batch(batch, workflow_state)
 
-                # Calculate personalization score
-                personal_score = await self._calculate_personalization_score(
-                    article, workflow_state.user_preferences
-                )
+            # Count successful vs failed
+            successful = len(batch_results)
+            failed = len(batch) - successful
+            failed_analyses += failed
+
+            analyzed_articles.extend(batch_results)
+            print(f"✅ Batch complete: {successful} successful, {failed} failed")
 
-                analyzed_article = AnalyzedArticle(
-                    article=article,
-                    relevance_score=analysis_result["relevance_score"],
-                    sentiment=analysis_result["sentiment"],
-                    impact_score=analysis_result["impact_score"],
-                    urgency_score=analysis_result["urgency_score"],
-                    assigned_section=analysis_result["best_section"],
-                    personalization_score=personal_score,
+        return analyzed_articles, failed_analyses
+
+    async def _analyze_adaptive(
+        self, articles: List[Article], workflow_state: WorkflowState
+    ):
+        """Analyze candidates in priority order until every section quota is met"""
+        config = workflow_state.newsletter_config
+        threshold = workflow_state.user_preferences.relevance_threshold
+        quotas = self._section_quotas(config)
+        filled: Dict[str, int] = defaultdict(int)
+        print(f"🎯 Adaptive analysis: section quotas {quotas}")
+
+        analyzed_articles = []
+        failed_analyses = 0
+        window = max(settings.analysis_batch_size, 1)
+        queue = list(articles)
+        pending = set()
+
+        def quotas_met() -> bool:
+            return all(filled[section] >= quota for section, quota in quotas.items())
+
+        while queue or pending:
+            while queue and len(pending) < window:
+                article = queue.pop(0)
+                pending.add(
+                    asyncio.create_task(self._analyze_article(article, workflow_state))
                 )
 
-                analyzed_articles.append(analyzed_article)
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                if result is None:
+                    failed_analyses += 1
+                    continue
+
+                analyzed_articles.append(result)
+                if result.relevance_score >= threshold:
+                    section = result.assigned_section
+                    if section not in quotas:
+                        # Same fallback the newsletter agent applies
+                        section = config.sections[0]
+                    filled[section] += 1
+
+            if quotas_met():
+                break
+
+        if pending or queue:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            self.stats["early_exits"] += 1
+            self.stats["calls_saved"] += len(queue)
+            self.stats["calls_cancelled"] += len(pending)
+            print(
+                f"⏹️ Early exit: all section quotas filled, {len(queue)} calls skipped, {len(pending)} in-flight calls cancelled"
+            )
+
+        return analyzed_articles, failed_analyses
 
-            except Exception as e:
-                print(f"   ❌ Failed to analyze article '{article.title[:30]}...': {e}")
-                continue
+    def _section_quotas(self, config) -> Dict[str, int]:
+        """Articles each section needs above threshold before analysis can stop"""
+        if not config.sections:
+            return {}
+        per_section = min(
+            math.ceil(config.max_articles / len(config.sections)),
+            settings.max_articles_per_section,
+        )
+        return {section: per_section for section in config.sections}
+
+    async def _process_batch(
+        self, articles: List[Article], workflow_state: WorkflowState
+    ) -> List[AnalyzedArticle]:
+        """Process a batch of articles with debugging"""
+        analyzed_articles = []
+
+        for i, article in enumerate(articles, 1):
+            print(f"   Analyzing {i}/{len(articles)}: {article.title[:50]}...")
+            analyzed_article = await self._analyze_article(article, workflow_state)
+            if analyzed_article:
+                analyzed_articles.append(analyzed_article)
 
         return analyzed_articles
 
-    async def _calculate_personalization_score(
-        self, article: Article, preferences
-    ) -> float:
-        """Calculate personalization score based on user preferences"""
-        score = 0.0
+    async def _analyze_article(
+        self, article: Article, workflow_state: WorkflowState
+    ) -> Optional[AnalyzedArticle]:
+        """Analyze a single article, returning None on failure"""
+        try:
+            shared = await self._shared_analysis(article, workflow_state)
+            print(
+                f"   ✅ Analysis complete: relevance={shared.get('relevance_score', 0):.2f}, section={shared.get('best_section', 'Unknown')}"
+            )
+            return await self._personalize(article, shared, workflow_state)
 
-        # Keyword matching
-        title_summary = (article.title + " " + article.summary).lower()
-        keyword_matches = sum(
-            1 for keyword in preferences.keywords if keyword.lower() in title_summary
-        )
-        keyword_score = (
-            min(keyword_matches / max(len(preferences.keywords), 1), 1.0)
-            if preferences.keywords
-            else 0.5
+        except Exception as e:
+            print(f"   ❌ Failed to analyze article '{article.title[:30]}...': {e}")
+            return None
+
+    async def _shared_analysis(
+        self,
+        article: Article,
+        workflow_state: WorkflowState,
+        relevance_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Article-level stage: identical for every user offered these sections.
+
+        relevance_only skips the section choice, so the result holds for any
+        section list.
+        """
+        sections = workflow_state.newsletter_config.sections
+        threshold = workflow_state.user_preferences.relevance_threshold
+        local_section = (
+            self.section_classifier.predict_article(article, sections)
+            if self.section_classifier and not relevance_only
+            else None
         )
+        need_section = local_section is None and not relevance_only
+
+        result = await analysis_cache.lookup(article, sections, need_section=False)
+        if (
+            result
+            and need_section
+            and "best_section" not in result
+            and result["relevance_score"] >= threshold
+        ):
+            # Relevance-only analysis (as pre-analysis stores): it settles
+            # articles below the threshold, but the rest need a section
+            result = None
+        if result is None:
+            result = self._prefilter(article, workflow_state, need_section)
+
+        if result is None:
+
+            async def call_llm(assign_section: bool) -> Dict[str, Any]:
+                self.stats["llm_calls"] += 1
+                return await self.openai_client.analyze_article(
+                    article, sections, assign_section=assign_section
+                )
 
-        # Source preference
-        source_score = 1.0 if article.source in preferences.preferred_sources else 0.5
-        if article.source in preferences.excluded_sources:
-            source_score = 0.0
+            result = await analysis_cache.analyze(
+                article, sections, call_llm, need_section
+            )
 
-        # Industry relevance
-        industry_matches = sum(
-            1
-            for industry in preferences.industry_focus
-            if industry.lower() in title_summary
+        if local_section:
+            result["best_section"] = local_section
+            self.stats["sections_local"] += 1
+        elif "best_section" in result:
+            self.stats["sections_llm"] += 1
+        else:
+            # Below the user's threshold (or pre-analysis): never reaches a section
+            result["best_section"] = sections[0] if sections else "General"
+        return result
+
+    async def preanalyze(
+        self, articles: List[Article], config: NewsletterConfig
+    ) -> int:
+        """Run the shared stage ahead of time so later newsletters hit the cache.
+
+        Only relevance is analyzed: a section choice would be cached for this
+        config's section list alone, and requests of other formats would pay
+        for a full call again.
+        """
+        workflow_state = WorkflowState(
+            workflow_id=f"preanalyze_{datetime.utcnow().timestamp()}",
+            user_id="preanalyze",
+            user_preferences=UserPreferences(user_id="preanalyze"),
+            newsletter_config=config,
+        )
+        semaphore = asyncio.Semaphore(settings.analysis_batch_size)
+
+        async def analyze(article: Article) -> bool:
+            async with semaphore:
+                try:
+                    await self._shared_analysis(
+                        article, workflow_state, relevance_only=True
+                    )
+                    return True
+                except Exception as e:
+                    self.logger.error(f"Pre-analysis failed for {article.url}: {e}")
+                    return False
+
+        results = await asyncio.gather(*[analyze(article) for article in articles])
+        return sum(results)
+
+    async def _personalize(
+        self, article: Article, shared: Dict[str, Any], workflow_state: WorkflowState
+    ) -> AnalyzedArticle:
+        """Per-user stage: cheap, local and never cached"""
+        personal_score = await self._calculate_personalization_score(
+            article, workflow_state.user_preferences
         )
-        industry_score = (
-            min(industry_matches / max(len(preferences.industry_focus), 1), 1.0)
-            if preferences.industry_focus
-            else 0.5
+
+        return AnalyzedArticle(
+            article=article,
+            relevance_score=shared["relevance_score"],
+            sentiment=shared["sentiment"],
+            impact_score=shared["impact_score"],
+            urgency_score=shared["urgency_score"],
+            assigned_section=shared["best_section"],
+            personalization_score=personal_score,
         )
 
-        # Combine scores
-        score = keyword_score * 0.4 + source_score * 0.3 + industry_score * 0.3
+    def _prefilter(
+        self, article: Article, workflow_state: WorkflowState, need_section: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Decide clear winners and losers locally, None if the LLM must decide.
+
+        Accepted articles reach the newsletter, so one whose section the
+        classifier could not pick goes to the LLM for it. Rejected articles
+        never reach a section.
+        """
+        if not self.relevance_model or not self.relevance_model.ready:
+            return None
+
+        threshold = workflow_state.user_preferences.relevance_threshold
+        band, score = self.relevance_model.decide(article, threshold)
+        if band == UNCERTAIN:
+            return None
+        if band == ACCEPT and need_section:
+            self.stats["prefilter_accepts_deferred"] += 1
+            return None
+
+        self.stats[f"prefilter_{band}ed"] += 1
+        return {
+            "relevance_score": score,
+            "sentiment": "neutral",
+            "impact_score": 5,
+            "urgency_score": 5,
+            "explanation": f"Local relevance prefilter: {band}",
+        }
 
-        return min(score, 1.0)
+    async def _calculate_personalization_score(
+        self, article: Article, preferences
+    ) -> float:
+        """Calculate personalization score based on user preferences"""
+        return self.ranker.personalization_score(article, preferences)
+
+    def get_status(self) -> dict:
+        """Get agent status including analysis call counters"""
+        status = super().get_status()
+        status["stats"] = dict(self.stats)
+        if self.openai_client:
+            status["openai"] = self.openai_client.get_stats()
+        status["shared_analysis_cache"] = analysis_cache.get_stats()
+        if self.relevance_model:
+            status["relevance_prefilter"] = self.relevance_model.get_stats()
+        return status
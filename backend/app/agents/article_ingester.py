@@ -0,0 +1,108 @@
+# File: app/agents/article_ingester.py
+"""
+Background ingester that keeps the shared article pool fresh
+"""
+from typing import Dict, Any, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+from config import settings
+from database import db
+from agents.orchestrator import orchestrator
+from models import UserPreferences, NewsletterConfig, NewsletterFormat
+from tools.article_pool import article_pool
+from utils.config_validator import ConfigValidator
+
+
+class ArticleIngester:
+    """Search, validate and pre-analyze articles for every known user at once"""
+
+    def __init__(self, orchestrator_instance):
+        self.orchestrator = orchestrator_instance
+        self.logger = logging.getLogger("ArticleIngester")
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def ingest_once(self) -> Dict[str, Any]:
+        """Run one ingestion pass over the merged topics of all users"""
+        started_at = datetime.utcnow()
+
+        if self.orchestrator.content_agent.status == "inactive":
+            await self.orchestrator.initialize()
+        content_agent = self.orchestrator.content_agent
+
+        format_type = NewsletterFormat(settings.article_pool_ingest_format)
+        config = NewsletterConfig(
+            format=format_type,
+            sections=list(ConfigValidator.FORMAT_SECTIONS[format_type]),
+        )
+        config.date_range = content_agent._calculate_date_range(format_type)
+
+        # Users without stored preferences get the default topics
+        users = await db.get_all_user_preferences() or [
+            UserPreferences(user_id="default")
+        ]
+        search_plan = content_agent.topic_planner.plan_batch(
+            [(user, config) for user in users]
+        )
+        articles = await content_agent.prefetch(search_plan)
+
+        unique_articles = await content_agent.content_processor.remove_duplicates(
+            articles
+        )
+        validated_articles = await content_agent.content_processor.validate_articles(
+            unique_articles, UserPreferences(user_id="default")
+        )
+
+        new_articles = await article_pool.add(validated_articles)
+        analyzed = await self.orchestrator.analysis_agent.preanalyze(
+            new_articles, config
+        )
+        pruned = await article_pool.prune()
+        article_pool.last_ingest = datetime.utcnow()
+
+        report = {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": (datetime.utcnow() - started_at).total_seconds(),
+            "users": len(users),
+            "searches": len(search_plan["searches"]),
+            "articles_found": len(articles),
+            "articles_new": len(new_articles),
+            "articles_analyzed": analyzed,
+            "articles_pruned": pruned,
+            "pool_size": len(article_pool.articles),
+        }
+        self.last_report = report
+        print(
+            f"📥 Ingestion complete: {len(new_articles)} new articles, pool size {report['pool_size']}"
+        )
+        return report
+
+    def start(self):
+        """Start the periodic ingestion loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+            print(
+                f"⏰ Article ingester started: every {settings.article_pool_ingest_interval}s"
+            )
+
+    async def stop(self):
+        """Stop the periodic ingestion loop"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_periodically(self):
+        while True:
+            try:
+                await self.ingest_once()
+            except Exception as e:
+                print(f"❌ Article ingestion failed: {e}")
+
+            await asyncio.sleep(settings.article_pool_ingest_interval)
+
+
+# Global article ingester instance
+article_ingester = ArticleIngester(orchestrator)
@@ -0,0 +1,173 @@
+# File: app/agents/batch_scheduler.py
+"""
+Batch scheduler that generates each distinct newsletter once per cohort
+"""
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from collections import OrderedDict
+import asyncio
+import logging
+
+from config import settings
+from database import db
+from agents.orchestrator import orchestrator
+from models import UserPreferences, NewsletterConfig, NewsletterFormat
+from tools.llm_calls import count_calls
+from utils.config_validator import ConfigValidator
+from utils.fingerprint import cohort_key, newsletter_fingerprint
+
+
+class BatchScheduler:
+    """Group users by canonical preferences + config and fan results out"""
+
+    def __init__(self, orchestrator_instance):
+        self.orchestrator = orchestrator_instance
+        self.logger = logging.getLogger("BatchScheduler")
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def group_cohorts(
+        self, users: List[UserPreferences], config: NewsletterConfig
+    ) -> "OrderedDict[str, List[UserPreferences]]":
+        """Group users that would receive an identical newsletter"""
+        cohorts: "OrderedDict[str, List[UserPreferences]]" = OrderedDict()
+        for preferences in users:
+            cohorts.setdefault(cohort_key(preferences, config), []).append(preferences)
+        return cohorts
+
+    async def run_batch(
+        self, user_ids: List[str], config: NewsletterConfig
+    ) -> Dict[str, Any]:
+        """Generate newsletters for all users, one workflow per cohort"""
+        started_at = datetime.utcnow()
+
+        if self.orchestrator.content_agent.status == "inactive":
+            await self.orchestrator.initialize()
+
+        users = []
+        for user_id in user_ids:
+            preferences = await db.get_user_preferences(user_id)
+            users.append(preferences or UserPreferences(user_id=user_id))
+
+        cohorts = self.group_cohorts(users, config)
+        print(
+            f"👥 Batch run: {len(users)} users in {len(cohorts)} cohorts (sizes: {[len(m) for m in cohorts.values()]})"
+        )
+
+        # Plan every cohort's searches up front and run each distinct one once
+        content_agent = self.orchestrator.content_agent
+        if not config.date_range:
+            config.date_range = content_agent._calculate_date_range(config.format)
+        search_plan = content_agent.topic_planner.plan_batch(
+            [(members[0], config) for members in cohorts.values()]
+        )
+        with count_calls() as prefetch:
+            await content_agent.prefetch(search_plan)
+
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        cohort_results = await asyncio.gather(
+            *[
+                self._run_cohort(key, members, config, semaphore)
+                for key, members in cohorts.items()
+            ]
+        )
+        # Counted per workflow, so API traffic running alongside is left out
+        calls_used = prefetch.calls + sum(
+            result["llm_calls"] for result in cohort_results
+        )
+
+        generated = sum(1 for result in cohort_results if result["status"] == "success")
+        calls_per_newsletter = calls_used / generated if generated else 0.0
+        delivered = sum(
+            result["size"] for result in cohort_results if result["status"] == "success"
+        )
+
+        report = {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": (datetime.utcnow() - started_at).total_seconds(),
+            "users": len(users),
+            "cohorts": len(cohorts),
+            "newsletters_generated": generated,
+            "newsletters_delivered": delivered,
+            "cohort_sizes": [result["size"] for result in cohort_results],
+            "searches_requested": search_plan["requested"],
+            "searches_planned": len(search_plan["searches"]),
+            "llm_calls": calls_used,
+            "prefetch_llm_calls": prefetch.calls,
+            # Every delivery beyond the first in a cohort would have cost a full run
+            "llm_calls_saved_estimate": round(
+                calls_per_newsletter * (delivered - generated)
+            ),
+            "cohort_results": cohort_results,
+        }
+        self.last_report = report
+        print(
+            f"✅ Batch complete: {generated} newsletters for {delivered} users, {calls_used} LLM calls (~{report['llm_calls_saved_estimate']} saved)"
+        )
+        return report
+
+    async def _run_cohort(
+        self,
+        key: str,
+        members: List[UserPreferences],
+        config: NewsletterConfig,
+        semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        """Generate once for the cohort and save a copy for every member"""
+        async with semaphore:
+            result = {
+                "cohort": key[:12],
+                "size": len(members),
+                "user_ids": [member.user_id for member in members],
+            }
+            with count_calls() as calls:
+                try:
+                    newsletter = await self.orchestrator.generate_newsletter(
+                        members[0], config.model_copy(deep=True)
+                    )
+                    for member in members:
+                        await db.save_newsletter(
+                            newsletter.model_copy(update={"user_id": member.user_id}),
+                            newsletter_fingerprint(member, config),
+                        )
+                    result["status"] = "success"
+                except Exception as e:
+                    self.logger.error(f"Cohort {key[:12]} failed: {e}")
+                    result["status"] = "failed"
+                    result["error"] = str(e)
+            result["llm_calls"] = calls.calls
+            return result
+
+    def start(self):
+        """Start the periodic batch loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+            print(
+                f"⏰ Batch scheduler started: {settings.batch_schedule_format} every {settings.batch_schedule_interval}s"
+            )
+
+    async def stop(self):
+        """Stop the periodic batch loop"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_periodically(self):
+        while True:
+            try:
+                format_type = NewsletterFormat(settings.batch_schedule_format)
+                users = await db.get_all_user_preferences()
+                config = NewsletterConfig(
+                    format=format_type,
+                    sections=list(ConfigValidator.FORMAT_SECTIONS[format_type]),
+                )
+                await self.run_batch([user.user_id for user in users], config)
+            except Exception as e:
+                print(f"❌ Scheduled batch run failed: {e}")
+
+            await asyncio.sleep(settings.batch_schedule_interval)
+
+
+# Global batch scheduler instance
+batch_scheduler = BatchScheduler(orchestrator)
@@ -4,14 +4,36 @@
 Content Agent - Handles data collection and validation - FIXED
 """
 
-from typing import List, Any
+from typing import List, Any, Dict, Tuple, Optional, AsyncIterator
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import asyncio
+from functools import partial
 
 from agents.base_agent import BaseAgent
-from models import WorkflowState, Article, NewsletterFormat
-from tools.perplexity_client import PerplexityClient
+from models import (
+    WorkflowState,
+    Article,
+    NewsletterFormat,
+    NewsletterConfig,
+    UserPreferences,
+)
+from tools.perplexity_client import PerplexityClient, SearchUnavailableError
 from tools.content_processor import ContentProcessor
+from tools.article_ranker import ArticleRanker
+from tools.topic_planner import TopicPlanner
+from tools.article_pool import article_pool
+from tools.topic_store import topic_store
+from tools.fulltext_fetcher import fulltext_fetcher
+from tools.sources import (
+    ArticleSource,
+    create_sources,
+    get_source_stats,
+    merge_streams,
+    register_source,
+)
+import tools.feed_client  # noqa: F401 (registers the "feeds" source)
+from config import settings
 
 
 class ContentAgent(BaseAgent):
@@ -21,15 +43,34 @@ class ContentAgent(BaseAgent):
         super().__init__("ContentAgent")
         self.perplexity_client = None
         self.content_processor = None
+        # Registered sources enabled in settings.article_sources
+        self.sources: List[ArticleSource] = []
+        self.ranker = ArticleRanker()
+        self.topic_planner = TopicPlanner()
+        # LRU of recent search results; keys include user preferences
+        self.search_cache: "OrderedDict[str, Tuple[datetime, List[Article]]]" = (
+            OrderedDict()
+        )
+        self.inflight_searches: Dict[str, asyncio.Task] = {}
+        self.search_semaphore = asyncio.Semaphore(settings.search_concurrency)
+        self.stats = {
+            "searches": 0,
+            "search_cache_hits": 0,
+            "search_joins": 0,
+            "pool_served": 0,
+        }
 
     async def initialize(self):
         """Initialize content agent resources"""
         await super().initialize()
         self.perplexity_client = PerplexityClient()
         self.content_processor = ContentProcessor()
+        self.sources = create_sources(self)
 
         await asyncio.gather(
-            self.perplexity_client.initialize(), self.content_processor.initialize()
+            self.perplexity_client.initialize(),
+            self.content_processor.initialize(),
+            *[source.initialize() for source in self.sources],
         )
 
     async def execute(
@@ -51,22 +92,10 @@ class ContentAgent(BaseAgent):
                     f"🔧 Setting date range for {config.format.value}: {config.date_range}"
                 )
 
-            # 1. Generate personalized topics
-            topics = await self._generate_topics(workflow_state)
-            self.logger.info(f"Generated {len(topics)} search topics")
-
-            # 2. Collect articles from sources
-            all_articles = []
-            for topic in topics:
-                try:
-                    articles = await self.perplexity_client.search_articles(
-                        topic,
-                        workflow_state.newsletter_config,
-                        workflow_state.user_preferences,
-                    )
-                    all_articles.extend(articles)
-                except Exception as e:
-                    self.logger.error(f"Error collecting for topic '{topic}': {e}")
+            # 1-2. Query the shared pool, or search live when it is cold
+            all_articles = self._query_pool(workflow_state)
+            if all_articles is None:
+                all_articles = await self._collect_live(workflow_state)
 
             # 3. 🔧 FIX: Filter articles by date range STRICTLY
             date_filtered_articles = self._filter_by_date_range(all_articles, config)
@@ -82,15 +111,61 @@ class ContentAgent(BaseAgent):
                 unique_articles, workflow_state.user_preferences
             )
 
+            # 5. Rank and keep only what analysis is budgeted for
+            candidates = self.ranker.select_candidates(
+                validated_articles,
+                workflow_state.user_preferences,
+                workflow_state.newsletter_config,
+            )
+
+            # 6. Optionally fetch the full text of the surviving candidates
+            if settings.fulltext_enabled:
+                candidates = await fulltext_fetcher.enrich(candidates)
+
             self.logger.info(
-                f"Content collection complete: {len(validated_articles)} articles"
+                f"Content collection complete: {len(candidates)} candidate articles"
             )
-            return validated_articles
+            return candidates
 
         except Exception as e:
             self.logger.error(f"Content collection failed: {e}")
             raise
 
+    def _query_pool(self, workflow_state: WorkflowState) -> Optional[List[Article]]:
+        """Articles from the ingested pool, or None if it cannot serve this request"""
+        if not settings.article_pool_enabled or not article_pool.ready:
+            return None
+
+        config = workflow_state.newsletter_config
+        articles = article_pool.query(
+            workflow_state.user_preferences, config.date_range
+        )
+        if len(articles) < config.max_articles:
+            print(f"🗄️ Article pool has only {len(articles)} matches, searching live")
+            return None
+
+        self.stats["pool_served"] += 1
+        print(f"🗄️ Serving {len(articles)} articles from the shared pool")
+        return articles
+
+    async def _collect_live(self, workflow_state: WorkflowState) -> List[Article]:
+        """Collect the planned topics from every enabled source now"""
+        topics = await self._generate_topics(workflow_state)
+        self.logger.info(f"Generated {len(topics)} search topics")
+
+        articles = []
+        counts: Dict[str, int] = {}
+        async for name, batch in merge_streams(
+            self.sources,
+            topics,
+            workflow_state.newsletter_config,
+            workflow_state.user_preferences,
+        ):
+            articles.extend(batch)
+            counts[name] = counts.get(name, 0) + len(batch)
+        print(f"📥 Collected {len(articles)} articles by source: {counts}")
+        return articles
+
     def _calculate_date_range(self, format_type: NewsletterFormat) -> dict:
         """Calculate proper date range based on format"""
         end_date = datetime.utcnow()
@@ -136,62 +211,151 @@ class ContentAgent(BaseAgent):
             return articles
 
     async def _generate_topics(self, workflow_state: WorkflowState) -> List[str]:
-        """Generate personalized search topics - ENHANCED"""
-        preferences = workflow_state.user_preferences
-        config = workflow_state.newsletter_config
+        """Generate personalized search topics"""
+        topics = self.topic_planner.plan(
+            workflow_state.user_preferences, workflow_state.newsletter_config
+        )
+        print(f"🔍 Generated topics: {topics}")
+        return topics
 
-        topics = []
-
-        # 🔧 FIX: Use user keywords as primary topics
-        if preferences.keywords:
-            print(f"🎯 Using user keywords: {preferences.keywords}")
-            for keyword in preferences.keywords:
-                topics.extend(
-                    [
-                        f"{keyword} AI",
-                        f"{keyword} regulations",
-                        f"{keyword} developments",
-                        f"{keyword} news",
-                    ]
-                )
+    async def search_topic(
+        self, topic: str, config: NewsletterConfig, preferences: UserPreferences
+    ) -> List[Article]:
+        """Search one topic, reusing cached or in-flight results"""
+        key = self.topic_planner.search_key(topic, config, preferences)
+
+        cached = self.search_cache.get(key)
+        if cached and (datetime.utcnow() - cached[0]).total_seconds() < (
+            settings.content_cache_ttl
+        ):
+            self.search_cache.move_to_end(key)
+            self.stats["search_cache_hits"] += 1
+            return list(cached[1])
+
+        task = self.inflight_searches.get(key)
+        if task:
+            self.stats["search_joins"] += 1
         else:
-            # Default AI governance topics
-            base_topics = [
-                "AI governance regulations",
-                "responsible AI developments",
-                "AI compliance updates",
-                "AI ethics guidelines",
-                "AI policy updates",
-            ]
-            topics.extend(base_topics)
-
-        # Add industry-specific topics
-        for industry in preferences.industry_focus:
-            topics.extend(
-                [
-                    f"AI applications in {industry}",
-                    f"{industry} AI compliance",
-                    f"{industry} AI developments",
-                ]
+            task = asyncio.create_task(
+                self._run_search(key, topic, config, preferences)
             )
+            self.inflight_searches[key] = task
+            task.add_done_callback(lambda _: self.inflight_searches.pop(key, None))
+
+        # Shielded: a caller hitting its deadline must not cancel a shared search
+        return list(await asyncio.shield(task))
+
+    async def _run_search(
+        self,
+        key: str,
+        topic: str,
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+    ) -> List[Article]:
+        async with self.search_semaphore:
+            try:
+                self.stats["searches"] += 1
+                # Mock results must never advance a topic's watermark
+                incremental = (
+                    settings.incremental_search_enabled
+                    and not self.perplexity_client.use_mock
+                )
+                if incremental:
+                    articles = await topic_store.search(
+                        self.topic_planner.topic_key(topic, preferences),
+                        topic,
+                        config,
+                        preferences,
+                        partial(self.perplexity_client.search_articles, fallback=False),
+                    )
+                else:
+                    articles = await self.perplexity_client.search_articles(
+                        topic, config, preferences
+                    )
+            except SearchUnavailableError as e:
+                articles = await self.perplexity_client.stale_search_articles(
+                    topic, str(e)
+                )
+            except Exception as e:
+                self.logger.error(f"Error collecting for topic '{topic}': {e}")
+                return []
+
+        # Stale fallbacks are not cached so the next request retries the API
+        if articles and not any(article.stale for article in articles):
+            self._cache_search(key, articles)
+        return articles
+
+    def _cache_search(self, key: str, articles: List[Article]):
+        """Store a search result, dropping expired and least recent entries"""
+        now = datetime.utcnow()
+        expired = [
+            cached_key
+            for cached_key, (cached_at, _) in self.search_cache.items()
+            if (now - cached_at).total_seconds() >= settings.content_cache_ttl
+        ]
+        for cached_key in expired:
+            del self.search_cache[cached_key]
+
+        self.search_cache[key] = (now, articles)
+        self.search_cache.move_to_end(key)
+        while len(self.search_cache) > settings.search_cache_size:
+            self.search_cache.popitem(last=False)
+
+    async def prefetch(self, plan: Dict[str, Any]) -> List[Article]:
+        """Run every search of a batch plan once so workflows hit the cache"""
+        searches = plan["searches"]
+        print(
+            f"🔍 Batch search plan: {len(searches)} searches instead of {plan['requested']}"
+        )
+        results = await asyncio.gather(
+            *[
+                self.search_topic(query, config, preferences)
+                for query, config, preferences in searches.values()
+            ]
+        )
+        return [article for articles in results for article in articles]
+
+    def get_status(self) -> dict:
+        """Get agent status including search sharing counters"""
+        status = super().get_status()
+        status["stats"] = {**self.stats, "cached_searches": len(self.search_cache)}
+        if self.perplexity_client:
+            status["perplexity"] = self.perplexity_client.get_stats()
+        if settings.incremental_search_enabled:
+            status["topic_store"] = topic_store.get_stats()
+        if settings.article_pool_enabled:
+            status["article_pool"] = article_pool.get_stats()
+        stream_stats = get_source_stats()
+        status["sources"] = {
+            source.name: {**stream_stats.get(source.name, {}), **source.get_stats()}
+            for source in self.sources
+        }
+        if settings.fulltext_enabled:
+            status["fulltext"] = fulltext_fetcher.get_stats()
+        return status
 
-        # 🔧 FIX: Add proper date context for recency
-        date_context = self._get_date_context(config.format)
-        topics = [f"{topic} {date_context}" for topic in topics]
 
-        # Remove duplicates and limit
-        unique_topics = list(set(topics))[:10]  # Limit to 10 topics
-        print(f"🔍 Generated topics: {unique_topics}")
+class SearchSource(ArticleSource):
+    """Perplexity searches through the agent's shared cache and in-flight joins"""
 
-        return unique_topics
+    name = "perplexity"
 
-    def _get_date_context(self, format_type: NewsletterFormat) -> str:
-        """Get appropriate date context for search"""
-        if format_type == NewsletterFormat.DAILY:
-            return "today latest"
-        elif format_type == NewsletterFormat.WEEKLY:
-            return "this week latest"
-        elif format_type == NewsletterFormat.MONTHLY:
-            return "this month latest"
-        else:
-            return "recent latest"
+    def __init__(self, content_agent: ContentAgent):
+        self.content_agent = content_agent
+
+    async def stream(
+        self,
+        topics: List[str],
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+    ) -> AsyncIterator[List[Article]]:
+        async for articles in self.bounded(
+            [
+                partial(self.content_agent.search_topic, topic, config, preferences)
+                for topic in topics
+            ]
+        ):
+            yield articles
+
+
+register_source("perplexity", SearchSource)
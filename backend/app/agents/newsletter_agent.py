@@ -2,14 +2,16 @@
 """
 Newsletter Agent with enhanced debugging
 """
-from typing import List, Any, Dict
+from typing import List, Any, Dict, AsyncIterator
 from datetime import datetime
 from collections import defaultdict
 
 from agents.base_agent import BaseAgent
+from config import settings
 from models import WorkflowState, AnalyzedArticle, Newsletter
 from tools.openai_client import OpenAIClient
-from templates.newsletter_templates import NewsletterTemplateFactory
+from templates.newsletter_templates import template_factory, newsletter_title
+from utils.newsletter_document import NewsletterDocument
 
 
 class NewsletterAgent(BaseAgent):
@@ -24,7 +26,7 @@ class NewsletterAgent(BaseAgent):
         """Initialize newsletter agent resources"""
         await super().initialize()
         self.openai_client = OpenAIClient()
-        self.template_factory = NewsletterTemplateFactory()
+        self.template_factory = template_factory
         await self.openai_client.initialize()
         print("✅ Newsletter agent initialized")
 
@@ -102,36 +104,8 @@ class NewsletterAgent(BaseAgent):
             )
 
             # 3. Compile final newsletter using template
-            print("📋 Step 3: Compiling final newsletter...")
-            try:
-                template = self.template_factory.get_template(
-                    config.template, config.format
-                )
-                newsletter_content = template.render(
-                    {
-                        "title": f"AI Watchtower {config.format.value.title()} Brief",
-                        "sections": newsletter_sections,
-                        "config": config,
-                        "user_preferences": workflow_state.user_preferences,
-                        "total_articles": len(analyzed_articles),
-                        "generated_at": datetime.utcnow(),
-                    }
-                )
-                print(f"✅ Template rendered: {len(newsletter_content)} characters")
-            except Exception as e:
-                print(f"❌ Template rendering failed: {e}")
-                # Fallback to simple content
-                newsletter_content = self._create_simple_newsletter(
-                    newsletter_sections, config, len(analyzed_articles)
-                )
-
-            newsletter = Newsletter(
-                user_id=workflow_state.user_id,
-                title=f"AI Watchtower {config.format.value.title()} Brief - {datetime.utcnow().strftime('%B %Y')}",
-                content=newsletter_content,
-                config=config,
-                total_articles=len(analyzed_articles),
-                sections=newsletter_sections,
+            newsletter = self._compile_newsletter(
+                newsletter_sections, analyzed_articles, workflow_state
             )
 
             print(f"✅ Newsletter generation completed successfully")
@@ -148,6 +122,104 @@ class NewsletterAgent(BaseAgent):
             print(f"   Traceback: {traceback.format_exc()}")
             raise
 
+    async def stream(
+        self, analyzed_articles: List[AnalyzedArticle], workflow_state: WorkflowState
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Generate the newsletter section by section, yielding events as text arrives.
+
+        Events: section_start, delta (a piece of section text), section_end and
+        finally done, which carries the compiled Newsletter.
+        """
+        self.last_execution = datetime.utcnow()
+        config = workflow_state.newsletter_config
+
+        section_content = {}
+        if analyzed_articles:
+            section_content = await self._distribute_content_to_sections(
+                analyzed_articles, config.sections
+            )
+        if not section_content:
+            yield {
+                "event": "done",
+                "newsletter": self._create_empty_newsletter(workflow_state),
+            }
+            return
+
+        newsletter_sections = {}
+        for section_name in config.sections:
+            articles = section_content.get(section_name, [])
+            if not articles:
+                continue
+
+            yield {
+                "event": "section_start",
+                "section": section_name,
+                "articles": len(articles),
+            }
+            parts = []
+            async for text in self.openai_client.stream_section_content(
+                section_name,
+                articles[: settings.section_prompt_max_articles],
+                config,
+            ):
+                parts.append(text)
+                yield {"event": "delta", "section": section_name, "text": text}
+            newsletter_sections[section_name] = "".join(parts)
+            yield {"event": "section_end", "section": section_name}
+
+        yield {
+            "event": "done",
+            "newsletter": self._compile_newsletter(
+                newsletter_sections, analyzed_articles, workflow_state
+            ),
+        }
+
+    def _compile_newsletter(
+        self,
+        newsletter_sections: Dict[str, str],
+        analyzed_articles: List[AnalyzedArticle],
+        workflow_state: WorkflowState,
+    ) -> Newsletter:
+        """Render the generated sections into the final newsletter"""
+        config = workflow_state.newsletter_config
+
+        print("📋 Step 3: Compiling final newsletter...")
+        try:
+            template = self.template_factory.get_template(
+                config.template, config.format
+            )
+            newsletter_content = template.render(
+                {
+                    "title": newsletter_title(config),
+                    "sections": newsletter_sections,
+                    "config": config,
+                    "user_preferences": workflow_state.user_preferences,
+                    "total_articles": len(analyzed_articles),
+                    "generated_at": datetime.utcnow(),
+                }
+            )
+            print(f"✅ Template rendered: {len(newsletter_content)} characters")
+        except Exception as e:
+            print(f"❌ Template rendering failed: {e}")
+            # Fallback to simple content
+            newsletter_content = self._create_simple_newsletter(
+                newsletter_sections, config, len(analyzed_articles)
+            )
+
+        # Parse once; every other export format is rendered from the same tree
+        renditions = NewsletterDocument.from_markdown(newsletter_content).render_all()
+
+        newsletter = Newsletter(
+            user_id=workflow_state.user_id,
+            title=f"AI Watchtower {config.format.value.title()} Brief - {datetime.utcnow().strftime('%B %Y')}",
+            content=newsletter_content,
+            config=config,
+            total_articles=len(analyzed_articles),
+            sections=newsletter_sections,
+            renditions=renditions,
+        )
+        return newsletter
+
     async def _distribute_content_to_sections(
         self, analyzed_articles: List[AnalyzedArticle], sections: List[str]
     ) -> Dict[str, List[AnalyzedArticle]]:
@@ -220,11 +292,10 @@ class NewsletterAgent(BaseAgent):
                 f"✍️ Generating section '{section_name}' with {len(articles)} articles"
             )
 
-            # Limit articles per section
-            max_articles = min(len(articles), 5)
-            selected_articles = articles[:max_articles]
+            # The section prompt packs as many of these as its token budget fits
+            selected_articles = articles[: settings.section_prompt_max_articles]
             print(
-                f"📝 Using top {len(selected_articles)} articles for '{section_name}'"
+                f"📝 Offering top {len(selected_articles)} articles for '{section_name}'"
             )
 
             # Generate section content using OpenAI
@@ -288,3 +359,10 @@ Total Articles: {total_articles}
             content += f"## {section_name}\n\n{section_content}\n\n"
 
         return content
+
+    def get_status(self) -> dict:
+        """Get agent status including LLM call stats"""
+        status = super().get_status()
+        if self.openai_client:
+            status["openai"] = self.openai_client.get_stats()
+        return status
@@ -0,0 +1,102 @@
+# File: app/agents/newsletter_cache.py
+"""
+Stale-while-revalidate serving of recently generated newsletters
+"""
+from typing import Dict, Any, Optional, Set, Tuple
+from datetime import datetime
+import logging
+
+from fastapi import BackgroundTasks
+
+from config import settings
+from database import db
+from agents.orchestrator import orchestrator
+from models import Newsletter, UserPreferences, NewsletterConfig
+from utils.fingerprint import newsletter_fingerprint
+
+
+class NewsletterCache:
+    """Serve a recent newsletter for the same user + config, refresh it later.
+
+    Within newsletter_fresh_seconds the stored issue is returned as is.
+    Up to newsletter_stale_seconds it is still returned immediately, and a
+    regeneration is scheduled after the response. Older issues are never
+    served; the request generates synchronously.
+    """
+
+    def __init__(self, orchestrator_instance):
+        self.orchestrator = orchestrator_instance
+        self.logger = logging.getLogger("NewsletterCache")
+        self.revalidating: Set[str] = set()
+        self.stats = {"fresh": 0, "stale": 0, "generated": 0, "revalidations": 0}
+
+    async def get_newsletter(
+        self,
+        preferences: UserPreferences,
+        config: NewsletterConfig,
+        background_tasks: BackgroundTasks,
+        serve_stale: bool = False,
+    ) -> Tuple[Newsletter, Dict[str, Any]]:
+        """Return (newsletter, cache info), generating only when needed"""
+        fingerprint = newsletter_fingerprint(preferences, config)
+
+        if serve_stale:
+            cached = await db.get_latest_newsletter(preferences.user_id, fingerprint)
+            if cached:
+                age = (datetime.utcnow() - cached.generated_at).total_seconds()
+                if age <= settings.newsletter_fresh_seconds:
+                    self.stats["fresh"] += 1
+                    return cached, self._info("fresh", age, fingerprint)
+
+                if age <= settings.newsletter_stale_seconds:
+                    self.stats["stale"] += 1
+                    if fingerprint not in self.revalidating:
+                        self.revalidating.add(fingerprint)
+                        background_tasks.add_task(
+                            self._revalidate, preferences, config, fingerprint
+                        )
+                    return cached, self._info("stale", age, fingerprint)
+
+        newsletter = await self.generate(preferences, config, fingerprint)
+        self.stats["generated"] += 1
+        return newsletter, self._info("generated", 0.0, fingerprint)
+
+    async def generate(
+        self,
+        preferences: UserPreferences,
+        config: NewsletterConfig,
+        fingerprint: Optional[str] = None,
+    ) -> Newsletter:
+        """Generate and store a newsletter under its fingerprint"""
+        if self.orchestrator.content_agent.status == "inactive":
+            await self.orchestrator.initialize()
+
+        newsletter = await self.orchestrator.generate_newsletter(preferences, config)
+        await db.save_newsletter(
+            newsletter, fingerprint or newsletter_fingerprint(preferences, config)
+        )
+        return newsletter
+
+    async def _revalidate(
+        self, preferences: UserPreferences, config: NewsletterConfig, fingerprint: str
+    ):
+        try:
+            self.stats["revalidations"] += 1
+            await self.generate(preferences, config, fingerprint)
+            print(f"🔄 Revalidated newsletter for {preferences.user_id}")
+        except Exception as e:
+            self.logger.error(f"Revalidation failed for {preferences.user_id}: {e}")
+        finally:
+            self.revalidating.discard(fingerprint)
+
+    def _info(self, state: str, age: float, fingerprint: str) -> Dict[str, Any]:
+        return {
+            "state": state,
+            "age_seconds": round(age, 1),
+            "revalidating": fingerprint in self.revalidating,
+            "fingerprint": fingerprint[:16],
+        }
+
+
+# Global newsletter cache instance
+newsletter_cache = NewsletterCache(orchestrator)
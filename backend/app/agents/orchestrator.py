@@ -4,7 +4,7 @@ Main orchestrator with enhanced debugging
 """
 import asyncio
 from datetime import datetime
-from typing import Optional
+from typing import Optional, AsyncIterator, Dict, Any
 import logging
 
 from agents.base_agent import BaseAgent
@@ -12,6 +12,8 @@ from agents.content_agent import ContentAgent
 from agents.analysis_agent import AnalysisAgent
 from agents.newsletter_agent import NewsletterAgent
 from models import WorkflowState, Newsletter, UserPreferences, NewsletterConfig
+from tools.rate_limiter import get_limiter_stats
+from tools.http_clients import get_http_stats
 
 
 class Orchestrator:
@@ -143,6 +145,60 @@ class Orchestrator:
             if workflow_id in self.active_workflows:
                 del self.active_workflows[workflow_id]
 
+    async def stream_newsletter(
+        self, user_preferences: UserPreferences, newsletter_config: NewsletterConfig
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run the workflow, streaming progress and section text as it is written"""
+        workflow_id = (
+            f"workflow_{user_preferences.user_id}_{datetime.utcnow().isoformat()}"
+        )
+        workflow_state = WorkflowState(
+            workflow_id=workflow_id,
+            user_id=user_preferences.user_id,
+            user_preferences=user_preferences,
+            newsletter_config=newsletter_config,
+        )
+        self.active_workflows[workflow_id] = workflow_state
+
+        try:
+            workflow_state.status = "collecting"
+            yield {"event": "status", "status": workflow_state.status}
+            articles = await self.content_agent.execute(None, workflow_state)
+            workflow_state.collected_articles = articles
+
+            workflow_state.status = "analyzing"
+            yield {
+                "event": "status",
+                "status": workflow_state.status,
+                "articles": len(articles),
+            }
+            analyzed_articles = await self.analysis_agent.execute(
+                articles, workflow_state
+            )
+            workflow_state.analyzed_articles = analyzed_articles
+
+            workflow_state.status = "generating"
+            yield {
+                "event": "status",
+                "status": workflow_state.status,
+                "articles": len(analyzed_articles),
+            }
+            async for event in self.newsletter_agent.stream(
+                analyzed_articles, workflow_state
+            ):
+                yield event
+
+            workflow_state.status = "completed"
+
+        except Exception as e:
+            workflow_state.status = "failed"
+            workflow_state.error = str(e)
+            print(f"❌ Workflow {workflow_id} failed: {e}")
+            raise
+
+        finally:
+            self.active_workflows.pop(workflow_id, None)
+
     def get_workflow_status(self, workflow_id: str) -> Optional[dict]:
         """Get workflow status"""
         if workflow_id in self.active_workflows:
@@ -161,6 +217,8 @@ class Orchestrator:
             "content_agent": self.content_agent.get_status(),
             "analysis_agent": self.analysis_agent.get_status(),
             "newsletter_agent": self.newsletter_agent.get_status(),
+            "rate_limits": get_limiter_stats(),
+            "http": get_http_stats(),
         }
 
 
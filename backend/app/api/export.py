@@ -2,70 +2,105 @@
 Export API endpoints
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+import asyncio
 
 from database import db
-from utils.newsletter_exporter import NewsletterExporter
+from utils.newsletter_exporter import EXPORT_EXTENSIONS, NewsletterExporter
 
 router = APIRouter()
 exporter = NewsletterExporter()
 
+EXPORT_MEDIA_TYPES = {
+    "html": "text/html",
+    "markdown": "text/markdown",
+    "text": "text/plain",
+    "json": "application/json",
+}
 
+
+def _gzip_etag(etag: str) -> str:
+    """ETag of the gzip variant: its bytes differ, so its strong tag must too"""
+    return etag[:-1] + '-gzip"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header names the export's identity or gzip
+    ETag (both variants hold the same content)"""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+    return any(
+        candidate in tags or f"W/{candidate}" in tags
+        for candidate in (etag, _gzip_etag(etag))
+    )
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (q=0 refuses it)"""
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() in ("gzip", "*"):
+            quality = params.replace(" ", "").partition("q=")[2]
+            try:
+                return float(quality or 1) > 0
+            except ValueError:
+                return False
+    return False
+
+
+@router.get("/newsletter/{user_id}/latest")
 @router.post("/newsletter/{user_id}/latest")
-async def export_latest_newsletter(user_id: str, format: str = "html"):
-    """Export the latest newsletter to file"""
+async def export_latest_newsletter(
+    request: Request, user_id: str, format: str = "html"
+):
+    """Export the latest newsletter, served from the content-addressed cache.
+
+    Responses carry the export's content hash as ETag ("<hash>-gzip" for the
+    stored gzip file, which gzip-capable clients get); a matching
+    If-None-Match gets 304.
+    """
+    format = format.lower()
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported format. Use 'html', 'markdown', 'text' or 'json'",
+        )
+
     try:
-        # Get latest newsletter from database
-        newsletters = await db.get_user_newsletters(user_id, limit=1)
-        if not newsletters:
+        newsletter = await db.get_latest_newsletter(user_id)
+        if not newsletter:
             raise HTTPException(status_code=404, detail="No newsletters found")
 
-        # For demo, let's create a sample newsletter export
-        # In real implementation, you'd fetch the full newsletter content
-
-        if format.lower() == "html":
-            # Create a sample HTML file
-            filename = f"newsletter-{user_id}-latest.html"
-            filepath = os.path.join("exports", filename)
-
-            sample_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>AI Watchtower Newsletter</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }}
-        h1 {{ color: #2c3e50; }}
-        h2 {{ color: #34495e; border-left: 4px solid #3498db; padding-left: 15px; }}
-        a {{ color: #3498db; }}
-    </style>
-</head>
-<body>
-    <h1>AI Watchtower Newsletter</h1>
-    <p>Generated for user: {user_id}</p>
-    <p>This is a sample export. The actual newsletter content would be rendered here with proper formatting and hyperlinks.</p>
-    
-    <h2>Executive Highlights</h2>
-    <p>Your personalized AI governance and compliance insights would appear here...</p>
-    
-    <h2>Technical Breakthroughs</h2>
-    <p>Latest AI technology developments...</p>
-    
-    <p><em>Export generated on: {newsletters[0]['generated_at']}</em></p>
-</body>
-</html>"""
-
-            os.makedirs("exports", exist_ok=True)
-            with open(filepath, "w") as f:
-                f.write(sample_html)
-
-            return FileResponse(filepath, filename=filename, media_type="text/html")
-
-        else:
-            raise HTTPException(
-                status_code=400, detail="Unsupported format. Use 'html' or 'markdown'"
-            )
+        artifact = await asyncio.to_thread(exporter.export, newsletter, format)
+        headers = {
+            "ETag": artifact["etag"],
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        path = artifact["path"]
+        gzipped = artifact["gzip_path"] and _accepts_gzip(
+            request.headers.get("accept-encoding", "")
+        )
+        if gzipped:
+            path = artifact["gzip_path"]
+            headers["ETag"] = _gzip_etag(artifact["etag"])
+
+        if _etag_matches(request.headers.get("if-none-match", ""), artifact["etag"]):
+            return Response(status_code=304, headers=headers)
+
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+
+        return FileResponse(
+            path,
+            filename=f"newsletter-{user_id}-latest.{EXPORT_EXTENSIONS[format]}",
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers=headers,
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
@@ -4,15 +4,42 @@
 Newsletter API endpoints - FIXED with sections selection
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
-from typing import Optional, List
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-
-from models import UserPreferences, NewsletterConfig, NewsletterFormat, TemplateType
+import json
+
+from models import (
+    Newsletter,
+    UserPreferences,
+    NewsletterConfig,
+    NewsletterFormat,
+    TemplateType,
+)
 from database import db
 from agents.orchestrator import orchestrator
+from agents.batch_scheduler import batch_scheduler
+from agents.article_ingester import article_ingester
+from agents.newsletter_cache import newsletter_cache
+from templates.newsletter_templates import (
+    buffered_chunks,
+    newsletter_context,
+    template_factory,
+)
+from utils.config_validator import ConfigValidator
+from utils.fingerprint import newsletter_fingerprint
+from utils.newsletter_exporter import NewsletterExporter
 
 router = APIRouter()
+exporter = NewsletterExporter()
+
+RENDERED_MEDIA_TYPES = {
+    "markdown": "text/markdown",
+    "html": "text/html",
+    "text": "text/plain",
+    "json": "application/json",
+}
 
 
 # Request models for better API handling
@@ -36,10 +63,67 @@ class CustomNewsletterRequest(BaseModel):
     max_articles: Optional[int] = 25
 
 
+class StreamNewsletterRequest(BaseModel):
+    format: str = "daily"
+    sections: Optional[List[str]] = None
+    template: Optional[str] = "brief"
+    max_articles: Optional[int] = 8
+    start_date: Optional[str] = None  # YYYY-MM-DD, custom format only
+    end_date: Optional[str] = None  # YYYY-MM-DD, custom format only
+
+
+class BatchNewsletterRequest(BaseModel):
+    user_ids: Optional[List[str]] = None  # None = every stored user
+    format: str = "daily"
+    sections: Optional[List[str]] = None
+    template: Optional[str] = "brief"
+    max_articles: Optional[int] = 8
+
+
+def _rendered_response(
+    newsletter: Newsletter,
+    user_preferences: Optional[UserPreferences],
+    output: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """A newsletter rendered as markdown, HTML, plain text or document JSON.
+
+    Stored renditions are returned as they are. Newsletters saved without
+    them are streamed from the template while it renders.
+    """
+    if output not in RENDERED_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported format. Use 'markdown', 'html', 'text' or 'json'",
+        )
+    media_type = RENDERED_MEDIA_TYPES[output]
+    if newsletter.renditions or output in ("text", "json"):
+        return Response(
+            exporter.render(newsletter, output), media_type=media_type, headers=headers
+        )
+
+    template = template_factory.get_template(
+        newsletter.config.template, newsletter.config.format
+    )
+    chunks = template.render_chunks(newsletter_context(newsletter, user_preferences))
+    if output == "html":
+        chunks = exporter.html_chunks(newsletter, chunks)
+    return StreamingResponse(
+        buffered_chunks(chunks), media_type=media_type, headers=headers
+    )
+
+
+def _cache_headers(cache_info: Dict[str, Any]) -> Dict[str, str]:
+    return {"X-Newsletter-Cache": cache_info["state"]}
+
+
 @router.post("/generate/monthly")
 async def generate_newsletter(
     user_id: str,
+    background_tasks: BackgroundTasks,
     request_body: Optional[GenerateNewsletterRequest] = None,
+    serve_stale: bool = False,
+    output: Literal["json", "markdown", "html", "text"] = "json",
 ):
     """Generate a monthly newsletter with selectable sections"""
     try:
@@ -81,17 +165,14 @@ async def generate_newsletter(
             "end": end_date.strftime("%Y-%m-%d"),
         }
 
-        # Initialize orchestrator if needed
-        if orchestrator.content_agent.status == "inactive":
-            await orchestrator.initialize()
-
-        # Generate newsletter
-        newsletter = await orchestrator.generate_newsletter(
-            user_preferences, newsletter_config
+        # Generate newsletter, or serve a recent one while it is refreshed
+        newsletter, cache_info = await newsletter_cache.get_newsletter(
+            user_preferences, newsletter_config, background_tasks, serve_stale
         )
-
-        # Save newsletter
-        await db.save_newsletter(newsletter)
+        if output != "json":
+            return _rendered_response(
+                newsletter, user_preferences, output, _cache_headers(cache_info)
+            )
 
         return {
             "status": "success",
@@ -108,6 +189,7 @@ async def generate_newsletter(
                     "date_range": newsletter_config.date_range,
                 },
             },
+            "cache": cache_info,
         }
 
     except Exception as e:
@@ -119,7 +201,10 @@ async def generate_newsletter(
 @router.post("/generate/weekly")
 async def generate_weekly_newsletter(
     user_id: str,
+    background_tasks: BackgroundTasks,
     request_body: Optional[WeeklyNewsletterRequest] = None,
+    serve_stale: bool = False,
+    output: Literal["json", "markdown", "html", "text"] = "json",
 ):
     """Generate a weekly newsletter with selectable sections"""
     try:
@@ -157,15 +242,14 @@ async def generate_weekly_newsletter(
             "end": end_date.strftime("%Y-%m-%d"),
         }
 
-        # Initialize orchestrator if needed
-        if orchestrator.content_agent.status == "inactive":
-            await orchestrator.initialize()
-
-        # Generate newsletter
-        newsletter = await orchestrator.generate_newsletter(
-            user_preferences, weekly_config
+        # Generate newsletter, or serve a recent one while it is refreshed
+        newsletter, cache_info = await newsletter_cache.get_newsletter(
+            user_preferences, weekly_config, background_tasks, serve_stale
         )
-        await db.save_newsletter(newsletter)
+        if output != "json":
+            return _rendered_response(
+                newsletter, user_preferences, output, _cache_headers(cache_info)
+            )
 
         return {
             "status": "success",
@@ -182,6 +266,7 @@ async def generate_weekly_newsletter(
                     "date_range": weekly_config.date_range,
                 },
             },
+            "cache": cache_info,
         }
 
     except Exception as e:
@@ -193,7 +278,10 @@ async def generate_weekly_newsletter(
 @router.post("/generate/daily")
 async def generate_daily_newsletter(
     user_id: str,
+    background_tasks: BackgroundTasks,
     request_body: Optional[WeeklyNewsletterRequest] = None,
+    serve_stale: bool = False,
+    output: Literal["json", "markdown", "html", "text"] = "json",
 ):
     """Generate a daily newsletter with selectable sections"""
     try:
@@ -229,15 +317,14 @@ async def generate_daily_newsletter(
             "end": end_date.strftime("%Y-%m-%d"),
         }
 
-        # Initialize orchestrator if needed
-        if orchestrator.content_agent.status == "inactive":
-            await orchestrator.initialize()
-
-        # Generate newsletter
-        newsletter = await orchestrator.generate_newsletter(
-            user_preferences, daily_config
+        # Generate newsletter, or serve a recent one while it is refreshed
+        newsletter, cache_info = await newsletter_cache.get_newsletter(
+            user_preferences, daily_config, background_tasks, serve_stale
         )
-        await db.save_newsletter(newsletter)
+        if output != "json":
+            return _rendered_response(
+                newsletter, user_preferences, output, _cache_headers(cache_info)
+            )
 
         return {
             "status": "success",
@@ -254,6 +341,7 @@ async def generate_daily_newsletter(
                     "date_range": daily_config.date_range,
                 },
             },
+            "cache": cache_info,
         }
 
     except Exception as e:
@@ -265,7 +353,10 @@ async def generate_daily_newsletter(
 @router.post("/generate/custom")
 async def generate_custom_newsletter(
     user_id: str,
+    background_tasks: BackgroundTasks,
     request_body: CustomNewsletterRequest,
+    serve_stale: bool = False,
+    output: Literal["json", "markdown", "html", "text"] = "json",
 ):
     """Generate a custom newsletter with specific date range and sections"""
     try:
@@ -288,15 +379,14 @@ async def generate_custom_newsletter(
             f"🔧 Custom API: Date range: {request_body.start_date} to {request_body.end_date}"
         )
 
-        # Initialize orchestrator if needed
-        if orchestrator.content_agent.status == "inactive":
-            await orchestrator.initialize()
-
-        # Generate newsletter
-        newsletter = await orchestrator.generate_newsletter(
-            user_preferences, custom_config
+        # Generate newsletter, or serve a recent one while it is refreshed
+        newsletter, cache_info = await newsletter_cache.get_newsletter(
+            user_preferences, custom_config, background_tasks, serve_stale
         )
-        await db.save_newsletter(newsletter)
+        if output != "json":
+            return _rendered_response(
+                newsletter, user_preferences, output, _cache_headers(cache_info)
+            )
 
         return {
             "status": "success",
@@ -316,6 +406,7 @@ async def generate_custom_newsletter(
                     },
                 },
             },
+            "cache": cache_info,
         }
 
     except Exception as e:
@@ -324,6 +415,114 @@ async def generate_custom_newsletter(
         )
 
 
+@router.post("/generate/stream")
+async def stream_newsletter(
+    user_id: str,
+    request_body: Optional[StreamNewsletterRequest] = None,
+):
+    """Generate a newsletter, streaming sections as server-sent events"""
+    request_body = request_body or StreamNewsletterRequest()
+    try:
+        format_type = NewsletterFormat(request_body.format)
+        stream_config = NewsletterConfig(
+            format=format_type,
+            sections=request_body.sections
+            or list(ConfigValidator.FORMAT_SECTIONS[format_type]),
+            template=TemplateType(request_body.template),
+            max_articles=request_body.max_articles,
+        )
+        if request_body.start_date and request_body.end_date:
+            stream_config.date_range = {
+                "start": request_body.start_date,
+                "end": request_body.end_date,
+            }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request: {str(e)}")
+
+    user_preferences = await db.get_user_preferences(user_id)
+    if not user_preferences:
+        user_preferences = UserPreferences(user_id=user_id)
+        await db.save_user_preferences(user_preferences)
+
+    if orchestrator.content_agent.status == "inactive":
+        await orchestrator.initialize()
+
+    async def event_stream():
+        try:
+            async for event in orchestrator.stream_newsletter(
+                user_preferences, stream_config
+            ):
+                if event["event"] == "done":
+                    newsletter = event["newsletter"]
+                    await db.save_newsletter(
+                        newsletter,
+                        newsletter_fingerprint(user_preferences, stream_config),
+                    )
+                    event = {
+                        "event": "done",
+                        "title": newsletter.title,
+                        "content": newsletter.content,
+                        "summary": newsletter.summary_stats,
+                        "generated_at": newsletter.generated_at.isoformat(),
+                    }
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+        except Exception as e:
+            error = {"event": "error", "detail": f"Newsletter generation failed: {e}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/generate/batch")
+async def generate_batch_newsletters(request_body: BatchNewsletterRequest):
+    """Generate newsletters for many users, once per preference cohort"""
+    try:
+        format_type = NewsletterFormat(request_body.format)
+
+        user_ids = request_body.user_ids
+        if user_ids is None:
+            user_ids = [p.user_id for p in await db.get_all_user_preferences()]
+
+        batch_config = NewsletterConfig(
+            format=format_type,
+            sections=request_body.sections
+            or list(ConfigValidator.FORMAT_SECTIONS[format_type]),
+            template=TemplateType(request_body.template),
+            max_articles=request_body.max_articles,
+        )
+
+        report = await batch_scheduler.run_batch(user_ids, batch_config)
+        return {"status": "success", "report": report}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Batch newsletter generation failed: {str(e)}"
+        )
+
+
+@router.get("/batch/last")
+async def get_last_batch_report():
+    """Get the report of the most recent batch run"""
+    return {"report": batch_scheduler.last_report}
+
+
+@router.post("/pool/ingest")
+async def ingest_article_pool():
+    """Refresh the shared article pool now"""
+    try:
+        report = await article_ingester.ingest_once()
+        return {"status": "success", "report": report}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Article ingestion failed: {str(e)}"
+        )
+
+
 @router.get("/formats")
 async def get_newsletter_formats():
     """Get available newsletter formats and templates with all possible sections"""
@@ -387,23 +586,27 @@ async def get_newsletter_formats():
 
 @router.get("/export/{user_id}/latest")
 async def export_latest_newsletter(user_id: str, format: str = "markdown"):
-    """Export latest newsletter to file"""
+    """Latest stored newsletter as markdown, HTML, plain text or document JSON"""
     try:
-        newsletters = await db.get_user_newsletters(user_id, limit=1)
-        if not newsletters:
+        newsletter = await db.get_latest_newsletter(user_id)
+        if not newsletter:
             raise HTTPException(status_code=404, detail="No newsletters found")
 
-        return {
-            "status": "success",
-            "message": "Newsletter export ready",
-            "format": format,
-            "file_info": "Newsletter exported successfully",
-        }
+        user_preferences = await db.get_user_preferences(user_id)
+        return _rendered_response(newsletter, user_preferences, format.lower())
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
+@router.get("/agents/status")
+async def get_agents_status():
+    """Get agent status and call counters"""
+    return orchestrator.get_agents_status()
+
+
 @router.get("/history/{user_id}")
 async def get_newsletter_history(user_id: str, limit: int = 10):
     """Get user's newsletter history"""
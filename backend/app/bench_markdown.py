@@ -0,0 +1,103 @@
+# File: app/bench_markdown.py
+"""
+Markdown to HTML throughput of the direct renderer against the old regex
+conversion
+
+A cold render writes HTML in one pass without building the document tree
+and keeps pace with the old regex passes while also escaping the text and
+rendering emphasis, code, numbered lists and heading anchors; repeat
+exports of the same content are served from the content-hash cache.
+
+Usage: python bench_markdown.py [renders] [kilobytes]
+"""
+import re
+import sys
+import time
+
+from utils.markdown_renderer import MarkdownRenderer, markdown_to_html
+
+SECTION = """## Compliance & Risk Watch
+
+This week regulators moved from consultation to enforcement, and vendors
+started publishing their first conformity documentation.
+
+### 1. **EU AI Act enforcement begins**
+
+The commission published guidance on general-purpose models, including
+documentation duties and incident reporting. *Why it matters:* providers
+have 12 months to comply. [Read more](https://example.com/eu-ai-act?ref=1&utm=2)
+
+Key dates for teams to track:
+1. Codes of practice due in **Q2**
+2. Systemic-risk thresholds reviewed yearly
+
+### 2. **Audit trails for <high-risk> systems**
+
+Banks piloting credit models must keep `training data` summaries and
+model cards for five years, according to the supervisor's new guidance.
+
+- **Impact**: High
+- **Urgency**: Medium
+
+---
+
+"""
+
+
+def legacy_markdown_to_html(markdown_content: str) -> str:
+    """The regex conversion NewsletterExporter used before"""
+    html = markdown_content
+    html = re.sub(r"^# (.*$)", r"<h1>\1</h1>", html, flags=re.MULTILINE)
+    html = re.sub(r"^## (.*$)", r"<h2>\1</h2>", html, flags=re.MULTILINE)
+    html = re.sub(r"^### (.*$)", r"<h3>\1</h3>", html, flags=re.MULTILINE)
+    html = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r'<a href="\2">\1</a>', html)
+    html = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", html)
+
+    html_paragraphs = []
+    for para in html.split("\n\n"):
+        para = para.strip()
+        if para and not para.startswith("<h") and not para.startswith("---"):
+            if para.startswith("•") or para.startswith("-"):
+                items = para.split("\n")
+                ul_content = "".join(
+                    [
+                        f'<li>{item.lstrip("•- ").strip()}</li>'
+                        for item in items
+                        if item.strip()
+                    ]
+                )
+                html_paragraphs.append(f"<ul>{ul_content}</ul>")
+            else:
+                html_paragraphs.append(f"<p>{para}</p>")
+        else:
+            html_paragraphs.append(para)
+    return "\n".join(html_paragraphs)
+
+
+def throughput(render, document: str, renders: int) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        render(document)
+    return renders / (time.perf_counter() - started)
+
+
+def bench_markdown(renders: int = 200, kilobytes: int = 100):
+    """Renders/s of a `kilobytes` edition: old regexes, cold, cached"""
+    repeats = kilobytes * 1024 // len(SECTION.encode("utf-8")) + 1
+    document = "# AI Watchtower Monthly Brief\n\n" + SECTION * repeats
+    print(f"🧪 {renders} renders of a {len(document) / 1024:.0f} KB edition")
+
+    legacy = throughput(legacy_markdown_to_html, document, renders)
+    cold = throughput(markdown_to_html, document, renders)
+    renderer = MarkdownRenderer()
+    cached = throughput(renderer.render, document, renders)
+
+    print(f"📊 Regex passes      {legacy:>10,.1f}/s")
+    print(f"📊 Direct (cold)     {cold:>10,.1f}/s   ({cold / legacy:.1f}x)")
+    print(f"📊 Cached by content {cached:>10,.1f}/s   ({cached / legacy:,.0f}x)")
+    print(f"✅ {renderer.get_stats()}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench_markdown(*args)
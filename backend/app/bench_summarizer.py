@@ -0,0 +1,111 @@
+# File: app/bench_summarizer.py
+"""
+Throughput benchmark for the extractive article summarizer
+
+Usage: python bench_summarizer.py [documents] [sentences_per_document]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from config import settings
+from tools.summarizer import ExtractiveSummarizer
+from tools.token_budget import estimate_tokens
+
+SUBJECTS = [
+    "The commission",
+    "Regulators",
+    "The startup",
+    "Researchers",
+    "The lab",
+    "Lawmakers",
+    "The auditor",
+    "Civil society groups",
+    "The company",
+    "Critics",
+]
+VERBS = [
+    "published",
+    "proposed",
+    "criticised",
+    "delayed",
+    "approved",
+    "investigated",
+    "announced",
+    "questioned",
+    "expanded",
+    "withdrew",
+]
+OBJECTS = [
+    "new transparency rules for foundation models",
+    "a risk assessment framework for hiring algorithms",
+    "guidance on training data provenance",
+    "an incident reporting requirement for high-risk systems",
+    "a voluntary code of conduct on model evaluations",
+    "limits on biometric surveillance in public spaces",
+    "a bias audit of credit scoring models",
+    "watermarking obligations for generated media",
+]
+TAILS = [
+    "after months of consultation",
+    "citing safety concerns",
+    "on Tuesday",
+    "ahead of the 2025 deadline",
+    "despite industry pushback",
+    "following a public inquiry",
+    "in a joint statement",
+    "",
+]
+
+
+def synthetic_document(rng: random.Random, sentences: int) -> str:
+    """A news-like body of loosely related sentences"""
+    parts = []
+    for _ in range(sentences):
+        tail = rng.choice(TAILS)
+        sentence = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+        parts.append(f"{sentence} {tail}.".replace(" .", "."))
+    return " ".join(parts)
+
+
+def bench_summarizer(documents: int = 10_000, sentences: int = 40):
+    """Summarize `documents` synthetic bodies and report throughput"""
+    print(
+        f"🧪 Summarizing {documents} documents of {sentences} sentences "
+        f"to {settings.content_summary_tokens} tokens..."
+    )
+    rng = random.Random(0)
+    corpus = [synthetic_document(rng, sentences) for _ in range(documents)]
+    summarizer = ExtractiveSummarizer(max_entries=documents)
+
+    latencies = []
+    started = time.perf_counter()
+    for text in corpus:
+        t0 = time.perf_counter()
+        summarizer.summarize(text)
+        latencies.append(time.perf_counter() - t0)
+    cold = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summaries = [summarizer.summarize(text) for text in corpus]
+    warm = time.perf_counter() - started
+
+    tokens_in = sum(estimate_tokens(text) for text in corpus)
+    tokens_out = sum(estimate_tokens(summary) for summary in summaries)
+    print(f"📊 Cold: {documents / cold:,.0f} docs/s ({cold:.2f}s total)")
+    print(
+        f"   Latency p50 {np.percentile(latencies, 50) * 1000:.2f}ms, "
+        f"p99 {np.percentile(latencies, 99) * 1000:.2f}ms"
+    )
+    print(f"📊 Cached: {documents / warm:,.0f} docs/s ({warm:.3f}s total)")
+    print(
+        f"✅ Tokens {tokens_in:,} -> {tokens_out:,} "
+        f"({tokens_out / max(tokens_in, 1):.1%} kept)"
+    )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench_summarizer(*args)
@@ -0,0 +1,88 @@
+# File: app/bench_templates.py
+"""
+Render throughput of the Jinja2 templates against the original classes
+
+Usage: python bench_templates.py [renders] [sections]
+"""
+from datetime import datetime
+import sys
+import time
+
+from models import NewsletterConfig, NewsletterFormat, TemplateType, UserPreferences
+from templates.newsletter_templates import (
+    BriefTemplate,
+    DetailedTemplate,
+    JinjaTemplate,
+    ProfessionalTemplate,
+)
+
+CLASSES = {
+    TemplateType.PROFESSIONAL: ProfessionalTemplate,
+    TemplateType.BRIEF: BriefTemplate,
+    TemplateType.DETAILED: DetailedTemplate,
+}
+
+
+def sample_content(template_type: TemplateType, sections: int) -> dict:
+    """A realistic render context with `sections` generated sections"""
+    body = (
+        "Regulators published new guidance on model evaluations this week. "
+        "**Why it matters:** providers must document training data and "
+        "report incidents. [Read more](https://example.com/article)\n\n"
+    ) * 6
+    config = NewsletterConfig(
+        format=NewsletterFormat.WEEKLY,
+        sections=[f"Section {i}" for i in range(sections)],
+        template=template_type,
+    )
+    return {
+        "title": "AI Watchtower Weekly Brief",
+        "sections": {f"Section {i}": body for i in range(sections)},
+        "config": config,
+        "user_preferences": UserPreferences(
+            user_id="bench", keywords=["AI Act", "audits"], industry_focus=["finance"]
+        ),
+        "total_articles": sections * 4,
+        "generated_at": datetime(2025, 7, 4, 9, 30),
+    }
+
+
+def throughput(render, content: dict, renders: int) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        render(content)
+    return renders / (time.perf_counter() - started)
+
+
+def bench_templates(renders: int = 5000, sections: int = 6):
+    """Compare renders/s and check both engines produce identical output"""
+    print(f"🧪 {renders} renders per template, {sections} sections each")
+
+    for template_type, template_class in CLASSES.items():
+        content = sample_content(template_type, sections)
+        jinja = JinjaTemplate(
+            NewsletterFormat.WEEKLY, template_name=f"{template_type.value}.md.j2"
+        )
+        same = template_class(NewsletterFormat.WEEKLY).render(content) == jinja.render(
+            content
+        )
+
+        # The old factory built a new instance for every render
+        per_render = throughput(
+            lambda c: template_class(NewsletterFormat.WEEKLY).render(c),
+            content,
+            renders,
+        )
+        instance = template_class(NewsletterFormat.WEEKLY)
+        classes_cached = throughput(instance.render, content, renders)
+        jinja_cached = throughput(jinja.render, content, renders)
+        print(
+            f"📊 {template_type.value:<12} classes {per_render:>9,.0f}/s   "
+            f"classes (cached) {classes_cached:>9,.0f}/s   "
+            f"jinja (cached) {jinja_cached:>9,.0f}/s   identical output: {same}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench_templates(*args)
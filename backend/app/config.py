@@ -3,7 +3,7 @@ Configuration settings for AI Watchtower
 """
 
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import List, Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     # API Keys
     openai_api_key: str = ""
     perplexity_api_key: str = ""
+    perplexity_mock_mode: bool = False  # explicit test mode: canned articles
 
     # App Settings
     secret_key: str = "your-secret-key-change-this"
@@ -28,6 +29,143 @@ class Settings(BaseSettings):
     max_articles_per_source: int = 50
     analysis_batch_size: int = 10
     content_cache_ttl: int = 3600
+    search_cache_size: int = 1000  # search results kept in memory
+
+    # Candidate selection (articles sent to analysis = max_articles * multiplier)
+    analysis_candidate_multiplier: float = 2.0
+    ranking_rrf_k: int = 60
+    ranking_recency_half_life_days: float = 3.0
+
+    # Adaptive analysis: stop once every section has enough relevant articles
+    adaptive_analysis: bool = True
+    max_articles_per_section: int = 5
+
+    # Local relevance prefilter (trained from stored LLM relevance scores)
+    relevance_prefilter_enabled: bool = True
+    relevance_prefilter_min_samples: int = 200
+    relevance_accept_margin: float = 0.15
+    relevance_reject_margin: float = 0.3
+    relevance_min_band_samples: int = 20
+    relevance_min_band_agreement: float = 0.95
+
+    # Local section classifier (train with train_section_classifier.py)
+    section_classifier_path: str = "./section_classifier.npz"
+    section_classifier_min_confidence: float = 0.85
+
+    # Shared article-level analysis cache (reused across users)
+    analysis_cache_size: int = 5000
+    analysis_cache_ttl: int = 7 * 24 * 3600
+
+    # Batch runs: one workflow per cohort of identical preferences + config
+    batch_concurrency: int = 3
+    batch_schedule_enabled: bool = False
+    batch_schedule_format: str = "daily"
+    batch_schedule_interval: int = 24 * 3600
+
+    # Search planning: canonical topics, shared across users and cached
+    max_search_topics: int = 10
+    search_concurrency: int = 4
+
+    # Shared article pool refreshed in the background; newsletters query it
+    article_pool_enabled: bool = False
+    article_pool_ingest_interval: int = 1800
+    article_pool_ingest_format: str = "weekly"
+    article_pool_retention_days: int = 35
+
+    # Incremental search: per-topic watermarks, re-runs answered from the store
+    incremental_search_enabled: bool = True
+    topic_refresh_interval: int = 3600
+    topic_seen_url_limit: int = 2000
+
+    # Stale-while-revalidate serving (opt-in per request with serve_stale=true)
+    newsletter_fresh_seconds: int = 15 * 60
+    newsletter_stale_seconds: int = 24 * 3600
+
+    # Perplexity failures: serve the last good results, back off with a breaker
+    perplexity_stale_max_age: int = 7 * 24 * 3600
+    perplexity_breaker_failures: int = 3
+    perplexity_breaker_cooldown: int = 120
+
+    # Shared per-provider rate limits (requests/tokens per minute)
+    openai_rpm: int = 500
+    openai_tpm: int = 200000
+    openai_max_concurrency: int = 8
+    perplexity_rpm: int = 50
+    perplexity_tpm: int = 1000000
+    perplexity_max_concurrency: int = 4
+    rate_limit_max_retries: int = 4
+    rate_limit_backoff_base: float = 0.5
+    rate_limit_backoff_cap: float = 30.0
+
+    # Hedged LLM requests (opt-in): duplicate calls slower than the percentile
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_max_rate: float = 0.05
+    llm_hedge_min_samples: int = 20
+    llm_hedge_window: int = 200
+
+    # Shared HTTP connection pools (one per upstream service)
+    http_timeout: float = 30.0
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 60.0
+    http2_enabled: bool = True  # used when the h2 package is installed
+
+    # Prompt token budgets: article tokens per section prompt, by format
+    section_token_budgets: Dict[str, int] = {
+        "daily": 900,
+        "weekly": 1500,
+        "monthly": 2200,
+        "custom": 1500,
+        "default": 1200,
+    }
+    prompt_min_summary_tokens: int = 30  # shorter summaries are dropped instead
+    # Hard ceiling on ranked articles offered to the packer per section
+    section_prompt_max_articles: int = 30
+    analysis_summary_max_tokens: int = 350
+
+    # Extractive pre-summarization of full article text (benchmark with
+    # bench_summarizer.py)
+    content_summary_tokens: int = 300
+    summarizer_max_sentences: int = 200
+    summarizer_cache_size: int = 5000
+
+    # Optional full-text enrichment of candidate articles
+    fulltext_enabled: bool = False
+    fulltext_concurrency: int = 16
+    fulltext_per_host: int = 2
+    fulltext_timeout: float = 10.0
+    fulltext_max_bytes: int = 2_000_000
+    fulltext_workers: int = 0  # extraction processes, 0 = one per CPU
+    fulltext_cache_dir: str = "./fulltext_cache"
+    fulltext_cache_ttl: int = 24 * 3600  # then revalidated with a conditional GET
+
+    # RSS/Atom feeds collected alongside Perplexity searches
+    feed_urls: List[str] = []
+    feed_poll_interval: int = 900
+    feed_timeout: float = 15.0
+    feed_max_entries: int = 50
+
+    # Article sources: registered connectors whose batches are merged as they
+    # arrive; limits are per source (concurrency, deadline seconds, quota)
+    article_sources: List[str] = ["perplexity", "feeds"]
+    source_limits: Dict[str, Dict[str, float]] = {
+        "perplexity": {"concurrency": 4, "deadline": 90, "quota": 200},
+        "feeds": {"concurrency": 8, "deadline": 20, "quota": 300},
+    }
+    source_buffer_batches: int = 8
+
+    # Newsletter layouts from templates/jinja instead of the built-in classes.
+    # Off by default: the classes render 4-8x faster (bench_templates.py);
+    # turn on to edit layouts without code changes
+    jinja_templates_enabled: bool = False
+    template_bytecode_cache_dir: str = "./.template_cache"  # "" disables
+    render_chunk_size: int = 8192  # characters per streamed response chunk
+    markdown_cache_size: int = 256  # rendered HTML documents kept in memory
+
+    # Content-addressed export files, gzip variants from this size
+    export_dir: str = "./exports"
+    export_gzip_min_bytes: int = 1024
 
     class Config:
         env_file = ".env"
@@ -8,7 +8,13 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from config import settings
-from models import UserPreferences, Newsletter, WorkflowState
+from models import (
+    UserPreferences,
+    Newsletter,
+    NewsletterConfig,
+    WorkflowState,
+    Article,
+)
 
 
 class Database:
@@ -64,8 +70,102 @@ class Database:
             """
             )
 
+            # LLM article analyses, used to train local models
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_analyses (
+                    content_hash TEXT PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    summary TEXT,
+                    source TEXT,
+                    relevance_score REAL,
+                    sentiment TEXT,
+                    impact_score INTEGER,
+                    urgency_score INTEGER,
+                    best_section TEXT,
+                    sections_key TEXT,
+                    analyzed_at TEXT
+                )
+            """
+            )
+            await self._ensure_column(db, "article_analyses", "sections_key", "TEXT")
+
+            # LLM section choices, one per article and offered section list
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_section_choices (
+                    content_hash TEXT,
+                    sections_key TEXT,
+                    best_section TEXT,
+                    PRIMARY KEY (content_hash, sections_key)
+                )
+            """
+            )
+            await self._ensure_column(db, "newsletters", "fingerprint", "TEXT")
+            await self._ensure_column(db, "newsletters", "renditions", "TEXT")
+
+            # Shared article pool filled by the background ingester
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_pool (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    published_at TEXT,
+                    ingested_at TEXT,
+                    data TEXT
+                )
+            """
+            )
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_article_pool_ingested ON article_pool (ingested_at)"
+            )
+
+            # Last good search results per topic, served when the API fails
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    topic TEXT PRIMARY KEY,
+                    articles TEXT,
+                    fetched_at TEXT
+                )
+            """
+            )
+
+            # Incremental search: per-topic watermarks and the articles seen so far
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS topic_watermarks (
+                    topic_key TEXT PRIMARY KEY,
+                    topic TEXT,
+                    newest_published_at TEXT,
+                    covered_from TEXT,
+                    last_searched_at TEXT,
+                    seen_urls TEXT
+                )
+            """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS topic_articles (
+                    topic_key TEXT,
+                    url TEXT,
+                    published_at TEXT,
+                    data TEXT,
+                    PRIMARY KEY (topic_key, url)
+                )
+            """
+            )
+
             await db.commit()
 
+    async def _ensure_column(self, db, table: str, column: str, column_type: str):
+        """Add a column to an existing table created by an older version"""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        columns = [row[1] for row in await cursor.fetchall()]
+        if column not in columns:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
     async def save_user_preferences(self, preferences: UserPreferences) -> bool:
         """Save user preferences"""
         try:
@@ -99,7 +199,20 @@ class Database:
             print(f"Error getting user preferences: {e}")
             return None
 
-    async def save_newsletter(self, newsletter: Newsletter) -> bool:
+    async def get_all_user_preferences(self) -> List[UserPreferences]:
+        """Get preferences for every user"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute("SELECT preferences FROM users ORDER BY id")
+                rows = await cursor.fetchall()
+                return [UserPreferences.model_validate_json(row[0]) for row in rows]
+        except Exception as e:
+            print(f"Error getting all user preferences: {e}")
+            return []
+
+    async def save_newsletter(
+        self, newsletter: Newsletter, fingerprint: Optional[str] = None
+    ) -> bool:
         """Save newsletter"""
         try:
             async with aiosqlite.connect(self.db_path) as db:
@@ -109,8 +222,8 @@ class Database:
                 await db.execute(
                     """
                     INSERT INTO newsletters 
-                    (id, user_id, title, content, config, sections, total_articles, generated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    (id, user_id, title, content, config, sections, total_articles, generated_at, fingerprint, renditions)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                     (
                         newsletter_id,
@@ -121,6 +234,8 @@ class Database:
                         json.dumps(newsletter.sections),
                         newsletter.total_articles,
                         newsletter.generated_at.isoformat(),
+                        fingerprint,
+                        json.dumps(newsletter.renditions),
                     ),
                 )
                 await db.commit()
@@ -129,6 +244,43 @@ class Database:
             print(f"Error saving newsletter: {e}")
             return False
 
+    async def get_latest_newsletter(
+        self, user_id: str, fingerprint: Optional[str] = None
+    ) -> Optional[Newsletter]:
+        """Get the user's most recent newsletter, optionally by fingerprint"""
+        query = """
+                    SELECT user_id, title, content, config, sections,
+                           total_articles, generated_at, renditions
+                    FROM newsletters
+                    WHERE user_id = ?{}
+                    ORDER BY generated_at DESC
+                    LIMIT 1
+                """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                if fingerprint is None:
+                    cursor = await db.execute(query.format(""), (user_id,))
+                else:
+                    cursor = await db.execute(
+                        query.format(" AND fingerprint = ?"), (user_id, fingerprint)
+                    )
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                return Newsletter(
+                    user_id=row[0],
+                    title=row[1],
+                    content=row[2],
+                    config=NewsletterConfig.model_validate_json(row[3]),
+                    sections=json.loads(row[4]),
+                    total_articles=row[5],
+                    generated_at=datetime.fromisoformat(row[6]),
+                    renditions=json.loads(row[7]) if row[7] else {},
+                )
+        except Exception as e:
+            print(f"Error getting latest newsletter: {e}")
+            return None
+
     async def get_user_newsletters(
         self, user_id: str, limit: int = 10
     ) -> List[Dict[str, Any]]:
@@ -160,6 +312,357 @@ class Database:
             print(f"Error getting newsletters: {e}")
             return []
 
+    async def save_article_analysis(
+        self, article: Article, analysis: Dict[str, Any], sections_key: str = ""
+    ) -> bool:
+        """Save an LLM analysis result for an article.
+
+        The article-level scores are replaced. A section choice (given with a
+        sections_key) is added next to those made for other section lists;
+        a save without one keeps the stored choices.
+        """
+        best_section = analysis.get("best_section") if sections_key else None
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute(
+                    """
+                    INSERT INTO article_analyses
+                    (content_hash, url, title, summary, source, relevance_score,
+                     sentiment, impact_score, urgency_score, best_section,
+                     sections_key, analyzed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (content_hash) DO UPDATE SET
+                        url = excluded.url,
+                        title = excluded.title,
+                        summary = excluded.summary,
+                        source = excluded.source,
+                        relevance_score = excluded.relevance_score,
+                        sentiment = excluded.sentiment,
+                        impact_score = excluded.impact_score,
+                        urgency_score = excluded.urgency_score,
+                        best_section = COALESCE(excluded.best_section, best_section),
+                        sections_key = CASE WHEN excluded.best_section IS NULL
+                            THEN sections_key ELSE excluded.sections_key END,
+                        analyzed_at = excluded.analyzed_at
+                """,
+                    (
+                        article.content_hash,
+                        str(article.url),
+                        article.title,
+                        article.summary,
+                        article.source,
+                        float(analysis["relevance_score"]),
+                        analysis.get("sentiment"),
+                        int(analysis.get("impact_score", 5)),
+                        int(analysis.get("urgency_score", 5)),
+                        best_section,
+                        sections_key,
+                        datetime.utcnow().isoformat(),
+                    ),
+                )
+                if best_section:
+                    await db.execute(
+                        """
+                        INSERT OR REPLACE INTO article_section_choices
+                        (content_hash, sections_key, best_section)
+                        VALUES (?, ?, ?)
+                    """,
+                        (article.content_hash, sections_key, best_section),
+                    )
+                await db.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving article analysis: {e}")
+            return False
+
+    async def get_article_analyses(self, limit: int = 20000) -> List[Dict[str, Any]]:
+        """Get the most recent stored article analyses"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute(
+                    """
+                    SELECT title, summary, source, relevance_score, sentiment,
+                           impact_score, urgency_score, best_section, analyzed_at
+                    FROM article_analyses
+                    ORDER BY analyzed_at DESC
+                    LIMIT ?
+                """,
+                    (limit,),
+                )
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting article analyses: {e}")
+            return []
+
+    async def get_section_choices(self, limit: int = 20000) -> List[Dict[str, Any]]:
+        """Get article texts with every stored LLM section choice"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute(
+                    """
+                    SELECT a.title, a.summary, a.source, c.best_section
+                    FROM article_section_choices c
+                    JOIN article_analyses a ON a.content_hash = c.content_hash
+                    UNION ALL
+                    SELECT a.title, a.summary, a.source, a.best_section
+                    FROM article_analyses a
+                    WHERE a.best_section IS NOT NULL AND NOT EXISTS (
+                        SELECT 1 FROM article_section_choices c
+                        WHERE c.content_hash = a.content_hash
+                          AND c.sections_key = a.sections_key
+                    )
+                    LIMIT ?
+                """,
+                    (limit,),
+                )
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting section choices: {e}")
+            return []
+
+    async def get_article_analysis(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the stored analysis for one article, with its section choices"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute(
+                    """
+                    SELECT relevance_score, sentiment, impact_score, urgency_score,
+                           best_section, sections_key, analyzed_at
+                    FROM article_analyses
+                    WHERE content_hash = ?
+                """,
+                    (content_hash,),
+                )
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+
+                analysis = dict(row)
+                # Rows saved before choices had their own table hold one
+                analysis["section_choices"] = (
+                    {row["sections_key"]: row["best_section"]}
+                    if row["sections_key"] and row["best_section"]
+                    else {}
+                )
+                cursor = await db.execute(
+                    """
+                    SELECT sections_key, best_section
+                    FROM article_section_choices
+                    WHERE content_hash = ?
+                """,
+                    (content_hash,),
+                )
+                for choice in await cursor.fetchall():
+                    analysis["section_choices"][choice[0]] = choice[1]
+                return analysis
+        except Exception as e:
+            print(f"Error getting article analysis: {e}")
+            return None
+
+    async def save_pool_articles(self, articles: List[Article]) -> bool:
+        """Insert or refresh articles in the shared pool"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                now = datetime.utcnow().isoformat()
+                await db.executemany(
+                    """
+                    INSERT OR REPLACE INTO article_pool
+                    (url, content_hash, published_at, ingested_at, data)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    [
+                        (
+                            str(article.url),
+                            article.content_hash,
+                            (
+                                article.published_at.isoformat()
+                                if article.published_at
+                                else None
+                            ),
+                            now,
+                            article.model_dump_json(),
+                        )
+                        for article in articles
+                    ],
+                )
+                await db.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving pool articles: {e}")
+            return False
+
+    async def get_pool_articles(self, since: datetime) -> List[Article]:
+        """Get pooled articles ingested since the given time"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    """
+                    SELECT data FROM article_pool
+                    WHERE ingested_at >= ?
+                    ORDER BY ingested_at
+                """,
+                    (since.isoformat(),),
+                )
+                rows = await cursor.fetchall()
+                return [Article.model_validate_json(row[0]) for row in rows]
+        except Exception as e:
+            print(f"Error getting pool articles: {e}")
+            return []
+
+    async def delete_pool_articles(self, before: datetime) -> int:
+        """Drop pooled articles ingested before the given time"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    "DELETE FROM article_pool WHERE ingested_at < ?",
+                    (before.isoformat(),),
+                )
+                await db.commit()
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error pruning article pool: {e}")
+            return 0
+
+    async def get_topic_watermark(self, topic_key: str) -> Optional[Dict[str, Any]]:
+        """Get the search watermark of one topic"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute(
+                    "SELECT * FROM topic_watermarks WHERE topic_key = ?", (topic_key,)
+                )
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                watermark = dict(row)
+                watermark["seen_urls"] = json.loads(watermark["seen_urls"] or "[]")
+                return watermark
+        except Exception as e:
+            print(f"Error getting topic watermark: {e}")
+            return None
+
+    async def save_topic_search(
+        self, watermark: Dict[str, Any], articles: List[Article]
+    ) -> bool:
+        """Save a topic's new articles and advance its watermark together"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.executemany(
+                    """
+                    INSERT OR REPLACE INTO topic_articles
+                    (topic_key, url, published_at, data)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    [
+                        (
+                            watermark["topic_key"],
+                            str(article.url),
+                            (
+                                article.published_at.isoformat()
+                                if article.published_at
+                                else None
+                            ),
+                            article.model_dump_json(),
+                        )
+                        for article in articles
+                    ],
+                )
+                await db.execute(
+                    """
+                    INSERT OR REPLACE INTO topic_watermarks
+                    (topic_key, topic, newest_published_at, covered_from,
+                     last_searched_at, seen_urls)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        watermark["topic_key"],
+                        watermark["topic"],
+                        watermark["newest_published_at"],
+                        watermark["covered_from"],
+                        watermark["last_searched_at"],
+                        json.dumps(watermark["seen_urls"]),
+                    ),
+                )
+                await db.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving topic search: {e}")
+            return False
+
+    async def get_topic_articles(
+        self, topic_key: str, since: Optional[datetime] = None
+    ) -> List[Article]:
+        """Get stored articles of a topic, optionally published since a time"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    """
+                    SELECT data FROM topic_articles
+                    WHERE topic_key = ?
+                      AND (? IS NULL OR published_at IS NULL OR published_at >= ?)
+                    ORDER BY published_at DESC
+                """,
+                    (
+                        topic_key,
+                        since.isoformat() if since else None,
+                        since.isoformat() if since else None,
+                    ),
+                )
+                rows = await cursor.fetchall()
+                return [Article.model_validate_json(row[0]) for row in rows]
+        except Exception as e:
+            print(f"Error getting topic articles: {e}")
+            return []
+
+    async def save_search_results(self, topic: str, articles: List[Article]) -> bool:
+        """Save the latest successful search results of a topic"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute(
+                    """
+                    INSERT OR REPLACE INTO search_results (topic, articles, fetched_at)
+                    VALUES (?, ?, ?)
+                """,
+                    (
+                        topic,
+                        json.dumps(
+                            [article.model_dump(mode="json") for article in articles]
+                        ),
+                        datetime.utcnow().isoformat(),
+                    ),
+                )
+                await db.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving search results: {e}")
+            return False
+
+    async def get_search_results(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Get the last successful search results of a topic"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    "SELECT articles, fetched_at FROM search_results WHERE topic = ?",
+                    (topic,),
+                )
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                return {
+                    "articles": [
+                        Article.model_validate(item) for item in json.loads(row[0])
+                    ],
+                    "fetched_at": datetime.fromisoformat(row[1]),
+                }
+        except Exception as e:
+            print(f"Error getting search results: {e}")
+            return None
+
 
 # Global database instance
 db = Database()
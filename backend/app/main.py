@@ -11,6 +11,11 @@ from database import db
 from api.newsletter import router as newsletter_router
 from api.users import router as users_router
 from api.export import router as export_router
+from agents.batch_scheduler import batch_scheduler
+from agents.article_ingester import article_ingester
+from tools.article_pool import article_pool
+from tools.http_clients import close_http_clients
+from tools.fulltext_fetcher import fulltext_fetcher
 
 
 @asynccontextmanager
@@ -20,10 +25,21 @@ async def lifespan(app: FastAPI):
     await db.initialize()
     print("✅ Database initialized")
 
+    if settings.article_pool_enabled:
+        await article_pool.load()
+        article_ingester.start()
+
+    if settings.batch_schedule_enabled:
+        batch_scheduler.start()
+
     yield
 
     # Shutdown
     print("👋 Shutting down...")
+    await batch_scheduler.stop()
+    await article_ingester.stop()
+    await close_http_clients()
+    fulltext_fetcher.close()
 
 
 def create_app() -> FastAPI:
@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field, HttpUrl
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from enum import Enum
+import hashlib
 
 
 class NewsletterFormat(str, Enum):
@@ -75,6 +76,26 @@ class Article(BaseModel):
     fetched_at: datetime = Field(default_factory=datetime.utcnow)
     topic: Optional[str] = None
     quality_score: float = 0.0
+    stale: bool = False  # served from the last good search after a failure
+
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the article identity and text"""
+        raw = f"{self.url}|{self.title.strip()}|{self.summary.strip()}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ArticleAnalysis(BaseModel):
+    """User-independent analysis of an article, shared across users"""
+
+    relevance_score: float
+    sentiment: str
+    impact_score: int
+    urgency_score: int
+    section_choices: Dict[str, str] = Field(
+        default_factory=dict
+    )  # sections_key -> best_section chosen for that section list
+    analyzed_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class AnalyzedArticle(BaseModel):
@@ -100,6 +121,8 @@ class Newsletter(BaseModel):
     total_articles: int
     sections: Dict[str, str]  # section_name -> content
     generated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Document rendered from content by format (html, text, json)
+    renditions: Dict[str, str] = Field(default_factory=dict)
 
     @property
     def summary_stats(self) -> Dict[str, Any]:
@@ -3,10 +3,88 @@ Newsletter template system for flexible formatting
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 from datetime import datetime
-
-from models import NewsletterFormat, TemplateType
+from functools import partial
+import os
+
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+    select_autoescape,
+)
+
+from config import settings
+from models import (
+    Newsletter,
+    NewsletterConfig,
+    NewsletterFormat,
+    TemplateType,
+    UserPreferences,
+)
+
+JINJA_TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "jinja")
+_environment: Optional[Environment] = None
+
+
+def jinja_environment() -> Environment:
+    """The shared Jinja2 environment (templates compile once per process)"""
+    global _environment
+    if _environment is None:
+        bytecode_cache = None
+        if settings.template_bytecode_cache_dir:
+            os.makedirs(settings.template_bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(
+                settings.template_bytecode_cache_dir
+            )
+        _environment = Environment(
+            loader=FileSystemLoader(JINJA_TEMPLATE_DIR),
+            bytecode_cache=bytecode_cache,
+            # Markdown layouts are emitted verbatim; HTML/XML ones are escaped
+            autoescape=select_autoescape(
+                enabled_extensions=("html", "html.j2", "xml", "xml.j2"),
+                default_for_string=False,
+            ),
+            trim_blocks=True,
+            undefined=StrictUndefined,
+            auto_reload=False,
+        )
+    return _environment
+
+
+def newsletter_title(config: NewsletterConfig) -> str:
+    """Heading the templates put on top of an issue"""
+    return f"AI Watchtower {config.format.value.title()} Brief"
+
+
+def newsletter_context(
+    newsletter: Newsletter, user_preferences: Optional[UserPreferences] = None
+) -> Dict[str, Any]:
+    """Template context that re-renders a stored newsletter"""
+    return {
+        "title": newsletter_title(newsletter.config),
+        "sections": newsletter.sections,
+        "config": newsletter.config,
+        "user_preferences": user_preferences,
+        "total_articles": newsletter.total_articles,
+        "generated_at": newsletter.generated_at,
+    }
+
+
+def buffered_chunks(chunks: Iterable[str], size: Optional[int] = None) -> Iterator[str]:
+    """Regroup small rendered pieces into chunks of at least `size` characters"""
+    size = size or settings.render_chunk_size
+    buffer, buffered = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
 
 
 class NewsletterTemplate(ABC):
@@ -15,9 +93,13 @@ class NewsletterTemplate(ABC):
     def __init__(self, format_type: NewsletterFormat):
         self.format_type = format_type
 
-    @abstractmethod
     def render(self, content: Dict[str, Any]) -> str:
         """Render newsletter content"""
+        return "".join(self.render_chunks(content))
+
+    @abstractmethod
+    def render_chunks(self, content: Dict[str, Any]) -> Iterator[str]:
+        """Render newsletter content piece by piece (header, sections, ...)"""
         pass
 
     def _format_header(self, title: str, generated_at: datetime) -> str:
@@ -47,24 +129,19 @@ class NewsletterTemplate(ABC):
 class ProfessionalTemplate(NewsletterTemplate):
     """Professional newsletter template"""
 
-    def render(self, content: Dict[str, Any]) -> str:
+    def render_chunks(self, content: Dict[str, Any]) -> Iterator[str]:
         """Render professional newsletter"""
         sections = content.get("sections", {})
         config = content.get("config")
 
-        # Build newsletter content
-        newsletter_content = []
-
         # Header
-        newsletter_content.append(
-            self._format_header(
-                content.get("title", "AI Watchtower Newsletter"),
-                content.get("generated_at", datetime.utcnow()),
-            )
+        yield self._format_header(
+            content.get("title", "AI Watchtower Newsletter"),
+            content.get("generated_at", datetime.utcnow()),
         )
 
         # Introduction
-        newsletter_content.append(
+        yield (
             f"""## Executive Summary
 
 Welcome to your {config.format.value} AI Watchtower briefing. This edition covers {content.get('total_articles', 0)} carefully curated articles spanning {len(sections)} key areas of AI development and governance.
@@ -74,25 +151,21 @@ Welcome to your {config.format.value} AI Watchtower briefing. This edition cover
 
         # Sections
         for section_name, section_content in sections.items():
-            newsletter_content.append(f"## {section_name}\n\n{section_content}\n\n")
+            yield f"## {section_name}\n\n{section_content}\n\n"
 
         # Footer
-        newsletter_content.append(self._format_footer())
-
-        return "".join(newsletter_content)
+        yield self._format_footer()
 
 
 class BriefTemplate(NewsletterTemplate):
     """Brief newsletter template"""
 
-    def render(self, content: Dict[str, Any]) -> str:
+    def render_chunks(self, content: Dict[str, Any]) -> Iterator[str]:
         """Render brief newsletter"""
         sections = content.get("sections", {})
 
-        newsletter_content = []
-
         # Compact header
-        newsletter_content.append(
+        yield (
             f"""# {content.get("title", "AI Watchtower Brief")}
 
 *{content.get("total_articles", 0)} articles • {content.get("generated_at", datetime.utcnow()).strftime("%b %d, %Y")}*
@@ -102,33 +175,27 @@ class BriefTemplate(NewsletterTemplate):
 
         # Compact sections
         for section_name, section_content in sections.items():
-            newsletter_content.append(f"**{section_name}**\n{section_content}\n\n")
-
-        return "".join(newsletter_content)
+            yield f"**{section_name}**\n{section_content}\n\n"
 
 
 class DetailedTemplate(NewsletterTemplate):
     """Detailed newsletter template"""
 
-    def render(self, content: Dict[str, Any]) -> str:
+    def render_chunks(self, content: Dict[str, Any]) -> Iterator[str]:
         """Render detailed newsletter"""
         sections = content.get("sections", {})
         config = content.get("config")
         user_preferences = content.get("user_preferences")
 
-        newsletter_content = []
-
         # Detailed header
-        newsletter_content.append(
-            self._format_header(
-                content.get("title", "AI Watchtower Newsletter"),
-                content.get("generated_at", datetime.utcnow()),
-            )
+        yield self._format_header(
+            content.get("title", "AI Watchtower Newsletter"),
+            content.get("generated_at", datetime.utcnow()),
         )
 
         # Personalization info
         if user_preferences:
-            newsletter_content.append(
+            yield (
                 f"""## Personalization Summary
 
 This newsletter was tailored based on your preferences:
@@ -141,16 +208,16 @@ This newsletter was tailored based on your preferences:
             )
 
         # Table of contents
-        newsletter_content.append("## Table of Contents\n\n")
+        yield "## Table of Contents\n\n"
         for i, section_name in enumerate(sections.keys(), 1):
-            newsletter_content.append(
+            yield (
                 f"{i}. [{section_name}](#{section_name.lower().replace(' ', '-')})\n"
             )
-        newsletter_content.append("\n")
+        yield "\n"
 
         # Detailed sections
         for section_name, section_content in sections.items():
-            newsletter_content.append(
+            yield (
                 f"""## {section_name}
 
 {section_content}
@@ -161,7 +228,7 @@ This newsletter was tailored based on your preferences:
             )
 
         # Footer with stats
-        newsletter_content.append(
+        yield (
             f"""## Newsletter Statistics
 
 - **Total Articles Processed**: {content.get('total_articles', 0)}
@@ -173,24 +240,109 @@ This newsletter was tailored based on your preferences:
 """
         )
 
-        newsletter_content.append(self._format_footer())
+        yield self._format_footer()
+
+
+class JinjaTemplate(NewsletterTemplate):
+    """Template defined by a Jinja2 file in templates/jinja (or a string)"""
+
+    def __init__(
+        self,
+        format_type: NewsletterFormat,
+        template_name: Optional[str] = None,
+        source: Optional[str] = None,
+    ):
+        super().__init__(format_type)
+        environment = jinja_environment()
+        if source is not None:
+            self.template = environment.from_string(source)
+        else:
+            self.template = environment.get_template(template_name)
+
+    def render(self, content: Dict[str, Any]) -> str:
+        """Render newsletter"""
+        return self.template.render(self._context(content))
+
+    def render_chunks(self, content: Dict[str, Any]) -> Iterator[str]:
+        """Render newsletter as Jinja2 produces it (many small pieces)"""
+        return self.template.generate(self._context(content))
+
+    def _context(self, content: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "sections": {},
+            "total_articles": 0,
+            "generated_at": datetime.utcnow(),
+            "config": None,
+            "user_preferences": None,
+            "format_type": self.format_type,
+            **content,
+        }
+
 
-        return "".join(newsletter_content)
+TemplateConstructor = Callable[[NewsletterFormat], NewsletterTemplate]
 
 
 class NewsletterTemplateFactory:
-    """Factory for creating newsletter templates"""
+    """Factory for creating newsletter templates
+
+    Instances are cached per (template, format), and new template types can
+    be registered at runtime, as classes or as Jinja2 templates.
+    """
 
     def __init__(self):
-        self.templates = {
-            TemplateType.PROFESSIONAL: ProfessionalTemplate,
-            TemplateType.BRIEF: BriefTemplate,
-            TemplateType.DETAILED: DetailedTemplate,
+        self.templates: Dict[str, TemplateConstructor] = {
+            TemplateType.PROFESSIONAL.value: ProfessionalTemplate,
+            TemplateType.BRIEF.value: BriefTemplate,
+            TemplateType.DETAILED.value: DetailedTemplate,
+        }
+        self.instances: Dict[Tuple[str, str], NewsletterTemplate] = {}
+        if settings.jinja_templates_enabled:
+            for template_type in TemplateType:
+                self.register_jinja_template(
+                    template_type.value, f"{template_type.value}.md.j2"
+                )
+
+    def register_template(self, name: str, constructor: TemplateConstructor):
+        """Add or replace a template type (constructor takes the format)"""
+        self.templates[name] = constructor
+        self.instances = {
+            key: template for key, template in self.instances.items() if key[0] != name
         }
 
+    def register_jinja_template(
+        self,
+        name: str,
+        template_name: Optional[str] = None,
+        source: Optional[str] = None,
+        html: bool = False,
+    ):
+        """Add a Jinja2 template type from a file in templates/jinja or a string
+
+        Files ending in .html.j2 are autoescaped; string sources are only
+        escaped when html=True.
+        """
+        if source is not None and html:
+            source = f"{{% autoescape true %}}{source}{{% endautoescape %}}"
+        self.register_template(
+            name, partial(JinjaTemplate, template_name=template_name, source=source)
+        )
+
     def get_template(
-        self, template_type: TemplateType, format_type: NewsletterFormat
+        self,
+        template_type: Union[TemplateType, str],
+        format_type: NewsletterFormat,
     ) -> NewsletterTemplate:
         """Get template instance"""
-        template_class = self.templates.get(template_type, ProfessionalTemplate)
-        return template_class(format_type)
+        name = getattr(template_type, "value", template_type)
+        key = (name, getattr(format_type, "value", format_type))
+        template = self.instances.get(key)
+        if template is None:
+            constructor = self.templates.get(
+                name, self.templates[TemplateType.PROFESSIONAL.value]
+            )
+            template = self.instances[key] = constructor(format_type)
+        return template
+
+
+# Global template factory instance
+template_factory = NewsletterTemplateFactory()
@@ -0,0 +1,164 @@
+# File: app/tools/analysis_cache.py
+"""
+Shared cache for the article-level analysis stage
+"""
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+
+from config import settings
+from database import db
+from models import Article, ArticleAnalysis
+
+
+def sections_key(sections: List[str]) -> str:
+    """Order-independent key for a list of section names"""
+    joined = "\n".join(sorted(section.strip().lower() for section in sections))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:16]
+
+
+class ArticleAnalysisCache:
+    """Analyze each article once, no matter how many users need it.
+
+    Relevance, sentiment, impact and urgency only depend on the article, so
+    they are cached by content hash. The LLM's section choice also depends on
+    the offered section list and is cached per sections key. Concurrent
+    requests for the same article share a single in-flight LLM call.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.analysis_cache_size
+        self.ttl = timedelta(seconds=settings.analysis_cache_ttl)
+        self.entries: "OrderedDict[str, ArticleAnalysis]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.waiters: Dict[str, int] = {}
+        self.stats = {"hits": 0, "db_hits": 0, "misses": 0, "inflight_joins": 0}
+
+    async def lookup(
+        self, article: Article, sections: List[str], need_section: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached shared analysis, or None if the LLM is needed"""
+        skey = sections_key(sections)
+        entry = await self._lookup(article.content_hash)
+        if entry and (not need_section or skey in entry.section_choices):
+            self.stats["hits"] += 1
+            return self._to_result(entry, skey)
+        return None
+
+    async def analyze(
+        self,
+        article: Article,
+        sections: List[str],
+        analyze: Callable[[bool], Awaitable[Dict[str, Any]]],
+        need_section: bool = True,
+    ) -> Dict[str, Any]:
+        """Run analyze(assign_section) once per article and store the result"""
+        skey = sections_key(sections)
+        flight_key = f"{article.content_hash}:{skey if need_section else '*'}"
+
+        task = self.inflight.get(flight_key)
+        if task:
+            self.stats["inflight_joins"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.create_task(
+                self._analyze_and_store(article, skey, analyze, need_section)
+            )
+            self.inflight[flight_key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(flight_key, None))
+
+        self.waiters[flight_key] = self.waiters.get(flight_key, 0) + 1
+        try:
+            return dict(await asyncio.shield(task))
+        except asyncio.CancelledError:
+            # Only cancel the LLM call once nobody is waiting for it any more
+            if self.waiters.get(flight_key, 0) <= 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self.waiters[flight_key] -= 1
+            if not self.waiters[flight_key]:
+                del self.waiters[flight_key]
+
+    async def _analyze_and_store(
+        self,
+        article: Article,
+        skey: str,
+        analyze: Callable[[bool], Awaitable[Dict[str, Any]]],
+        need_section: bool,
+    ) -> Dict[str, Any]:
+        result = await analyze(need_section)
+        if result.get("failed"):
+            return result
+
+        entry = self.entries.get(article.content_hash)
+        section_choices = dict(entry.section_choices) if entry else {}
+        if need_section and result.get("best_section"):
+            section_choices[skey] = result["best_section"]
+
+        self._store(
+            article.content_hash,
+            ArticleAnalysis(
+                relevance_score=result["relevance_score"],
+                sentiment=result["sentiment"],
+                impact_score=result["impact_score"],
+                urgency_score=result["urgency_score"],
+                section_choices=section_choices,
+            ),
+        )
+        await db.save_article_analysis(
+            article, result, sections_key=skey if need_section else ""
+        )
+        return result
+
+    async def _lookup(self, key: str) -> Optional[ArticleAnalysis]:
+        """Memory first, then the database"""
+        entry = self.entries.get(key)
+        if entry is None:
+            row = await db.get_article_analysis(key)
+            if row:
+                self.stats["db_hits"] += 1
+                entry = ArticleAnalysis(
+                    relevance_score=row["relevance_score"],
+                    sentiment=row["sentiment"] or "neutral",
+                    impact_score=row["impact_score"],
+                    urgency_score=row["urgency_score"],
+                    section_choices=row["section_choices"],
+                    analyzed_at=datetime.fromisoformat(row["analyzed_at"]),
+                )
+                self._store(key, entry)
+
+        if entry and datetime.utcnow() - entry.analyzed_at > self.ttl:
+            self.entries.pop(key, None)
+            return None
+        if entry:
+            self.entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: ArticleAnalysis):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _to_result(self, entry: ArticleAnalysis, skey: str) -> Dict[str, Any]:
+        result = {
+            "relevance_score": entry.relevance_score,
+            "sentiment": entry.sentiment,
+            "impact_score": entry.impact_score,
+            "urgency_score": entry.urgency_score,
+            "explanation": "Shared analysis cache",
+        }
+        if skey in entry.section_choices:
+            result["best_section"] = entry.section_choices[skey]
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hit and in-flight sharing counters"""
+        return {**self.stats, "entries": len(self.entries)}
+
+
+# Process-wide cache shared by every workflow
+analysis_cache = ArticleAnalysisCache()
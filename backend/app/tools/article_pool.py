@@ -0,0 +1,116 @@
+# File: app/tools/article_pool.py
+"""
+Shared, deduplicated article pool queried at newsletter time
+"""
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from config import settings
+from database import db
+from models import Article, UserPreferences
+from tools.relevance_model import tokenize
+
+
+class ArticlePool:
+    """Articles collected by the ingester, shared by every newsletter"""
+
+    def __init__(self):
+        self.articles: Dict[str, Article] = {}
+        self.last_ingest: Optional[datetime] = None
+        self.stats = {"queries": 0, "served": 0, "added": 0, "pruned": 0}
+
+    async def load(self):
+        """Warm the in-memory pool from the database"""
+        since = datetime.utcnow() - timedelta(days=settings.article_pool_retention_days)
+        for article in await db.get_pool_articles(since):
+            self.articles[self._key(article)] = article
+        print(f"✅ Article pool loaded ({len(self.articles)} articles)")
+
+    @property
+    def ready(self) -> bool:
+        """True while the pool is kept fresh by the ingester"""
+        if self.last_ingest is None:
+            return False
+        max_age = timedelta(seconds=2 * settings.article_pool_ingest_interval)
+        return datetime.utcnow() - self.last_ingest <= max_age
+
+    async def add(self, articles: List[Article]) -> List[Article]:
+        """Add articles, returning the ones that were not pooled yet"""
+        new_articles = []
+        for article in articles:
+            key = self._key(article)
+            if key not in self.articles:
+                new_articles.append(article)
+            self.articles[key] = article
+
+        if articles:
+            await db.save_pool_articles(articles)
+        self.stats["added"] += len(new_articles)
+        return new_articles
+
+    def query(
+        self, preferences: UserPreferences, date_range: Optional[Dict[str, str]] = None
+    ) -> List[Article]:
+        """Pooled articles in the date range that match the user's interests"""
+        self.stats["queries"] += 1
+        start = end = None
+        if date_range:
+            start = datetime.strptime(date_range["start"], "%Y-%m-%d")
+            end = datetime.strptime(date_range["end"], "%Y-%m-%d") + timedelta(days=1)
+
+        terms = {
+            token
+            for term in preferences.keywords + preferences.industry_focus
+            for token in tokenize(term)
+        }
+        excluded = set(preferences.excluded_sources)
+
+        matches = []
+        for article in self.articles.values():
+            if article.source in excluded:
+                continue
+            if start and article.published_at:
+                if not start <= article.published_at < end:
+                    continue
+            if terms and not terms & set(
+                tokenize(f"{article.title} {article.summary}")
+            ):
+                continue
+            # Copies: workflows score and annotate their own articles
+            matches.append(article.model_copy())
+
+        self.stats["served"] += len(matches)
+        return matches
+
+    async def prune(self) -> int:
+        """Drop articles older than the retention window"""
+        cutoff = datetime.utcnow() - timedelta(
+            days=settings.article_pool_retention_days
+        )
+        stale = [
+            key for key, article in self.articles.items() if article.fetched_at < cutoff
+        ]
+        for key in stale:
+            del self.articles[key]
+
+        await db.delete_pool_articles(cutoff)
+        self.stats["pruned"] += len(stale)
+        return len(stale)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size, freshness and query counters"""
+        return {
+            **self.stats,
+            "articles": len(self.articles),
+            "ready": self.ready,
+            "last_ingest": self.last_ingest.isoformat() if self.last_ingest else None,
+        }
+
+    def _key(self, article: Article) -> str:
+        parsed = urlparse(str(article.url))
+        return f"{parsed.netloc}{parsed.path}".lower().rstrip("/")
+
+
+# Process-wide pool shared by every workflow
+article_pool = ArticlePool()
@@ -0,0 +1,146 @@
+# File: app/tools/article_ranker.py
+"""
+Cheap pre-analysis ranking of collected articles
+"""
+from typing import List, Dict, Optional
+from datetime import datetime
+from collections import defaultdict
+import math
+
+from config import settings
+from models import Article, UserPreferences, NewsletterConfig
+
+
+class ArticleRanker:
+    """Rank candidates with local signals before any LLM call is made"""
+
+    def __init__(self, rrf_k: Optional[int] = None):
+        self.rrf_k = rrf_k if rrf_k is not None else settings.ranking_rrf_k
+
+    def candidate_budget(self, config: NewsletterConfig) -> int:
+        """Number of articles that may be sent to LLM analysis"""
+        return max(
+            config.max_articles,
+            math.ceil(config.max_articles * settings.analysis_candidate_multiplier),
+        )
+
+    def select_candidates(
+        self,
+        articles: List[Article],
+        preferences: UserPreferences,
+        config: NewsletterConfig,
+    ) -> List[Article]:
+        """Rank articles and keep only the analysis budget, best first"""
+        ranked = self.rank(articles, preferences, config)
+        budget = self.candidate_budget(config)
+        if len(ranked) > budget:
+            print(
+                f"✂️ Candidate budget: keeping {budget}/{len(ranked)} articles for analysis"
+            )
+        return ranked[:budget]
+
+    def rank(
+        self,
+        articles: List[Article],
+        preferences: UserPreferences,
+        config: NewsletterConfig,
+    ) -> List[Article]:
+        """Order articles by reciprocal-rank fusion of cheap signals.
+
+        Each topic is ranked separately on every signal, so the best article of
+        every topic lands near the top before any topic gets a second slot.
+        """
+        if not articles:
+            return []
+
+        reference = self._reference_time(config)
+        signals = {
+            id(article): {
+                "quality": article.quality_score,
+                "personalization": self.personalization_score(article, preferences),
+                "recency": self.recency_score(article, reference),
+            }
+            for article in articles
+        }
+
+        by_topic: Dict[str, List[Article]] = defaultdict(list)
+        for article in articles:
+            by_topic[article.topic or ""].append(article)
+
+        fused: Dict[int, float] = defaultdict(float)
+        for topic_articles in by_topic.values():
+            for signal in ("quality", "personalization", "recency"):
+                ordered = sorted(
+                    topic_articles,
+                    key=lambda a: signals[id(a)][signal],
+                    reverse=True,
+                )
+                for rank, article in enumerate(ordered, 1):
+                    fused[id(article)] += 1.0 / (self.rrf_k + rank)
+
+        # Stable tie-break on the raw signals keeps the order deterministic
+        return sorted(
+            articles,
+            key=lambda a: (
+                fused[id(a)],
+                signals[id(a)]["personalization"],
+                signals[id(a)]["quality"],
+                signals[id(a)]["recency"],
+            ),
+            reverse=True,
+        )
+
+    def personalization_score(
+        self, article: Article, preferences: UserPreferences
+    ) -> float:
+        """Calculate personalization score based on user preferences"""
+        title_summary = (article.title + " " + article.summary).lower()
+
+        # Keyword matching
+        keyword_matches = sum(
+            1 for keyword in preferences.keywords if keyword.lower() in title_summary
+        )
+        keyword_score = (
+            min(keyword_matches / max(len(preferences.keywords), 1), 1.0)
+            if preferences.keywords
+            else 0.5
+        )
+
+        # Source preference
+        source_score = 1.0 if article.source in preferences.preferred_sources else 0.5
+        if article.source in preferences.excluded_sources:
+            source_score = 0.0
+
+        # Industry relevance
+        industry_matches = sum(
+            1
+            for industry in preferences.industry_focus
+            if industry.lower() in title_summary
+        )
+        industry_score = (
+            min(industry_matches / max(len(preferences.industry_focus), 1), 1.0)
+            if preferences.industry_focus
+            else 0.5
+        )
+
+        score = keyword_score * 0.4 + source_score * 0.3 + industry_score * 0.3
+        return min(score, 1.0)
+
+    def recency_score(self, article: Article, reference: datetime) -> float:
+        """Score 1.0 for brand-new articles, halving every few days"""
+        if not article.published_at:
+            return 0.5
+
+        published_at = article.published_at.replace(tzinfo=None)
+        age_days = max((reference - published_at).total_seconds() / 86400, 0.0)
+        return 0.5 ** (age_days / settings.ranking_recency_half_life_days)
+
+    def _reference_time(self, config: NewsletterConfig) -> datetime:
+        """Use the end of the requested window, or now"""
+        end = (config.date_range or {}).get("end")
+        if end:
+            try:
+                return datetime.strptime(end, "%Y-%m-%d")
+            except ValueError:
+                pass
+        return datetime.utcnow()
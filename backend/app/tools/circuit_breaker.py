@@ -0,0 +1,76 @@
+# File: app/tools/circuit_breaker.py
+"""
+Circuit breaker for flaky external APIs
+"""
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling a failing service for a cool-down, then probe it once.
+
+    closed:    calls go through; consecutive failures are counted
+    open:      calls are refused until the cool-down has passed
+    half_open: a single probe call is allowed; success closes the
+               breaker, failure opens it for another cool-down
+    """
+
+    def __init__(self, name: str, failure_threshold: int, cooldown_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = timedelta(seconds=cooldown_seconds)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[datetime] = None
+        self.probe_in_flight = False
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        """True if a call may be made now"""
+        if self.state == OPEN:
+            if datetime.utcnow() - self.opened_at < self.cooldown:
+                self.stats["rejected"] += 1
+                return False
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                self.stats["rejected"] += 1
+                return False
+            self.probe_in_flight = True
+
+        self.stats["calls"] += 1
+        return True
+
+    def record_success(self):
+        """Close the breaker after a successful call"""
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failure, opening the breaker at the threshold"""
+        self.stats["failures"] += 1
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.stats["opened"] += 1
+                print(
+                    f"⚡ Circuit '{self.name}' opened for {self.cooldown.total_seconds():.0f}s"
+                )
+            self.state = OPEN
+            self.opened_at = datetime.utcnow()
+            self.probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current state and call counters"""
+        return {
+            **self.stats,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+        }
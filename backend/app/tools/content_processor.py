@@ -11,10 +11,6 @@ from models import Article, UserPreferences
 class ContentProcessor:
     """Content processing and validation utilities"""
 
-    def __init__(self):
-        self.seen_urls: Set[str] = set()
-        self.seen_titles: Set[str] = set()
-
     async def initialize(self):
         """Initialize the processor"""
         pass
@@ -23,14 +19,18 @@ class ContentProcessor:
         """Remove duplicate articles based on URL and title similarity"""
         unique_articles = []
 
+        # Seen sets are per call: the processor is shared by every workflow
+        seen_urls: Set[str] = set()
+        seen_titles: Set[str] = set()
+
         for article in articles:
             url_key = self._normalize_url(str(article.url))
             title_key = self._normalize_title(article.title)
 
-            if url_key not in self.seen_urls and title_key not in self.seen_titles:
+            if url_key not in seen_urls and title_key not in seen_titles:
                 unique_articles.append(article)
-                self.seen_urls.add(url_key)
-                self.seen_titles.add(title_key)
+                seen_urls.add(url_key)
+                seen_titles.add(title_key)
 
         return unique_articles
 
@@ -0,0 +1,245 @@
+# File: app/tools/fulltext_fetcher.py
+"""
+Concurrent full-text fetching and main-text extraction for articles
+"""
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+import asyncio
+import hashlib
+import json
+import os
+
+from bs4 import BeautifulSoup
+import httpx
+
+from config import settings
+from models import Article
+from tools.http_clients import get_web_client
+
+# Elements that never hold the article body
+NOISE_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "iframe",
+    "svg",
+    "button",
+]
+MIN_PARAGRAPH_CHARS = 40
+
+
+def extract_main_text(html: str) -> str:
+    """Main article text of an HTML page (runs in a worker process).
+
+    Uses <article> or <main> when present, otherwise the element holding
+    the most paragraph text. Short paragraphs (bylines, captions, share
+    links) are dropped.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+
+    container = soup.find("article") or soup.find("main")
+    if container is None:
+        best_length = 0
+        for paragraph in soup.find_all("p"):
+            parent = paragraph.parent
+            length = sum(
+                len(p.get_text()) for p in parent.find_all("p", recursive=False)
+            )
+            if length > best_length:
+                container, best_length = parent, length
+    if container is None:
+        container = soup.body or soup
+
+    paragraphs = [
+        " ".join(p.get_text(" ").split()) for p in container.find_all(["p", "li"])
+    ]
+    return "\n\n".join(p for p in paragraphs if len(p) >= MIN_PARAGRAPH_CHARS)
+
+
+class FullTextFetcher:
+    """Download article pages and fill Article.content.
+
+    Downloads share one pooled client and are bounded globally and per
+    host. HTML is parsed in a process pool so extraction never blocks the
+    event loop. Extracted text is cached on disk by URL. Entries younger
+    than fulltext_cache_ttl are used as is; older ones are revalidated with
+    If-None-Match / If-Modified-Since, and a 304 keeps the cached text.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or settings.fulltext_cache_dir
+        self.semaphore = asyncio.Semaphore(settings.fulltext_concurrency)
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "fetched": 0,
+            "cache_hits": 0,
+            "revalidated": 0,
+            "failures": 0,
+            "skipped": 0,
+            "bytes": 0,
+        }
+
+    async def enrich(self, articles: List[Article]) -> List[Article]:
+        """Copies of the articles with content filled where a page was found"""
+        texts = await asyncio.gather(
+            *[self.fetch_text(str(article.url)) for article in articles]
+        )
+        enriched = []
+        for article, text in zip(articles, texts):
+            if text and len(text) > len(article.summary):
+                article = article.model_copy(update={"content": text})
+            enriched.append(article)
+
+        filled = sum(1 for article in enriched if article.content)
+        print(f"📄 Full text available for {filled}/{len(articles)} articles")
+        return enriched
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Extracted main text of a page, from the cache when possible"""
+        cached = await asyncio.to_thread(self._read_cache, url)
+        if cached and self._age(cached) < settings.fulltext_cache_ttl:
+            self.stats["cache_hits"] += 1
+            return cached["text"]
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            async with self.semaphore, self._host_semaphore(url):
+                async with get_web_client().stream(
+                    "GET", url, headers=headers, timeout=settings.fulltext_timeout
+                ) as response:
+                    body = await self._read_page(response)
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"⚠️ Full-text fetch failed for {url}: {e}")
+            # An old copy is better than none
+            return cached["text"] if cached else None
+
+        if response.status_code == 304 and cached:
+            self.stats["revalidated"] += 1
+            cached["fetched_at"] = datetime.utcnow().isoformat()
+            await asyncio.to_thread(self._write_cache, url, cached)
+            return cached["text"]
+
+        if body is None:
+            self.stats["skipped"] += 1
+            return cached["text"] if cached else None
+
+        self.stats["fetched"] += 1
+        self.stats["bytes"] += len(body)
+        try:
+            page = body.decode(response.encoding or "utf-8", errors="replace")
+            text = await asyncio.get_running_loop().run_in_executor(
+                self._executor(), extract_main_text, page
+            )
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"⚠️ Full-text extraction failed for {url}: {e}")
+            return None
+
+        await asyncio.to_thread(
+            self._write_cache,
+            url,
+            {
+                "url": url,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "fetched_at": datetime.utcnow().isoformat(),
+                "text": text,
+            },
+        )
+        return text
+
+    async def _read_page(self, response: httpx.Response) -> Optional[bytes]:
+        """Body of an HTML page, or None if it is not one or too large.
+
+        The size limit is checked against Content-Length first and then while
+        reading, so an oversized page is abandoned without downloading it.
+        """
+        content_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or "html" not in content_type:
+            return None
+        length = response.headers.get("content-length", "")
+        if length.isdigit() and int(length) > settings.fulltext_max_bytes:
+            return None
+
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > settings.fulltext_max_bytes:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(settings.fulltext_per_host)
+        return self.host_semaphores[host]
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=settings.fulltext_workers or None
+            )
+        return self.executor
+
+    def _cache_path(self, url: str) -> str:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def _read_cache(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._cache_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url: str, entry: Dict[str, Any]):
+        path = self._cache_path(url)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            temporary = f"{path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"⚠️ Could not cache full text for {url}: {e}")
+
+    @staticmethod
+    def _age(entry: Dict[str, Any]) -> float:
+        try:
+            fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        except (KeyError, ValueError):
+            return float("inf")
+        return (datetime.utcnow() - fetched_at).total_seconds()
+
+    def close(self):
+        """Stop the extraction worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fetch, cache and failure counters"""
+        return {**self.stats, "hosts": len(self.host_semaphores)}
+
+
+# Global full-text fetcher instance
+fulltext_fetcher = FullTextFetcher()
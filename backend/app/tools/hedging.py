@@ -0,0 +1,108 @@
+# File: app/tools/hedging.py
+"""
+Hedged requests: send a backup copy when the first one is unusually slow
+"""
+from typing import Dict, Any, Callable, Awaitable, Optional, TypeVar
+from collections import deque
+import asyncio
+import time
+
+import numpy as np
+
+from config import settings
+
+T = TypeVar("T")
+
+
+class Hedger:
+    """Issue a second request once the first exceeds a latency percentile.
+
+    The trigger delay is the configured percentile of recent latencies, so it
+    adapts to the operation. Hedges are capped at a fraction of all requests
+    and whichever copy finishes first wins; the other one is cancelled.
+    Latencies come from measure(), which should wrap the API call itself so
+    rate-limiter queueing and retries are not counted.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = deque(maxlen=settings.llm_hedge_window)
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "cancelled": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, None while there is too little data"""
+        if len(self.latencies) < settings.llm_hedge_min_samples:
+            return None
+        return float(np.percentile(self.latencies, settings.llm_hedge_percentile))
+
+    def _budget_left(self) -> bool:
+        return (self.stats["hedged"] + 1) <= (
+            settings.llm_hedge_max_rate * self.stats["requests"]
+        )
+
+    async def run(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Run request(), hedging it with a second copy if it is slow"""
+        self.stats["requests"] += 1
+        primary = asyncio.create_task(request())
+
+        delay = self.hedge_delay()
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._budget_left():
+            return await primary
+
+        self.stats["hedged"] += 1
+        hedge = asyncio.create_task(request())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Both copies can finish in the same wait: any success wins
+                # over a failure, whichever of them comes first in done
+                # (exception() also marks a losing failure as retrieved)
+                failed = {task for task in done if task.exception() is not None}
+                for task in (primary, hedge):
+                    if task in done and task not in failed:
+                        if task is hedge:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+            # Both copies failed
+            return primary.result()
+        finally:
+            # Cancel the loser (or both, if the caller was cancelled)
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+                    self.stats["cancelled"] += 1
+
+    async def measure(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await an API call, recording its latency for the hedge trigger.
+
+        A cancelled call (usually a hedging loser) is recorded with the time
+        it had taken so far, a lower bound of its latency; leaving it out
+        would count only winners and pull the percentile down. Failed calls
+        are not recorded.
+        """
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self.latencies.append(time.monotonic() - started)
+            raise
+        self.latencies.append(time.monotonic() - started)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedge counts, the realised hedge rate and the current trigger"""
+        delay = self.hedge_delay()
+        return {
+            **self.stats,
+            "hedge_rate": round(
+                self.stats["hedged"] / max(self.stats["requests"], 1), 4
+            ),
+            "hedge_delay_seconds": round(delay, 3) if delay is not None else None,
+        }
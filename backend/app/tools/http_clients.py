@@ -0,0 +1,88 @@
+# File: app/tools/http_clients.py
+"""
+Process-wide registry of tuned, shared httpx connection pools
+"""
+from typing import Dict, Any
+import importlib.util
+
+import httpx
+
+from config import settings
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+WEB_USER_AGENT = "AIWatchtowerBot/1.0 (+newsletter article and feed fetching)"
+
+
+class PoolMetrics:
+    """Requests versus newly opened connections, from httpx trace events"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def on_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_rate": round(reused / max(self.requests, 1), 3),
+        }
+
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_metrics: Dict[str, PoolMetrics] = {}
+
+
+def get_http_client(name: str, **kwargs) -> httpx.AsyncClient:
+    """The shared client for `name`, created on first use.
+
+    kwargs (headers, timeout, ...) only apply when the client is created.
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        metrics = _metrics.setdefault(name, PoolMetrics())
+        kwargs.setdefault("timeout", settings.http_timeout)
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            http2=HTTP2_AVAILABLE and settings.http2_enabled,
+            event_hooks={"request": [metrics.on_request]},
+            **kwargs,
+        )
+        _clients[name] = client
+    return client
+
+
+def get_web_client() -> httpx.AsyncClient:
+    """The shared client for third-party pages and feeds"""
+    return get_http_client(
+        "web", headers={"User-Agent": WEB_USER_AGENT}, follow_redirects=True
+    )
+
+
+async def close_http_clients():
+    """Close every shared client (application shutdown)"""
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+def get_http_stats() -> Dict[str, Any]:
+    """Connection reuse metrics per shared client"""
+    return {
+        "http2": HTTP2_AVAILABLE and settings.http2_enabled,
+        "pools": {name: metrics.get_stats() for name, metrics in _metrics.items()},
+    }
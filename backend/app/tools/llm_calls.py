@@ -0,0 +1,40 @@
+# File: app/tools/llm_calls.py
+"""
+Paid LLM calls counted per scope, such as one cohort's workflow
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class CallCount:
+    """Paid LLM calls made inside one count_calls() block"""
+
+    def __init__(self):
+        self.calls = 0
+
+
+_current: ContextVar[Optional[CallCount]] = ContextVar("llm_calls", default=None)
+
+
+@contextmanager
+def count_calls() -> Iterator[CallCount]:
+    """Count the paid LLM calls made inside the block.
+
+    The count follows the context, so it includes calls from tasks the block
+    starts and excludes concurrent calls from other tasks (other cohorts,
+    API requests) that share the same clients.
+    """
+    count = CallCount()
+    token = _current.set(count)
+    try:
+        yield count
+    finally:
+        _current.reset(token)
+
+
+def record_call():
+    """Count one paid call in the current scope, if there is one"""
+    count = _current.get()
+    if count is not None:
+        count.calls += 1
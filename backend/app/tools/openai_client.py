@@ -3,11 +3,29 @@ OpenAI client for content analysis and generation
 """
 
 from openai import AsyncOpenAI
-from typing import List, Dict, Any
+from openai.types.chat import ChatCompletion
+from typing import List, Dict, Any, AsyncIterator
 import json
 
 from config import settings
 from models import Article, AnalyzedArticle, NewsletterConfig
+from tools.rate_limiter import get_limiter
+from tools.token_budget import (
+    TokenUsage,
+    estimate_tokens,
+    pack_entries,
+    section_token_budget,
+    truncate_to_tokens,
+)
+from tools.summarizer import summarizer
+from tools.hedging import Hedger
+from tools.http_clients import get_http_client
+from tools.llm_calls import record_call
+
+# Completion tokens reserved per call until the real usage is known
+COMPLETION_TOKENS_ESTIMATE = 400
+# Longest article title kept in a prompt
+TITLE_MAX_TOKENS = 60
 
 
 class OpenAIClient:
@@ -15,24 +33,122 @@ class OpenAIClient:
 
     def __init__(self):
         self.client = None
+        self.calls = 0
+        self.limiter = get_limiter("openai")
+        self.hedgers = {"analyze": Hedger("analyze"), "generate": Hedger("generate")}
+        self.usage = TokenUsage()
 
     async def initialize(self):
         """Initialize the OpenAI client"""
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Retries are handled by the shared rate limiter, not the SDK
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=0,
+            http_client=get_http_client("openai"),
+        )
+
+    async def _chat(
+        self, messages: List[Dict[str, str]], temperature: float, operation: str
+    ) -> ChatCompletion:
+        """Rate-limited chat completion with retry on 429s and transient errors.
+
+        With llm_hedging_enabled a slow call is hedged with a second copy,
+        using the latency profile of its operation ("analyze" or "generate").
+        """
+        prompt_tokens = self._prompt_tokens(messages)
+        estimate = prompt_tokens + COMPLETION_TOKENS_ESTIMATE
+        hedger = self.hedgers[operation]
+
+        async def request():
+            self.calls += 1
+            record_call()
+            return await self.limiter.call(
+                lambda: hedger.measure(
+                    lambda: self.client.chat.completions.with_raw_response.create(
+                        model="gpt-4o-mini", messages=messages, temperature=temperature
+                    )
+                ),
+                tokens=estimate,
+                headers=lambda response: response.headers,
+                usage=lambda response: (
+                    response.parse().usage.total_tokens
+                    if response.parse().usage
+                    else None
+                ),
+            )
+
+        if settings.llm_hedging_enabled:
+            raw = await hedger.run(request)
+        else:
+            raw = await request()
+        response = raw.parse()
+
+        if response.usage:
+            self.usage.record(
+                operation,
+                response.usage.prompt_tokens,
+                response.usage.completion_tokens,
+            )
+        else:
+            completion = response.choices[0].message.content or ""
+            self.usage.record(
+                operation, prompt_tokens, estimate_tokens(completion), estimated=True
+            )
+        return response
+
+    @staticmethod
+    def _prompt_tokens(messages: List[Dict[str, str]]) -> int:
+        # ~4 tokens of chat framing per message
+        return sum(estimate_tokens(message["content"]) + 4 for message in messages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Call count, token usage and, when enabled, hedging stats"""
+        stats: Dict[str, Any] = {"calls": self.calls, "tokens": self.usage.get_stats()}
+        if settings.llm_hedging_enabled:
+            stats["hedging"] = {
+                name: hedger.get_stats() for name, hedger in self.hedgers.items()
+            }
+        return stats
 
     async def analyze_article(
-        self, article: Article, user_preferences, available_sections: List[str]
+        self,
+        article: Article,
+        available_sections: List[str],
+        assign_section: bool = True,
     ) -> Dict[str, Any]:
-        """Analyze an article for relevance, sentiment, and section assignment"""
+        """Analyze an article for relevance, sentiment, and section assignment
+
+        The result only depends on the article and the offered sections, never
+        on the user, so it can be shared across users. With assign_section=False
+        the section choice is left out of the prompt and the result has no
+        "best_section" (it was decided locally).
+        """
         try:
+            sections_text = ""
+            section_field = ""
+            section_rule = ""
+            if assign_section:
+                sections_text = f"Available sections: {', '.join(available_sections)}"
+                section_field = '"best_section": "Compliance & Risk Watch",'
+                section_rule = (
+                    "- best_section: choose the most appropriate section from the list"
+                )
+
+            content_text = ""
+            # Full text is compressed locally before it reaches the prompt
+            excerpt = summarizer.summarize_article(article)
+            if excerpt:
+                content_text = f"Key passages: {excerpt}"
+
             prompt = f"""
             Analyze this article for relevance to responsible AI, AI ethics, and AI governance:
             
-            Title: {article.title}
-            Summary: {article.summary}
+            Title: {truncate_to_tokens(article.title, TITLE_MAX_TOKENS)}
+            Summary: {truncate_to_tokens(article.summary, settings.analysis_summary_max_tokens)}
             Source: {article.source}
+            {content_text}
             
-            Available sections: {', '.join(available_sections)}
+            {sections_text}
             
             Return ONLY a JSON object with this exact format:
             {{
@@ -40,7 +156,7 @@ class OpenAIClient:
                 "sentiment": "positive",
                 "impact_score": 7,
                 "urgency_score": 6,
-                "best_section": "Compliance & Risk Watch",
+                {section_field}
                 "explanation": "Brief explanation"
             }}
             
@@ -48,12 +164,11 @@ class OpenAIClient:
             - sentiment: "positive", "negative", or "neutral"
             - impact_score: 1-10 (potential business/industry impact)
             - urgency_score: 1-10 (how urgent/time-sensitive)
-            - best_section: choose the most appropriate section from the list
+            {section_rule}
             """
 
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            response = await self._chat(
+                [
                     {
                         "role": "system",
                         "content": "You are an AI analyst. Return only valid JSON.",
@@ -61,6 +176,7 @@ class OpenAIClient:
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.1,
+                operation="analyze",
             )
 
             content = response.choices[0].message.content
@@ -78,29 +194,39 @@ class OpenAIClient:
                     available_sections[0] if available_sections else "General"
                 ),
                 "explanation": "Analysis failed",
+                "failed": True,
             }
 
-    async def generate_section_content(
+    def _section_messages(
         self,
         section_name: str,
         articles: List[AnalyzedArticle],
         config: NewsletterConfig,
-    ) -> str:
-        """Generate content for a newsletter section"""
-        try:
-            articles_text = "\n\n".join(
-                [
-                    f"Title: {article.article.title}\n"
-                    f"Source: {article.article.source}\n"
-                    f"URL: {article.article.url}\n"
-                    f"Summary: {article.article.summary}\n"
-                    f"Relevance: {article.relevance_score:.2f}\n"
-                    f"Impact: {article.impact_score}/10"
-                    for article in articles[:5]  # Limit to top 5
-                ]
-            )
+    ) -> List[Dict[str, str]]:
+        """Chat messages asking for one newsletter section.
 
-            prompt = f"""
+        Articles are expected in rank order; as many as fit the format's
+        section token budget are included, the last one possibly with a
+        shortened summary.
+        """
+        budget = section_token_budget(config.format)
+        articles_text, _ = pack_entries(
+            articles,
+            budget,
+            render=lambda article, summary: (
+                f"Title: {truncate_to_tokens(article.article.title, TITLE_MAX_TOKENS)}\n"
+                f"Source: {article.article.source}\n"
+                f"URL: {article.article.url}\n"
+                f"Summary: {summary}\n"
+                f"Relevance: {article.relevance_score:.2f}\n"
+                f"Impact: {article.impact_score}/10"
+            ),
+            text_of=lambda article: article.article.summary,
+            # No single summary may take more than a quarter of the budget
+            max_text_tokens=budget // 4,
+        )
+
+        prompt = f"""
             Generate content for the "{section_name}" section of an AI newsletter.
             
             Articles:
@@ -118,16 +244,26 @@ class OpenAIClient:
             Return only the formatted section content (no JSON, just the text).
             """
 
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional newsletter writer.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
+        return [
+            {
+                "role": "system",
+                "content": "You are a professional newsletter writer.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+    async def generate_section_content(
+        self,
+        section_name: str,
+        articles: List[AnalyzedArticle],
+        config: NewsletterConfig,
+    ) -> str:
+        """Generate content for a newsletter section"""
+        try:
+            response = await self._chat(
+                self._section_messages(section_name, articles, config),
                 temperature=0.3,
+                operation="generate",
             )
 
             return response.choices[0].message.content
@@ -135,3 +271,56 @@ class OpenAIClient:
         except Exception as e:
             print(f"Error generating section content: {e}")
             return f"**{section_name}**\n\nContent generation failed for this section."
+
+    async def stream_section_content(
+        self,
+        section_name: str,
+        articles: List[AnalyzedArticle],
+        config: NewsletterConfig,
+    ) -> AsyncIterator[str]:
+        """Generate a newsletter section, yielding text as it is produced.
+
+        Only opening the stream is rate limited and retried; a failure
+        midway ends the section with a short note instead of raising.
+        """
+        messages = self._section_messages(section_name, articles, config)
+        prompt_tokens = self._prompt_tokens(messages)
+        estimate = prompt_tokens + COMPLETION_TOKENS_ESTIMATE
+        produced = []
+        try:
+            self.calls += 1
+            record_call()
+            raw = await self.limiter.call(
+                lambda: self.client.chat.completions.with_raw_response.create(
+                    model="gpt-4o-mini",
+                    messages=messages,
+                    temperature=0.3,
+                    stream=True,
+                ),
+                tokens=estimate,
+                headers=lambda response: response.headers,
+            )
+            stream = raw.parse()
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        produced.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Also when the consumer stops early (client disconnect), so
+                # the pooled connection is released
+                await stream.response.aclose()
+            # Streamed responses carry no usage block
+            self.usage.record(
+                "generate",
+                prompt_tokens,
+                estimate_tokens("".join(produced)),
+                estimated=True,
+            )
+
+        except Exception as e:
+            print(f"Error streaming section content: {e}")
+            if produced:
+                yield "\n\n_(Section generation was interrupted.)_"
+            else:
+                yield f"**{section_name}**\n\nContent generation failed for this section."
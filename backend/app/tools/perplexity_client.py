@@ -3,17 +3,31 @@ Perplexity API client for content collection
 """
 
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 import os
 from config import settings
+from database import db
 from models import (
     Article,
     NewsletterConfig,
     UserPreferences,
     NewsletterFormat,
 )  # Add NewsletterFormat
+from tools.circuit_breaker import CircuitBreaker
+from tools.rate_limiter import get_limiter
+from tools.token_budget import estimate_tokens
+from tools.http_clients import get_http_client
+from tools.llm_calls import record_call
+from tools.topic_planner import prompt_sources
+
+# Tokens reserved for a search answer (10 articles as JSON)
+RESPONSE_TOKENS_ESTIMATE = 2000
+
+
+class SearchUnavailableError(Exception):
+    """The search API could not be used (no key, open circuit, failed call)"""
 
 
 class PerplexityClient:
@@ -37,6 +51,18 @@ class PerplexityClient:
         self.api_key = settings.perplexity_api_key
         self.base_url = "https://api.perplexity.ai/chat/completions"
         self.client = None
+        self.calls = 0
+        self.limiter = get_limiter("perplexity")
+        self.breaker = CircuitBreaker(
+            "perplexity",
+            settings.perplexity_breaker_failures,
+            settings.perplexity_breaker_cooldown,
+        )
+        self.last_good: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"stale_served": 0, "empty_served": 0}
+
+        # Canned articles only in explicit test mode, never as an error fallback
+        self.use_mock = settings.perplexity_mock_mode
 
         # Check if API key is valid
         if (
@@ -48,88 +74,166 @@ class PerplexityClient:
             print(
                 "   Please check your .env file and make sure PERPLEXITY_API_KEY is set correctly"
             )
-            self.use_mock = True
+            self.api_available = False
         else:
             print(f"✅ Perplexity API key loaded: {self.api_key[:10]}...")
-            self.use_mock = False
+            self.api_available = True
 
     async def initialize(self):
         """Initialize the client"""
         if self.use_mock:
-            print("🔧 Using MOCK mode due to missing/invalid API key")
+            print("🔧 Using MOCK mode (PERPLEXITY_MOCK_MODE is set)")
+            return
+
+        if not self.api_available:
+            print("⚠️ Perplexity unavailable: only cached search results will be served")
             return
 
         try:
-            self.client = httpx.AsyncClient(
+            self.client = get_http_client(
+                "perplexity",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json",
                 },
-                timeout=30.0,
             )
             print("✅ Perplexity client initialized successfully")
         except Exception as e:
             print(f"❌ Error initializing Perplexity client: {e}")
-            self.use_mock = True
+            self.api_available = False
 
     async def search_articles(
-        self, topic: str, config: NewsletterConfig, preferences: UserPreferences
+        self,
+        topic: str,
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+        since: Optional[datetime] = None,
+        fallback: bool = True,
     ) -> List[Article]:
-        """Search for articles on a specific topic"""
+        """Search for articles on a specific topic, optionally only newer ones.
+
+        When the API cannot be used the last good results are served (tagged
+        stale), or SearchUnavailableError is raised if fallback is False.
+        """
 
-        # Use mock data if API key is missing/invalid
+        # Canned data in explicit test mode only
         if self.use_mock:
             return await self._mock_search_articles(topic, config, preferences)
 
+        if not self.api_available:
+            return await self._unavailable(topic, "API key missing", fallback)
+
+        if not self.breaker.allow():
+            return await self._unavailable(topic, "circuit open", fallback)
+
         try:
             # Build search prompt
-            prompt = self._build_search_prompt(topic, config, preferences)
-
-            # Validate API key one more time
-            if not self.api_key or len(self.api_key.strip()) == 0:
-                print("❌ API key is empty at request time!")
-                return await self._mock_search_articles(topic, config, preferences)
-
-            # Make API request
-            response = await self.client.post(
-                self.base_url,
-                json={
-                    "model": "sonar-pro",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a research assistant. Return only valid JSON.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                },
+            prompt = self._build_search_prompt(topic, config, preferences, since)
+
+            # Make API request (rate limited, retried on 429s and transient errors)
+            async def post() -> httpx.Response:
+                response = await self.client.post(
+                    self.base_url,
+                    json={
+                        "model": "sonar-pro",
+                        "messages": [
+                            {
+                                "role": "system",
+                                "content": "You are a research assistant. Return only valid JSON.",
+                            },
+                            {"role": "user", "content": prompt},
+                        ],
+                    },
+                )
+                print(f"✅ Perplexity response status: {response.status_code}")
+                response.raise_for_status()
+                return response
+
+            self.calls += 1
+            record_call()
+            response = await self.limiter.call(
+                post,
+                tokens=estimate_tokens(prompt) + RESPONSE_TOKENS_ESTIMATE,
+                headers=lambda response: response.headers,
+                usage=lambda response: response.json().get("usage", {}).get(
+                    "total_tokens"
+                ),
             )
-
-            print(f"✅ Perplexity response status: {response.status_code}")
-            response.raise_for_status()
             data = response.json()
 
             # Parse response
             content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
             articles = self._parse_articles_response(content, topic)
+            self.breaker.record_success()
 
             print(f"✅ Successfully parsed {len(articles)} articles from Perplexity")
+            if articles:
+                await self._remember(topic, articles)
             return articles
 
         except httpx.HTTPStatusError as e:
             print(
                 f"❌ Perplexity HTTP error for '{topic}': {e.response.status_code} - {e.response.text}"
             )
-            return await self._mock_search_articles(topic, config, preferences)
+            self.breaker.record_failure()
+            return await self._unavailable(topic, "HTTP error", fallback)
         except Exception as e:
             print(f"❌ Error in Perplexity search for '{topic}': {e}")
             print(f"   Error type: {type(e)}")
-            return await self._mock_search_articles(topic, config, preferences)
+            self.breaker.record_failure()
+            return await self._unavailable(topic, "request failed", fallback)
+
+    async def _remember(self, topic: str, articles: List[Article]):
+        """Keep the latest good results of a topic for failures"""
+        self.last_good[topic] = {"articles": articles, "fetched_at": datetime.utcnow()}
+        await db.save_search_results(topic, articles)
+
+    async def _unavailable(
+        self, topic: str, reason: str, fallback: bool
+    ) -> List[Article]:
+        if not fallback:
+            raise SearchUnavailableError(f"Perplexity unavailable: {reason}")
+        return await self.stale_search_articles(topic, reason)
+
+    async def stale_search_articles(self, topic: str, reason: str) -> List[Article]:
+        """Last good results of the topic, tagged stale, or nothing"""
+        cached = self.last_good.get(topic) or await db.get_search_results(topic)
+        if cached:
+            age = (datetime.utcnow() - cached["fetched_at"]).total_seconds()
+            if age <= settings.perplexity_stale_max_age:
+                self.last_good[topic] = cached
+                self.stats["stale_served"] += 1
+                print(
+                    f"♻️ Serving stale results for '{topic}' ({reason}, {age / 3600:.1f}h old)"
+                )
+                return [
+                    article.model_copy(update={"stale": True})
+                    for article in cached["articles"]
+                ]
+
+        self.stats["empty_served"] += 1
+        print(f"⚠️ No usable cached results for '{topic}' ({reason})")
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """API calls, breaker state and fallback counters"""
+        return {
+            "calls": self.calls,
+            "mode": "mock" if self.use_mock else "live",
+            "api_available": self.api_available,
+            "circuit": self.breaker.get_stats(),
+            "rate_limiter": self.limiter.get_stats(),
+            **self.stats,
+        }
 
     # File: app/tools/perplexity_client.py - ENHANCED VERSION
 
     def _build_search_prompt(
-        self, topic: str, config: NewsletterConfig, preferences: UserPreferences
+        self,
+        topic: str,
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+        since: Optional[datetime] = None,
     ) -> str:
         """Build search prompt for Perplexity - ENHANCED"""
 
@@ -140,6 +244,10 @@ class PerplexityClient:
             end_date = config.date_range.get("end")
             date_range = f" published between {start_date} and {end_date}"
 
+        # Incremental search: only material newer than the topic's watermark
+        if since:
+            date_range = f" published on or after {since.strftime('%Y-%m-%d')}"
+
         # 🔧 FIX: Add time-specific context
         time_context = ""
         if config.format == NewsletterFormat.DAILY:
@@ -152,7 +260,7 @@ class PerplexityClient:
         preferred_sources = ""
         if preferences.preferred_sources:
             preferred_sources = (
-                f"Prioritize sources: {', '.join(preferences.preferred_sources[:5])}"
+                f"Prioritize sources: {', '.join(prompt_sources(preferences))}"
             )
 
         # 🔧 FIX: Enhanced prompt with strict date requirements
@@ -0,0 +1,275 @@
+# File: app/tools/rate_limiter.py
+"""
+Shared per-provider rate limiting, adaptive concurrency and retry backoff
+"""
+from typing import Dict, Any, Optional, Callable, Awaitable, TypeVar
+import asyncio
+import random
+import re
+import time
+
+import httpx
+import openai
+
+from config import settings
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds from "20", "1.5s", "250ms" or "6m0s" style header values"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously up to its capacity"""
+
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        """Empty the bucket (the provider says the quota is used up)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Requests/minute and tokens/minute budget plus AIMD concurrency.
+
+    Every call waits for a concurrency slot and for both buckets. Successful
+    calls grow the concurrency limit by 1/limit (additive increase); a 429
+    halves it (multiplicative decrease) and pauses the provider for its
+    Retry-After. Retryable failures are retried with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.condition = asyncio.Condition()
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+        }
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[T]],
+        tokens: int = 1,
+        headers: Optional[Callable[[T], Any]] = None,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """Run request() under the limits, retrying retryable failures.
+
+        headers(result) returns response headers to learn remaining quota
+        from; usage(result) returns the real token count to settle the
+        estimate against.
+        """
+        for attempt in range(settings.rate_limit_max_retries + 1):
+            await self._acquire(tokens)
+            try:
+                result = await request()
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            finally:
+                await self._release()
+
+            if error is None:
+                self._on_success(result, tokens, headers, usage)
+                return result
+
+            retry_after = self._on_error(error)
+            if retry_after is None or attempt == settings.rate_limit_max_retries:
+                self.stats["failures"] += 1
+                raise error
+
+            delay = max(
+                retry_after,
+                backoff_delay(
+                    attempt,
+                    settings.rate_limit_backoff_base,
+                    settings.rate_limit_backoff_cap,
+                ),
+            )
+            self.stats["retries"] += 1
+            print(
+                f"⏳ {self.name}: retry {attempt + 1} in {delay:.1f}s ({type(error).__name__})"
+            )
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, tokens: int):
+        started = time.monotonic()
+        async with self.condition:
+            while True:
+                if self.in_flight < int(self.concurrency):
+                    wait = max(
+                        self.paused_until - time.monotonic(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(tokens),
+                    )
+                    if wait <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self.condition.wait()
+
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.stats["calls"] += 1
+        self.stats["wait_seconds"] += time.monotonic() - started
+
+    async def _release(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def _on_success(self, result, tokens: int, headers, usage):
+        self.concurrency = min(
+            self.max_concurrency, self.concurrency + 1.0 / self.concurrency
+        )
+        if usage:
+            actual = usage(result)
+            if actual:
+                # Settle the estimate: charge (or refund) the difference
+                self.tokens.take(actual - tokens)
+        if headers:
+            self.observe_headers(headers(result))
+
+    def _on_error(self, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying, or None if not retryable"""
+        response = getattr(error, "response", None)
+        if isinstance(response, httpx.Response):
+            if response.status_code not in RETRYABLE_STATUS:
+                return None
+            self.observe_headers(response.headers)
+            if response.status_code == 429:
+                self.stats["rate_limited"] += 1
+                self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                retry_after = self._retry_after(response.headers)
+                if retry_after:
+                    self.paused_until = max(
+                        self.paused_until, time.monotonic() + retry_after
+                    )
+                return retry_after or 0.0
+            return 0.0
+
+        if isinstance(
+            error,
+            (httpx.TransportError, openai.APIConnectionError, asyncio.TimeoutError),
+        ):
+            return 0.0
+        return None
+
+    def observe_headers(self, headers):
+        """Pause until reset when the provider reports an exhausted quota"""
+        if not headers:
+            return
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = headers.get(f"x-ratelimit-reset-{kind}")
+            if remaining is None or reset is None:
+                continue
+            try:
+                exhausted = float(remaining) <= 0
+            except ValueError:
+                continue
+            seconds = parse_duration(reset)
+            if exhausted and seconds:
+                bucket.drain()
+                self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _retry_after(self, headers) -> Optional[float]:
+        for name in ("retry-after-ms", "retry-after"):
+            value = headers.get(name)
+            if value:
+                seconds = parse_duration(value)
+                if seconds is not None:
+                    return seconds / 1000 if name == "retry-after-ms" else seconds
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the current adaptive concurrency limit"""
+        return {
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 2),
+            "concurrency_limit": round(self.concurrency, 2),
+            "in_flight": self.in_flight,
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(provider: str) -> RateLimiter:
+    """The process-wide limiter of a provider ("openai" or "perplexity")"""
+    if provider not in _limiters:
+        _limiters[provider] = RateLimiter(
+            provider,
+            requests_per_minute=getattr(settings, f"{provider}_rpm"),
+            tokens_per_minute=getattr(settings, f"{provider}_tpm"),
+            max_concurrency=getattr(settings, f"{provider}_max_concurrency"),
+        )
+    return _limiters[provider]
+
+
+def get_limiter_stats() -> Dict[str, Any]:
+    """Stats of every limiter created so far"""
+    return {name: limiter.get_stats() for name, limiter in _limiters.items()}
@@ -0,0 +1,263 @@
+# File: app/tools/relevance_model.py
+"""
+Local lexical relevance model used as a prefilter before LLM analysis
+"""
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import math
+import re
+import zlib
+
+import numpy as np
+
+from config import settings
+from models import Article
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+ACCEPT = "accept"
+REJECT = "reject"
+UNCERTAIN = "uncertain"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens plus adjacent bigrams"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def article_text(title: str, summary: str, source: str = "") -> str:
+    """Text the local models see for an article"""
+    return f"{title} {title} {summary} source_{source.lower().replace(' ', '_')}"
+
+
+class HashingVectorizer:
+    """Stateless bag-of-words features hashed into a fixed-size space"""
+
+    def __init__(self, n_features: int = 2**18):
+        self.n_features = n_features
+
+    def transform_one(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, values) of the L2-normalised log-tf vector"""
+        counts: Dict[int, float] = {}
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            index = h % self.n_features
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        values = np.sign(values) * np.log1p(np.abs(values))
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values /= norm
+        return indices, values
+
+    def transform(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return a CSR-style (indptr, indices, values) matrix"""
+        indptr = [0]
+        all_indices = []
+        all_values = []
+        for text in texts:
+            indices, values = self.transform_one(text)
+            all_indices.append(indices)
+            all_values.append(values)
+            indptr.append(indptr[-1] + len(indices))
+
+        return (
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(all_indices) if all_indices else np.zeros(0, np.int64),
+            np.concatenate(all_values) if all_values else np.zeros(0),
+        )
+
+
+class RelevanceModel:
+    """Logistic relevance scorer trained on past LLM relevance scores.
+
+    Scores fall into three bands relative to a user's relevance threshold:
+    clear winners are accepted, clear losers rejected, and only the uncertain
+    middle band is sent to the LLM. A band is only trusted once its held-out
+    agreement with the LLM reaches ``relevance_min_band_agreement``, measured
+    at that same threshold.
+    """
+
+    def __init__(self, n_features: int = 2**18):
+        self.vectorizer = HashingVectorizer(n_features)
+        self.weights = np.zeros(n_features)
+        self.bias = 0.0
+        self.ready = False
+        self.trained_on = 0
+        # Held-out (predicted, LLM) scores, and band reports by threshold
+        self.holdout: Tuple[List[float], List[float]] = ([], [])
+        self.calibration: Dict[float, Dict[str, Dict[str, Any]]] = {}
+        self.band_counts = {ACCEPT: 0, REJECT: 0, UNCERTAIN: 0}
+
+    async def bootstrap(self, analyses: List[Dict[str, Any]]):
+        """Train from stored analyses without blocking the event loop"""
+        if len(analyses) < settings.relevance_prefilter_min_samples:
+            print(
+                f"ℹ️ Relevance prefilter disabled: {len(analyses)}/{settings.relevance_prefilter_min_samples} stored analyses"
+            )
+            return
+
+        await asyncio.to_thread(self.fit_from_analyses, analyses)
+        print(
+            f"✅ Relevance prefilter trained on {self.trained_on} analyses, {len(self.holdout[0])} held out to calibrate bands"
+        )
+
+    def fit_from_analyses(self, analyses: List[Dict[str, Any]]):
+        """Fit on 80% of the analyses and keep the rest to calibrate bands"""
+        rng = np.random.default_rng(0)
+        order = rng.permutation(len(analyses))
+        split = max(int(len(analyses) * 0.8), 1)
+        train = [analyses[i] for i in order[:split]]
+        holdout = [analyses[i] for i in order[split:]]
+
+        self.fit(
+            [self._row_text(row) for row in train],
+            [float(row["relevance_score"]) for row in train],
+        )
+        self.holdout = (
+            [self.predict(self._row_text(row)) for row in holdout],
+            [float(row["relevance_score"]) for row in holdout],
+        )
+        self.calibration = {}
+        self.ready = True
+
+    def fit(self, texts: List[str], scores: List[float], epochs: int = 60):
+        """Fit logistic regression on soft labels with Adagrad"""
+        indptr, indices, values = self.vectorizer.transform(texts)
+        targets = np.clip(np.asarray(scores, dtype=np.float64), 0.0, 1.0)
+        row_ids = np.repeat(np.arange(len(texts)), np.diff(indptr))
+
+        weights = np.zeros(self.vectorizer.n_features)
+        bias = float(np.log((targets.mean() + 1e-6) / (1 - targets.mean() + 1e-6)))
+        grad_sq = np.full(self.vectorizer.n_features, 1e-8)
+        bias_sq = 1e-8
+        learning_rate = 0.5
+        l2 = 1e-4
+
+        for _ in range(epochs):
+            logits = bias + np.bincount(
+                row_ids, weights=weights[indices] * values, minlength=len(texts)
+            )
+            errors = self._sigmoid(logits) - targets
+            grad = np.bincount(
+                indices,
+                weights=errors[row_ids] * values,
+                minlength=self.vectorizer.n_features,
+            ) / len(texts)
+            grad += l2 * weights
+            grad_sq += grad**2
+            weights -= learning_rate * grad / np.sqrt(grad_sq)
+
+            bias_grad = float(errors.mean())
+            bias_sq += bias_grad**2
+            bias -= learning_rate * bias_grad / math.sqrt(bias_sq)
+
+        self.weights = weights
+        self.bias = bias
+        self.trained_on = len(texts)
+
+    def predict(self, text: str) -> float:
+        """Predicted LLM relevance score for a text"""
+        indices, values = self.vectorizer.transform_one(text)
+        logit = self.bias + float(np.dot(self.weights[indices], values))
+        return float(self._sigmoid(np.asarray(logit)))
+
+    def score_article(self, article: Article) -> float:
+        """Predicted LLM relevance score for an article"""
+        return self.predict(
+            article_text(article.title, article.summary, article.source)
+        )
+
+    def band(self, score: float, threshold: float) -> str:
+        """Place a score in the accept, reject or uncertain band"""
+        if score >= threshold + settings.relevance_accept_margin:
+            return ACCEPT
+        if score < threshold - settings.relevance_reject_margin:
+            return REJECT
+        return UNCERTAIN
+
+    def decide(self, article: Article, threshold: float) -> Tuple[str, float]:
+        """Return (band, score); untrusted bands are reported as uncertain"""
+        score = self.score_article(article)
+        band = self.band(score, threshold)
+        if band != UNCERTAIN and not self.calibration_for(threshold)[band]["trusted"]:
+            band = UNCERTAIN
+        self.band_counts[band] += 1
+        return band, score
+
+    def calibration_for(self, threshold: float) -> Dict[str, Dict[str, Any]]:
+        """Held-out band report at a threshold, computed once per threshold"""
+        threshold = round(threshold, 2)
+        if threshold not in self.calibration:
+            predicted, scores = self.holdout
+            self.calibration[threshold] = self.calibrate(predicted, scores, threshold)
+        return self.calibration[threshold]
+
+    def calibrate(
+        self, predicted: List[float], scores: List[float], threshold: float
+    ) -> Dict[str, Dict[str, Any]]:
+        """Per-band agreement between local and LLM decisions on held-out data.
+
+        predicted are the model's scores for the held-out articles, scores
+        the LLM's.
+        """
+        report = {
+            band: {
+                "count": 0,
+                "mean_predicted": 0.0,
+                "mean_llm": 0.0,
+                "llm_pass_rate": 0.0,
+            }
+            for band in (ACCEPT, REJECT, UNCERTAIN)
+        }
+        for local_score, llm_score in zip(predicted, scores):
+            entry = report[self.band(local_score, threshold)]
+            entry["count"] += 1
+            entry["mean_predicted"] += local_score
+            entry["mean_llm"] += llm_score
+            entry["llm_pass_rate"] += llm_score >= threshold
+
+        for band, entry in report.items():
+            count = entry["count"]
+            if count:
+                for key in ("mean_predicted", "mean_llm", "llm_pass_rate"):
+                    entry[key] = round(entry[key] / count, 3)
+
+            # Agreement: how often the LLM would have made the same call
+            if band == ACCEPT:
+                entry["agreement"] = entry["llm_pass_rate"] if count else 0.0
+            elif band == REJECT:
+                entry["agreement"] = (
+                    round(1 - entry["llm_pass_rate"], 3) if count else 0.0
+                )
+            else:
+                entry["agreement"] = None
+            entry["trusted"] = (
+                band != UNCERTAIN
+                and count >= settings.relevance_min_band_samples
+                and entry["agreement"] >= settings.relevance_min_band_agreement
+            )
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Training size, held-out calibration and live band counts"""
+        return {
+            "ready": self.ready,
+            "trained_on": self.trained_on,
+            "calibration": self.calibration,
+            "band_counts": dict(self.band_counts),
+        }
+
+    def _row_text(self, row: Dict[str, Any]) -> str:
+        return article_text(row["title"], row["summary"] or "", row["source"] or "")
+
+    @staticmethod
+    def _sigmoid(x: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
@@ -0,0 +1,148 @@
+# File: app/tools/section_classifier.py
+"""
+Local section classifier distilled from cached LLM section assignments
+"""
+from typing import List, Dict, Any, Optional, Tuple
+import os
+import zlib
+
+import numpy as np
+
+from config import settings
+from models import Article
+from tools.relevance_model import tokenize, article_text
+from utils.config_validator import ConfigValidator
+
+
+class SectionClassifier:
+    """Multinomial naive Bayes over hashed token counts"""
+
+    def __init__(self, n_features: int = 2**16, alpha: float = 0.1):
+        self.n_features = n_features
+        self.alpha = alpha
+        self.classes: List[str] = []
+        self.class_log_prior = np.zeros(0)
+        self.feature_log_prob = np.zeros((0, n_features))
+        self.ready = False
+
+    def fit(self, texts: List[str], labels: List[str]):
+        """Fit class priors and per-class token distributions"""
+        self.classes = sorted(set(labels))
+        class_index = {name: i for i, name in enumerate(self.classes)}
+
+        counts = np.zeros((len(self.classes), self.n_features))
+        class_counts = np.zeros(len(self.classes))
+        for text, label in zip(texts, labels):
+            row = class_index[label]
+            class_counts[row] += 1
+            indices, values = self._features(text)
+            np.add.at(counts[row], indices, values)
+
+        smoothed = counts + self.alpha
+        self.feature_log_prob = np.log(
+            smoothed / smoothed.sum(axis=1, keepdims=True)
+        ).astype(np.float32)
+        self.class_log_prior = np.log(class_counts / class_counts.sum())
+        self.ready = True
+
+    def predict(
+        self, text: str, available_sections: Optional[List[str]] = None
+    ) -> Tuple[Optional[str], float]:
+        """Return (section, confidence), the section among the available ones.
+
+        The confidence is the section's posterior over every known class, as
+        evaluate() measures it: renormalising over a short list (daily has
+        two sections) would inflate it.
+        """
+        if not self.ready:
+            return None, 0.0
+
+        candidates = [
+            i
+            for i, name in enumerate(self.classes)
+            if available_sections is None or name in available_sections
+        ]
+        if not candidates:
+            return None, 0.0
+
+        indices, values = self._features(text)
+        joint = self.class_log_prior + (self.feature_log_prob[:, indices] @ values)
+        joint -= joint.max()
+        posterior = np.exp(joint) / np.exp(joint).sum()
+        best = candidates[int(np.argmax(posterior[candidates]))]
+        return self.classes[best], float(posterior[best])
+
+    def predict_article(
+        self, article: Article, available_sections: List[str]
+    ) -> Optional[str]:
+        """Section for an article, or None when not confident enough"""
+        section, confidence = self.predict(
+            article_text(article.title, article.summary, article.source),
+            available_sections,
+        )
+        if confidence >= settings.section_classifier_min_confidence:
+            return section
+        return None
+
+    def evaluate(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+        """Accuracy overall and on the confident subset answered locally"""
+        correct = confident = confident_correct = 0
+        for text, label in zip(texts, labels):
+            section, confidence = self.predict(text)
+            correct += section == label
+            if confidence >= settings.section_classifier_min_confidence:
+                confident += 1
+                confident_correct += section == label
+
+        total = max(len(texts), 1)
+        return {
+            "samples": len(texts),
+            "accuracy": round(correct / total, 3),
+            "local_coverage": round(confident / total, 3),
+            "local_accuracy": round(confident_correct / max(confident, 1), 3),
+        }
+
+    def save(self, path: str):
+        """Save the model to a compressed .npz file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            classes=np.asarray(self.classes),
+            class_log_prior=self.class_log_prior,
+            feature_log_prob=self.feature_log_prob,
+        )
+
+    def load(self, path: str) -> bool:
+        """Load a saved model, returning False if none exists"""
+        if not os.path.exists(path):
+            return False
+
+        data = np.load(path)
+        self.classes = [str(name) for name in data["classes"]]
+        self.class_log_prior = data["class_log_prior"]
+        self.feature_log_prob = data["feature_log_prob"]
+        self.n_features = self.feature_log_prob.shape[1]
+        self.ready = True
+        return True
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Hashed token counts"""
+        counts: Dict[int, float] = {}
+        for token in tokenize(text):
+            index = zlib.crc32(token.encode("utf-8")) % self.n_features
+            counts[index] = counts.get(index, 0.0) + 1.0
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return indices, values
+
+
+def training_rows(analyses: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Texts and labels from stored analyses within the fixed vocabulary"""
+    texts, labels = [], []
+    for row in analyses:
+        if row.get("best_section") in ConfigValidator.VALID_SECTIONS:
+            texts.append(
+                article_text(row["title"], row["summary"] or "", row["source"] or "")
+            )
+            labels.append(row["best_section"])
+    return texts, labels
@@ -0,0 +1,205 @@
+# File: app/tools/sources.py
+"""
+Pluggable article sources streamed as batches and merged with backpressure
+"""
+from abc import ABC, abstractmethod
+from typing import (
+    List,
+    Dict,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+import asyncio
+import time
+
+from config import settings
+from models import Article, NewsletterConfig, UserPreferences
+
+T = TypeVar("T")
+
+DEFAULT_LIMITS = {"concurrency": 4, "deadline": 60.0, "quota": 200}
+
+
+def source_limits(name: str) -> Dict[str, float]:
+    """Concurrency, deadline (seconds) and quota (articles) of a source"""
+    return {**DEFAULT_LIMITS, **settings.source_limits.get(name, {})}
+
+
+class ArticleSource(ABC):
+    """Something that can supply candidate articles for a newsletter.
+
+    stream() receives the planned search topics and yields batches of raw
+    articles as they arrive. The content agent deduplicates and validates
+    everything it gets, so sources do not need to. Fan-out inside a source
+    should go through bounded() so the source's concurrency limit holds.
+    """
+
+    name: str = "source"
+
+    async def initialize(self):
+        """Prepare clients; called once before the first stream()"""
+
+    @abstractmethod
+    def stream(
+        self,
+        topics: List[str],
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+    ) -> AsyncIterator[List[Article]]:
+        """Batches of articles for the given topics"""
+
+    async def collect(
+        self,
+        topics: List[str],
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+    ) -> List[Article]:
+        """All articles of stream() as one list"""
+        return [
+            article
+            async for batch in self.stream(topics, config, preferences)
+            for article in batch
+        ]
+
+    @property
+    def limits(self) -> Dict[str, float]:
+        return source_limits(self.name)
+
+    async def bounded(
+        self, calls: List[Callable[[], Awaitable[T]]]
+    ) -> AsyncIterator[T]:
+        """Results of calls in completion order, at most `concurrency` at once"""
+        semaphore = asyncio.Semaphore(int(self.limits["concurrency"]))
+
+        async def run(call):
+            async with semaphore:
+                return await call()
+
+        tasks = [asyncio.create_task(run(call)) for call in calls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Deadline, quota or consumer gone: stop outstanding work
+            for task in tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Source-specific counters"""
+        return {}
+
+
+# name -> factory(content_agent) returning a source, or None when unusable
+_registry: Dict[str, Callable[[Any], Optional[ArticleSource]]] = {}
+_stream_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def register_source(
+    name: str, factory: Callable[[Any], Optional[ArticleSource]]
+) -> None:
+    """Make a source available to settings.article_sources under `name`"""
+    _registry[name] = factory
+
+
+def create_sources(content_agent) -> List[ArticleSource]:
+    """Instances of every enabled, registered and usable source"""
+    sources = []
+    for name in settings.article_sources:
+        factory = _registry.get(name)
+        if factory is None:
+            print(f"⚠️ Unknown article source '{name}'")
+            continue
+        source = factory(content_agent)
+        if source is not None:
+            sources.append(source)
+    return sources
+
+
+async def merge_streams(
+    sources: List[ArticleSource],
+    topics: List[str],
+    config: NewsletterConfig,
+    preferences: UserPreferences,
+) -> AsyncIterator[Tuple[str, List[Article]]]:
+    """Interleave the batches of all sources as they arrive.
+
+    Every source runs as its own producer under its deadline and quota, so a
+    slow source never holds up a fast one. At most source_buffer_batches
+    batches are buffered: when the consumer falls behind, producers wait
+    (backpressure) instead of buffering without limit. Yields (source name, batch).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    # Batches buffered but not yet consumed; end markers need no slot
+    slots = asyncio.Semaphore(settings.source_buffer_batches)
+    done = object()
+
+    async def produce(source: ArticleSource):
+        limits = source.limits
+        stats = _stream_stats.setdefault(
+            source.name,
+            {
+                "runs": 0,
+                "batches": 0,
+                "articles": 0,
+                "deadline_exceeded": 0,
+                "quota_reached": 0,
+                "errors": 0,
+                "last_seconds": 0.0,
+            },
+        )
+        stats["runs"] += 1
+        started = time.monotonic()
+        remaining = int(limits["quota"])
+        try:
+            async with asyncio.timeout(limits["deadline"]):
+                batches = source.stream(topics, config, preferences)
+                try:
+                    async for batch in batches:
+                        batch = batch[:remaining]
+                        if batch:
+                            remaining -= len(batch)
+                            stats["batches"] += 1
+                            stats["articles"] += len(batch)
+                            await slots.acquire()
+                            queue.put_nowait((source.name, batch))
+                        if remaining <= 0:
+                            stats["quota_reached"] += 1
+                            break
+                finally:
+                    if hasattr(batches, "aclose"):
+                        await batches.aclose()
+        except TimeoutError:
+            stats["deadline_exceeded"] += 1
+            print(
+                f"⏱️ Source '{source.name}' hit its {limits['deadline']:.0f}s deadline"
+            )
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"❌ Source '{source.name}' failed: {e}")
+        finally:
+            stats["last_seconds"] = round(time.monotonic() - started, 2)
+            queue.put_nowait((source.name, done))
+
+    producers = [asyncio.create_task(produce(source)) for source in sources]
+    try:
+        pending = len(producers)
+        while pending:
+            name, batch = await queue.get()
+            if batch is done:
+                pending -= 1
+                continue
+            slots.release()
+            yield name, batch
+    finally:
+        for producer in producers:
+            producer.cancel()
+
+
+def get_source_stats() -> Dict[str, Any]:
+    """Per-source stream counters since startup"""
+    return {name: dict(stats) for name, stats in _stream_stats.items()}
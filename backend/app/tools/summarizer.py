@@ -0,0 +1,158 @@
+# File: app/tools/summarizer.py
+"""
+CPU-only extractive summarization of long article bodies (TextRank)
+"""
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import re
+
+import numpy as np
+
+from config import settings
+from models import Article
+from tools.token_budget import estimate_tokens, truncate_to_tokens
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    """a an and are as at be been but by for from has have he her his i in is it
+    its of on or our that the their them they this to was we were which who will
+    with would you your not no can could may might also than then there these
+    those such into about over after before more most other some any all said""".split()
+)
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split prose into sentences on terminal punctuation"""
+    text = " ".join(text.split())
+    return [sentence for sentence in _SENTENCE_SPLIT.split(text) if sentence]
+
+
+def textrank_scores(sentences: List[str]) -> np.ndarray:
+    """PageRank centrality of each sentence on its TF-IDF cosine graph"""
+    count = len(sentences)
+    vocabulary: Dict[str, int] = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word in STOP_WORDS or len(word) < 2:
+                continue
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    if not vocabulary:
+        return np.full(count, 1.0 / count)
+
+    counts = np.zeros((count, len(vocabulary)))
+    np.add.at(counts, (rows, columns), 1.0)
+
+    # Sublinear TF with a smoothed IDF over the sentences of this document
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + count) / (1 + document_frequency)) + 1.0
+    weights = np.log1p(counts) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    weights = np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+
+    similarity = weights @ weights.T
+    np.fill_diagonal(similarity, 0.0)
+    out_degree = similarity.sum(axis=1, keepdims=True)
+    # Sentences without neighbours link uniformly (dangling nodes)
+    transition = np.divide(
+        similarity,
+        out_degree,
+        out=np.full_like(similarity, 1.0 / count),
+        where=out_degree > 0,
+    )
+
+    scores = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+class ExtractiveSummarizer:
+    """Compress text to a token budget by keeping its most central sentences.
+
+    Sentences are ranked with TextRank and taken best-first while they fit,
+    then put back in document order. Text already within budget is returned
+    unchanged. Results are cached (LRU) by content hash and budget.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.summarizer_cache_size
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"summarized": 0, "passthrough": 0, "cache_hits": 0}
+
+    def summarize(self, text: str, target_tokens: Optional[int] = None) -> str:
+        """Extractive summary of text in at most about target_tokens"""
+        target_tokens = target_tokens or settings.content_summary_tokens
+        if not text:
+            return ""
+
+        key = self._key(text, target_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        if estimate_tokens(text) <= target_tokens:
+            self.stats["passthrough"] += 1
+            return text
+
+        summary = self._summarize(text, target_tokens)
+        self.stats["summarized"] += 1
+        self.cache[key] = summary
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return summary
+
+    def summarize_article(
+        self, article: Article, target_tokens: Optional[int] = None
+    ) -> Optional[str]:
+        """Compressed Article.content, or None if the article has no body"""
+        if not article.content:
+            return None
+        return self.summarize(article.content, target_tokens)
+
+    def _summarize(self, text: str, target_tokens: int) -> str:
+        sentences = split_sentences(text)[: settings.summarizer_max_sentences]
+        if len(sentences) <= 1:
+            return truncate_to_tokens(text, target_tokens)
+
+        scores = textrank_scores(sentences)
+        chosen = []
+        used = 0
+        for index in np.argsort(-scores, kind="stable"):
+            tokens = estimate_tokens(sentences[index])
+            if used + tokens <= target_tokens:
+                chosen.append(index)
+                used += tokens
+
+        if not chosen:
+            # Even the best sentence is over budget: shorten it
+            best = sentences[int(np.argmax(scores))]
+            return truncate_to_tokens(best, target_tokens)
+        return " ".join(sentences[index] for index in sorted(chosen))
+
+    @staticmethod
+    def _key(text: str, target_tokens: int) -> str:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return f"{digest}:{target_tokens}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters and current cache size"""
+        return {**self.stats, "cache_entries": len(self.cache)}
+
+
+# Global summarizer instance
+summarizer = ExtractiveSummarizer()
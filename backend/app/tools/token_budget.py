@@ -0,0 +1,169 @@
+# File: app/tools/token_budget.py
+"""
+Local token estimation, prompt packing and per-call token accounting
+"""
+from typing import Dict, Any, List, Callable, Tuple, Optional
+import re
+
+from config import settings
+from models import NewsletterFormat
+
+# Words, numbers and single punctuation marks: roughly the pieces a BPE
+# tokenizer splits English prose into
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+ELLIPSIS = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimated token count without calling a tokenizer.
+
+    Short words are one token and long words about one per four characters,
+    and every punctuation mark counts as one token. For English news text
+    this errs slightly on the high side, which is the safe side for budgets.
+    """
+    if not text:
+        return 1
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        tokens += 1 if len(piece) <= 6 else (len(piece) + 3) // 4
+    return tokens + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Shorten text to about max_tokens, preferring whole sentences.
+
+    Falls back to whole words when not even the first sentence fits, and
+    marks any cut with an ellipsis.
+    """
+    text = " ".join(text.split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+
+    kept = ""
+    for sentence in _SENTENCE_END.split(text):
+        candidate = f"{kept} {sentence}".strip()
+        if estimate_tokens(candidate) > max_tokens - 1:
+            break
+        kept = candidate
+    if kept:
+        return f"{kept} {ELLIPSIS}"
+
+    words = text.split(" ")
+    low, high = 0, len(words)
+    # Binary search for the longest word prefix within budget
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(" ".join(words[:middle])) <= max_tokens - 1:
+            low = middle
+        else:
+            high = middle - 1
+    return f"{' '.join(words[:low])}{ELLIPSIS}" if low else ""
+
+
+def section_token_budget(format_type: NewsletterFormat) -> int:
+    """Prompt tokens available for the articles of one section"""
+    value = getattr(format_type, "value", format_type)
+    return settings.section_token_budgets.get(
+        value, settings.section_token_budgets.get("default", 1200)
+    )
+
+
+def pack_entries(
+    items: List[Any],
+    budget: int,
+    render: Callable[[Any, str], str],
+    text_of: Callable[[Any], str],
+    min_text_tokens: Optional[int] = None,
+    max_text_tokens: Optional[int] = None,
+    separator: str = "\n\n",
+) -> Tuple[str, int]:
+    """Fit as many ranked items as the token budget allows.
+
+    render(item, text) formats one entry around its (possibly shortened)
+    text, and text_of(item) gives the full text, first capped at
+    max_text_tokens so one long item cannot use the whole budget.
+
+    Items are taken in order. The first one that does not fit gets its text
+    truncated to the tokens left, and packing stops there, because
+    lower-ranked items should not push out a better one. An entry whose text would fall below
+    min_text_tokens is dropped.
+
+    Returns (packed text, number of items included).
+    """
+    if min_text_tokens is None:
+        min_text_tokens = settings.prompt_min_summary_tokens
+    separator_cost = estimate_tokens(separator) - 1
+    entries: List[str] = []
+    used = 0
+
+    for item in items:
+        text = text_of(item) or ""
+        if max_text_tokens is not None:
+            text = truncate_to_tokens(text, max_text_tokens)
+        cost = separator_cost if entries else 0
+        entry = render(item, text)
+        entry_tokens = estimate_tokens(entry)
+        if used + cost + entry_tokens <= budget:
+            entries.append(entry)
+            used += cost + entry_tokens
+            continue
+
+        frame_tokens = estimate_tokens(render(item, ""))
+        room = budget - used - cost - frame_tokens
+        if room >= min_text_tokens:
+            shortened = truncate_to_tokens(text, room)
+            if shortened:
+                entries.append(render(item, shortened))
+        break
+
+    return separator.join(entries), len(entries)
+
+
+class TokenUsage:
+    """Prompt and completion tokens per operation, as billed or estimated"""
+
+    def __init__(self):
+        self.operations: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        operation: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool = False,
+    ):
+        totals = self.operations.setdefault(
+            operation,
+            {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "estimated_calls": 0,
+                "max_prompt_tokens": 0,
+            },
+        )
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        totals["max_prompt_tokens"] = max(totals["max_prompt_tokens"], prompt_tokens)
+        if estimated:
+            totals["estimated_calls"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals and per-call averages for each operation"""
+        return {
+            operation: {
+                **totals,
+                "avg_prompt_tokens": round(
+                    totals["prompt_tokens"] / max(totals["calls"], 1), 1
+                ),
+                "avg_completion_tokens": round(
+                    totals["completion_tokens"] / max(totals["calls"], 1), 1
+                ),
+            }
+            for operation, totals in self.operations.items()
+        }
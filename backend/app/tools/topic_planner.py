@@ -0,0 +1,123 @@
+# File: app/tools/topic_planner.py
+"""
+Deterministic search topic planning, per user and across a batch
+"""
+from typing import List, Dict, Any, Tuple
+import hashlib
+import json
+import re
+
+from config import settings
+from models import UserPreferences, NewsletterConfig, NewsletterFormat
+
+DEFAULT_TOPICS = [
+    "AI governance regulations",
+    "responsible AI developments",
+    "AI compliance updates",
+    "AI ethics guidelines",
+    "AI policy updates",
+]
+
+KEYWORD_TEMPLATES = ["{} AI", "{} regulations", "{} developments", "{} news"]
+INDUSTRY_TEMPLATES = [
+    "AI applications in {}",
+    "{} AI compliance",
+    "{} AI developments",
+]
+
+
+def prompt_sources(preferences: UserPreferences) -> List[str]:
+    """The preferred sources a search prompt names, in the user's order"""
+    return list(preferences.preferred_sources[:5])
+
+
+class TopicPlanner:
+    """Build canonical search queries so equal inputs give equal searches"""
+
+    def normalize_query(self, query: str) -> str:
+        """Lowercase, drop stray punctuation, collapse whitespace"""
+        query = re.sub(r"[^\w\s&/-]", " ", query.lower())
+        return " ".join(query.split())
+
+    def plan(self, preferences: UserPreferences, config: NewsletterConfig) -> List[str]:
+        """Ordered, de-duplicated search queries for one newsletter"""
+        keywords = self._canonical_terms(preferences.keywords)
+        industries = self._canonical_terms(preferences.industry_focus)
+
+        topics = []
+        if keywords:
+            # Template-major order so truncation still covers every keyword
+            for template in KEYWORD_TEMPLATES:
+                topics.extend(template.format(keyword) for keyword in keywords)
+        else:
+            topics.extend(DEFAULT_TOPICS)
+
+        for template in INDUSTRY_TEMPLATES:
+            topics.extend(template.format(industry) for industry in industries)
+
+        date_context = self.date_context(config.format)
+        unique_topics = []
+        for topic in topics:
+            query = self.normalize_query(f"{topic} {date_context}")
+            if query not in unique_topics:
+                unique_topics.append(query)
+
+        return unique_topics[: settings.max_search_topics]
+
+    def search_key(
+        self, query: str, config: NewsletterConfig, preferences: UserPreferences
+    ) -> str:
+        """Stable cache key for everything that changes a search's results"""
+        payload = {
+            "query": self.normalize_query(query),
+            "format": config.format.value,
+            "date_range": dict(sorted((config.date_range or {}).items())),
+            "preferred_sources": prompt_sources(preferences),
+        }
+        raw = json.dumps(payload, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def topic_key(self, query: str, preferences: UserPreferences) -> str:
+        """Stable key of a topic across runs, independent of the date window"""
+        payload = {
+            "query": self.normalize_query(query),
+            "preferred_sources": prompt_sources(preferences),
+        }
+        raw = json.dumps(payload, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def plan_batch(
+        self, requests: List[Tuple[UserPreferences, NewsletterConfig]]
+    ) -> Dict[str, Any]:
+        """Merge the searches of many newsletters into one minimal set.
+
+        requests: (preferences, config) per newsletter.
+        Returns {"searches": {search_key: (query, config, preferences)},
+                 "requested": total searches before merging}.
+        """
+        searches: Dict[str, Tuple[str, NewsletterConfig, UserPreferences]] = {}
+        requested = 0
+
+        for preferences, config in requests:
+            for query in self.plan(preferences, config):
+                key = self.search_key(query, config, preferences)
+                searches.setdefault(key, (query, config, preferences))
+                requested += 1
+
+        return {"searches": searches, "requested": requested}
+
+    def date_context(self, format_type: NewsletterFormat) -> str:
+        """Get appropriate date context for search"""
+        if format_type == NewsletterFormat.DAILY:
+            return "today latest"
+        elif format_type == NewsletterFormat.WEEKLY:
+            return "this week latest"
+        elif format_type == NewsletterFormat.MONTHLY:
+            return "this month latest"
+        else:
+            return "recent latest"
+
+    def _canonical_terms(self, terms: List[str]) -> List[str]:
+        return sorted(
+            {self.normalize_query(term) for term in terms if term.strip()} - {""}
+        )
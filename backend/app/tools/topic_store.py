@@ -0,0 +1,133 @@
+# File: app/tools/topic_store.py
+"""
+Incremental topic searches backed by per-topic watermarks
+"""
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from datetime import datetime, timedelta
+
+from config import settings
+from database import db
+from models import Article, NewsletterConfig, UserPreferences
+from tools.perplexity_client import SearchUnavailableError
+
+SearchFunction = Callable[
+    [str, NewsletterConfig, UserPreferences, Optional[datetime]],
+    Awaitable[List[Article]],
+]
+
+
+class TopicStore:
+    """Search each topic only for material newer than what was already seen.
+
+    A watermark per topic records the newest published_at seen, the earliest
+    date the stored articles cover, when the topic was last searched and the
+    URLs already collected. Re-runs inside the refresh interval are answered
+    from the store; later runs ask the source only for newer articles. The
+    search must raise SearchUnavailableError rather than return fallback
+    results, so a failed search never advances a watermark.
+    """
+
+    def __init__(self):
+        self.stats = {
+            "store_hits": 0,
+            "incremental": 0,
+            "full": 0,
+            "fallbacks": 0,
+            "new_articles": 0,
+        }
+
+    async def search(
+        self,
+        topic_key: str,
+        topic: str,
+        config: NewsletterConfig,
+        preferences: UserPreferences,
+        search: SearchFunction,
+    ) -> List[Article]:
+        """Articles for the topic in the config's window, searching only the gap"""
+        window_start = self._window_start(config)
+        now = datetime.utcnow()
+        watermark = await db.get_topic_watermark(topic_key)
+
+        covers_window = bool(
+            watermark
+            and watermark["covered_from"]
+            and (
+                window_start is None
+                or datetime.fromisoformat(watermark["covered_from"]) <= window_start
+            )
+        )
+
+        if covers_window:
+            searched_at = datetime.fromisoformat(watermark["last_searched_at"])
+            if now - searched_at < timedelta(seconds=settings.topic_refresh_interval):
+                self.stats["store_hits"] += 1
+                return await db.get_topic_articles(topic_key, window_start)
+
+        if covers_window and watermark["newest_published_at"]:
+            # Day granularity: re-ask from the newest date, drop seen URLs below
+            since = datetime.fromisoformat(watermark["newest_published_at"])
+            self.stats["incremental"] += 1
+        else:
+            since = window_start
+            self.stats["full"] += 1
+
+        try:
+            found = await search(topic, config, preferences, since)
+        except SearchUnavailableError:
+            # Keep the watermark as is; what is stored is still good
+            stored = await db.get_topic_articles(topic_key, window_start)
+            if not stored:
+                raise
+            self.stats["fallbacks"] += 1
+            # Tagged stale so callers do not cache them as a fresh search
+            return [article.model_copy(update={"stale": True}) for article in stored]
+
+        seen_urls = list(watermark["seen_urls"]) if watermark else []
+        seen = set(seen_urls)
+        new_articles = []
+        for article in found:
+            url = str(article.url)
+            if url not in seen:
+                seen.add(url)
+                seen_urls.append(url)
+                new_articles.append(article)
+
+        published = [a.published_at for a in new_articles if a.published_at]
+        newest = watermark["newest_published_at"] if watermark else None
+        if published:
+            newest_seen = max(published).isoformat()
+            newest = max(newest, newest_seen) if newest else newest_seen
+
+        covered_from = window_start or now
+        if watermark and watermark["covered_from"]:
+            covered_from = min(
+                covered_from, datetime.fromisoformat(watermark["covered_from"])
+            )
+
+        await db.save_topic_search(
+            {
+                "topic_key": topic_key,
+                "topic": topic,
+                "newest_published_at": newest,
+                "covered_from": covered_from.isoformat(),
+                "last_searched_at": now.isoformat(),
+                "seen_urls": seen_urls[-settings.topic_seen_url_limit :],
+            },
+            new_articles,
+        )
+        self.stats["new_articles"] += len(new_articles)
+        return await db.get_topic_articles(topic_key, window_start)
+
+    def _window_start(self, config: NewsletterConfig) -> Optional[datetime]:
+        if config.date_range and config.date_range.get("start"):
+            return datetime.strptime(config.date_range["start"], "%Y-%m-%d")
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store hits versus incremental and full searches"""
+        return dict(self.stats)
+
+
+# Process-wide store shared by every workflow
+topic_store = TopicStore()
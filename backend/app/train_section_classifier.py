@@ -0,0 +1,46 @@
+# File: app/train_section_classifier.py
+"""
+Train the local section classifier from stored LLM section assignments
+
+Usage: python train_section_classifier.py
+"""
+import asyncio
+import random
+
+from config import settings
+from database import db
+from tools.section_classifier import SectionClassifier, training_rows
+
+
+async def train_section_classifier():
+    """Fit, evaluate and save the section classifier"""
+    print("🧪 Training section classifier from stored analyses...")
+
+    await db.initialize()
+    texts, labels = training_rows(await db.get_section_choices())
+    if len(texts) < 50:
+        print(f"❌ Only {len(texts)} labelled analyses found, need at least 50")
+        return False
+
+    rows = list(zip(texts, labels))
+    random.Random(0).shuffle(rows)
+    split = int(len(rows) * 0.8)
+    train, holdout = rows[:split], rows[split:]
+
+    classifier = SectionClassifier()
+    classifier.fit([t for t, _ in train], [l for _, l in train])
+
+    report = classifier.evaluate([t for t, _ in holdout], [l for _, l in holdout])
+    print(f"📊 Held-out evaluation: {report}")
+
+    # Refit on everything before saving
+    classifier.fit(texts, labels)
+    classifier.save(settings.section_classifier_path)
+    print(
+        f"✅ Saved classifier ({len(classifier.classes)} sections, {len(texts)} samples) to {settings.section_classifier_path}"
+    )
+    return True
+
+
+if __name__ == "__main__":
+    asyncio.run(train_section_classifier())
@@ -15,6 +15,19 @@ class ConfigValidator:
         "Forward Intelligence",
     ]
 
+    # Default sections per format, as used by the generate endpoints
+    FORMAT_SECTIONS = {
+        NewsletterFormat.DAILY: ["Today's Highlights", "Urgent Updates"],
+        NewsletterFormat.WEEKLY: [
+            "Weekly Highlights",
+            "Compliance Updates",
+            "Tech Developments",
+            "Industry News",
+        ],
+        NewsletterFormat.MONTHLY: DEFAULT_SECTIONS,
+        NewsletterFormat.CUSTOM: DEFAULT_SECTIONS,
+    }
+
     VALID_SECTIONS = [
         "Executive Highlights",
         "Technical Breakthroughs",
@@ -28,6 +41,12 @@ class ConfigValidator:
         "Weekly Highlights",
         "Daily Updates",
         "Urgent Alerts",
+        # Default daily and weekly sections
+        "Today's Highlights",
+        "Urgent Updates",
+        "Compliance Updates",
+        "Tech Developments",
+        "Industry News",
     ]
 
     @classmethod
@@ -0,0 +1,66 @@
+# File: app/utils/export_cache.py
+"""
+Content-addressed cache of exported newsletter files
+"""
+from typing import Dict, Any, Optional
+import gzip
+import hashlib
+import os
+import uuid
+
+from config import settings
+
+
+class ExportCache:
+    """Export files stored under the SHA-256 of their bytes.
+
+    The same export is written (and gzip-compressed) once, however often it
+    is requested; the digest doubles as a strong ETag. A gzip variant is
+    kept next to every file of at least export_gzip_min_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or settings.export_dir
+        self.stats = {"stored": 0, "hits": 0, "bytes": 0, "gzip_bytes": 0}
+
+    def store(self, body: str, extension: str) -> Dict[str, Any]:
+        """Path, gzip path (or None) and ETag of a file holding body"""
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.cache_dir, digest[:2], f"{digest}.{extension}")
+        gzip_path = (
+            f"{path}.gz" if len(data) >= settings.export_gzip_min_bytes else None
+        )
+
+        if os.path.exists(path) and (gzip_path is None or os.path.exists(gzip_path)):
+            self.stats["hits"] += 1
+        else:
+            self._write(path, data)
+            self.stats["stored"] += 1
+            self.stats["bytes"] += len(data)
+            if gzip_path:
+                # mtime=0 keeps the compressed bytes identical across writes
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                self._write(gzip_path, compressed)
+                self.stats["gzip_bytes"] += len(compressed)
+
+        return {
+            "digest": digest,
+            "etag": f'"{digest}"',
+            "path": path,
+            "gzip_path": gzip_path,
+        }
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file; concurrent
+        # writers of the same export each use their own temporary file
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write, hit and size counters"""
+        return dict(self.stats)
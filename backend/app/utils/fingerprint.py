@@ -0,0 +1,85 @@
+# File: app/utils/fingerprint.py
+"""
+Canonical fingerprints of user preferences and newsletter configs
+"""
+from typing import List, Dict, Any
+import hashlib
+import json
+
+from models import UserPreferences, NewsletterConfig, NewsletterFormat
+
+
+def _normalize_terms(terms: List[str]) -> List[str]:
+    """Case-, whitespace-, order- and duplicate-insensitive term list"""
+    return sorted({" ".join(term.lower().split()) for term in terms if term.strip()})
+
+
+def _normalize_sources(sources: List[str]) -> List[str]:
+    """Order- and duplicate-insensitive source list.
+
+    Case and spacing are kept: sources are matched exactly against
+    article.source, so "Reuters" and "reuters" rank articles differently.
+    """
+    return sorted(set(sources))
+
+
+def canonical_preferences(preferences: UserPreferences) -> Dict[str, Any]:
+    """Everything in the preferences that can change a newsletter"""
+    return {
+        "keywords": _normalize_terms(preferences.keywords),
+        "preferred_sources": _normalize_sources(preferences.preferred_sources),
+        "excluded_sources": _normalize_sources(preferences.excluded_sources),
+        "industry_focus": _normalize_terms(preferences.industry_focus),
+        "content_types": _normalize_terms(preferences.content_types),
+        "urgency_threshold": preferences.urgency_threshold,
+        "relevance_threshold": round(preferences.relevance_threshold, 2),
+    }
+
+
+def canonical_config(config: NewsletterConfig) -> Dict[str, Any]:
+    """Everything in the config that can change a newsletter"""
+    return {
+        "format": config.format.value,
+        "date_range": dict(sorted((config.date_range or {}).items())),
+        # Section order is kept: it is the order of the rendered newsletter
+        "sections": [" ".join(section.split()) for section in config.sections],
+        "max_articles": config.max_articles,
+        "template": config.template.value,
+        "include_links": config.include_links,
+        "include_summary": config.include_summary,
+    }
+
+
+def _digest(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cohort_key(preferences: UserPreferences, config: NewsletterConfig) -> str:
+    """Users with the same key receive an identical newsletter"""
+    return _digest(
+        {
+            "preferences": canonical_preferences(preferences),
+            "config": canonical_config(config),
+        }
+    )
+
+
+def newsletter_fingerprint(
+    preferences: UserPreferences, config: NewsletterConfig
+) -> str:
+    """Identify "the same newsletter again" for one user.
+
+    Rolling formats (daily/weekly/monthly) ignore the date window so a
+    recent issue can stand in for the next one; custom ranges keep it.
+    """
+    config_payload = canonical_config(config)
+    if config.format != NewsletterFormat.CUSTOM:
+        config_payload.pop("date_range")
+    return _digest(
+        {
+            "user_id": preferences.user_id,
+            "preferences": canonical_preferences(preferences),
+            "config": config_payload,
+        }
+    )
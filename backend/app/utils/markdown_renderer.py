@@ -0,0 +1,80 @@
+# File: app/utils/markdown_renderer.py
+"""
+Markdown to HTML rendering for newsletter exports, cached by content
+"""
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import hashlib
+
+from config import settings
+from utils.newsletter_document import html_blocks
+
+
+def markdown_to_html(markdown: str) -> str:
+    """HTML of a markdown document, equal to its document tree's to_html()"""
+    return "\n".join(html_blocks(markdown))
+
+
+class MarkdownRenderer:
+    """Markdown to HTML with rendered documents cached by content hash.
+
+    Exports and re-downloads of the same edition render it once; the cache
+    is an LRU of markdown_cache_size documents.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.markdown_cache_size
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"rendered": 0, "cache_hits": 0}
+
+    def render(self, markdown: str) -> str:
+        """HTML of a whole markdown document"""
+        key = hashlib.sha1(markdown.encode("utf-8")).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        rendered = markdown_to_html(markdown)
+        self.stats["rendered"] += 1
+        self.cache[key] = rendered
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return rendered
+
+    def render_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """HTML of markdown arriving in pieces, block by block (not cached).
+
+        Joined, the output equals render() of the joined input.
+        """
+        pending: List[str] = []
+        last, separator = "", ""  # last: final character of the pending text
+        for chunk in chunks:
+            if not chunk:
+                continue
+            # Only the new chunk (and the character before it) can complete a
+            # blank line; earlier text was already searched
+            found = (last + chunk).rfind("\n\n")
+            if found < 0:
+                pending.append(chunk)
+                last = chunk[-1]
+                continue
+            text = "".join(pending) + chunk
+            cut = len(text) - len(chunk) - len(last) + found
+            ready, rest = text[:cut], text[cut + 2 :]
+            pending, last = ([rest], rest[-1]) if rest else ([], "")
+            for block in html_blocks(ready):
+                yield separator + block
+                separator = "\n"
+        for block in html_blocks("".join(pending)):
+            yield separator + block
+            separator = "\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Render and cache counters"""
+        return {**self.stats, "cache_entries": len(self.cache)}
+
+
+# Global markdown renderer instance
+markdown_renderer = MarkdownRenderer()
@@ -0,0 +1,643 @@
+# File: app/utils/newsletter_document.py
+"""
+Newsletter document model, parsed once and rendered to several formats
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import html
+import json
+import re
+
+# Formats rendered from the tree; the markdown source is stored as it is
+RENDITION_FORMATS = ("html", "text", "json")
+
+# Closing #s are stripped from the text by hand: a lazy (.*?)\s*#*$ backtracks
+_HEADING = re.compile(r"(#{1,6})\s+(.*)")
+_RULE = re.compile(r"(?:-{3,}|\*{3,}|_{3,})$")
+_BULLET = re.compile(r"\s*[-*•]\s+(.*)")
+_NUMBERED = re.compile(r"\s*(\d{1,9})[.)]\s+(.*)")
+# First characters of lines that may be something other than paragraph text
+# ("&" for quotes in escaped markdown, where ">" is "&gt;")
+_BLOCK_STARTS = frozenset("#-*_•>&0123456789")
+_INLINE = re.compile(
+    r"`(?P<code>[^`\n]+)`"
+    r"|\[(?P<label>[^\]\n]+)\]\((?P<href>(?:https?:|mailto:|#|/)[^)\s\"]*)\)"
+    r"|\*\*(?P<strong>[^\s*](?:[^\n]*?[^\s*])??)\*\*"
+    r"|\*(?<![*\w]\*)(?P<em>[^\s*](?:[^*\n]*[^\s*])?)\*(?![*\w])",
+    re.IGNORECASE,
+)
+
+
+def _escape(text: str) -> str:
+    return html.escape(text, quote=False)
+
+
+class Inline(ABC):
+    """A run of text inside a block"""
+
+    @abstractmethod
+    def markdown(self) -> str:
+        pass
+
+    @abstractmethod
+    def html(self) -> str:
+        pass
+
+    @abstractmethod
+    def text(self) -> str:
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        pass
+
+
+class Text(Inline):
+    def __init__(self, value: str):
+        self.value = value
+
+    def markdown(self) -> str:
+        return self.value
+
+    def html(self) -> str:
+        return _escape(self.value)
+
+    def text(self) -> str:
+        return self.value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "text", "text": self.value}
+
+
+class LineBreak(Inline):
+    def markdown(self) -> str:
+        return "  \n"
+
+    def html(self) -> str:
+        return "<br>\n"
+
+    def text(self) -> str:
+        return "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "break"}
+
+
+class Code(Inline):
+    def __init__(self, value: str):
+        self.value = value
+
+    def markdown(self) -> str:
+        return f"`{self.value}`"
+
+    def html(self) -> str:
+        return f"<code>{_escape(self.value)}</code>"
+
+    def text(self) -> str:
+        return self.value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "code", "text": self.value}
+
+
+class Span(Inline):
+    """Inline markup wrapping other inlines"""
+
+    kind = "span"
+    marker = ""
+    tag = "span"
+
+    def __init__(self, children: List[Inline]):
+        self.children = children
+
+    def markdown(self) -> str:
+        return self.marker + _markdown(self.children) + self.marker
+
+    def html(self) -> str:
+        return f"<{self.tag}>{_html(self.children)}</{self.tag}>"
+
+    def text(self) -> str:
+        return _text(self.children)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.kind, "children": [c.to_dict() for c in self.children]}
+
+
+class Strong(Span):
+    kind, marker, tag = "strong", "**", "strong"
+
+
+class Emphasis(Span):
+    kind, marker, tag = "emphasis", "*", "em"
+
+
+class Link(Span):
+    kind = "link"
+
+    def __init__(self, children: List[Inline], href: str):
+        super().__init__(children)
+        self.href = href
+
+    def markdown(self) -> str:
+        return f"[{_markdown(self.children)}]({self.href})"
+
+    def html(self) -> str:
+        return f'<a href="{_escape(self.href)}">{_html(self.children)}</a>'
+
+    def text(self) -> str:
+        label = _text(self.children)
+        # In-page anchors mean nothing outside the document
+        return label if self.href.startswith("#") else f"{label} ({self.href})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "href": self.href}
+
+
+# One join per output format: these run for every block of every rendition
+def _markdown(inlines: List[Inline]) -> str:
+    return "".join([inline.markdown() for inline in inlines])
+
+
+def _html(inlines: List[Inline]) -> str:
+    return "".join([inline.html() for inline in inlines])
+
+
+def _text(inlines: List[Inline]) -> str:
+    return "".join([inline.text() for inline in inlines])
+
+
+def parse_inline(text: str) -> List[Inline]:
+    """Inline nodes of markdown text; no construct spans lines"""
+    if "*" not in text and "`" not in text and "](" not in text:
+        return [Text(text)] if text else []
+    nodes: List[Inline] = []
+    position = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            nodes.append(Text(text[position : match.start()]))
+        kind = match.lastgroup
+        if kind == "code":
+            nodes.append(Code(match.group("code")))
+        elif kind == "href":
+            nodes.append(Link(parse_inline(match.group("label")), match.group("href")))
+        elif kind == "strong":
+            nodes.append(Strong(parse_inline(match.group("strong"))))
+        else:
+            nodes.append(Emphasis(parse_inline(match.group("em"))))
+        position = match.end()
+    if position < len(text):
+        nodes.append(Text(text[position:]))
+    return nodes
+
+
+def _parse_lines(lines: List[str]) -> List[Inline]:
+    """Inline nodes of the lines of a paragraph or quote"""
+    text = "\n".join(lines).rstrip()
+    if "  \n" not in text:
+        return parse_inline(text)
+    # Two trailing spaces are a hard line break
+    children: List[Inline] = []
+    for i, part in enumerate(text.split("  \n")):
+        if i:
+            children.append(LineBreak())
+        children.extend(parse_inline(part.rstrip(" ")))
+    return children
+
+
+class Block(ABC):
+    """A top-level element of the document"""
+
+    @abstractmethod
+    def markdown(self) -> str:
+        pass
+
+    @abstractmethod
+    def html(self) -> str:
+        pass
+
+    @abstractmethod
+    def text(self) -> str:
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        pass
+
+
+class Heading(Block):
+    def __init__(self, level: int, children: List[Inline]):
+        self.level = level
+        self.children = children
+
+    @property
+    def anchor(self) -> str:
+        """Id the table of contents links to"""
+        return html.escape(_text(self.children).lower().replace(" ", "-"))
+
+    def markdown(self) -> str:
+        return "#" * self.level + " " + _markdown(self.children)
+
+    def html(self) -> str:
+        tag = f"h{self.level}"
+        return f'<{tag} id="{self.anchor}">{_html(self.children)}</{tag}>'
+
+    def text(self) -> str:
+        title = _text(self.children)
+        if self.level > 2:
+            return title
+        return title + "\n" + ("=" if self.level == 1 else "-") * len(title)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "heading",
+            "level": self.level,
+            "id": self.anchor,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+
+class Paragraph(Block):
+    kind = "paragraph"
+
+    def __init__(self, children: List[Inline]):
+        self.children = children
+
+    def markdown(self) -> str:
+        return _markdown(self.children)
+
+    def html(self) -> str:
+        return f"<p>{_html(self.children)}</p>"
+
+    def text(self) -> str:
+        return _text(self.children)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.kind, "children": [c.to_dict() for c in self.children]}
+
+
+class Quote(Paragraph):
+    kind = "quote"
+
+    def markdown(self) -> str:
+        return "> " + _markdown(self.children).replace("\n", "\n> ")
+
+    def html(self) -> str:
+        return f"<blockquote>{super().html()}</blockquote>"
+
+    def text(self) -> str:
+        return "> " + _text(self.children).replace("\n", "\n> ")
+
+
+class ListBlock(Block):
+    def __init__(
+        self,
+        ordered: bool,
+        start: int = 1,
+        items: Optional[List[List[Inline]]] = None,
+    ):
+        self.ordered = ordered
+        self.start = start
+        self.items: List[List[Inline]] = items or []
+
+    def _markers(self) -> List[str]:
+        if not self.ordered:
+            return ["- "] * len(self.items)
+        return [f"{self.start + i}. " for i in range(len(self.items))]
+
+    def markdown(self) -> str:
+        return "\n".join(
+            marker + _markdown(item)
+            for marker, item in zip(self._markers(), self.items)
+        )
+
+    def html(self) -> str:
+        tag = "ol" if self.ordered else "ul"
+        items = "</li><li>".join([_html(item) for item in self.items])
+        start = f' start="{self.start}"' if self.ordered and self.start != 1 else ""
+        return f"<{tag}{start}><li>{items}</li></{tag}>"
+
+    def text(self) -> str:
+        return "\n".join(
+            marker + _text(item) for marker, item in zip(self._markers(), self.items)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "list",
+            "ordered": self.ordered,
+            "start": self.start,
+            "items": [[c.to_dict() for c in item] for item in self.items],
+        }
+
+
+class Rule(Block):
+    def markdown(self) -> str:
+        return "---"
+
+    def html(self) -> str:
+        return "<hr>"
+
+    def text(self) -> str:
+        return "* * *"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "rule"}
+
+
+def _scan(lines: Iterable[str], quote: str = ">") -> Iterator[tuple]:
+    """Blocks of markdown as (kind, body, number), in one pass over its lines.
+
+    kind is "h" (body: heading text, number: level), "hr", or "p", "quote",
+    "ul", "ol" (body: raw lines or items, number: list start). Understands
+    the subset the newsletter prompts and templates produce: ATX headings,
+    horizontal rules, bullet and numbered lists, block quotes and
+    paragraphs. A blank line ends any open block, so markdown can be
+    scanned in paragraph-sized pieces with the same result. quote is the
+    block quote marker: "&gt;" when scanning escaped markdown.
+    """
+    kind: Optional[str] = None  # "p", "quote", "ul" or "ol"
+    buffer: List[str] = []
+    start = 1
+
+    for line in lines:
+        first = line[:1]
+        if first not in _BLOCK_STARTS and not first.isspace():
+            # Plain paragraph text (or a blank line), the bulk of an edition
+            if first:
+                if kind != "p":
+                    if kind:
+                        yield kind, buffer, start
+                    kind, buffer = "p", []
+                buffer.append(line)
+            elif kind:
+                yield kind, buffer, start
+                kind = None
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            if kind:
+                yield kind, buffer, start
+                kind = None
+            continue
+
+        first, number = stripped[0], 1
+        if first == "#" and (match := _HEADING.match(stripped)):
+            if kind:
+                yield kind, buffer, start
+                kind = None
+            yield "h", match.group(2).rstrip("#").rstrip(), len(match.group(1))
+            continue
+        if first in "-*_" and _RULE.match(stripped):
+            if kind:
+                yield kind, buffer, start
+                kind = None
+            yield "hr", None, 0
+            continue
+
+        if first in "-*•" and (match := _BULLET.match(line)):
+            new_kind, text = "ul", match.group(1).rstrip()
+        elif first.isdigit() and (match := _NUMBERED.match(line)):
+            new_kind, text, number = "ol", match.group(2).rstrip(), int(match.group(1))
+        elif stripped.startswith(quote):
+            new_kind, text = "quote", stripped[len(quote) :].lstrip()
+        elif (kind == "ul" or kind == "ol") and line[0].isspace():
+            # Indented continuation of the last list item
+            buffer[-1] += " " + stripped
+            continue
+        else:
+            new_kind, text = "p", line
+
+        if new_kind != kind:
+            if kind:
+                yield kind, buffer, start
+            kind, buffer, start = new_kind, [], number
+        buffer.append(text)
+
+    if kind:
+        yield kind, buffer, start
+
+
+def parse_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """Block nodes of markdown, produced in one pass over its lines"""
+    for kind, body, number in _scan(lines):
+        if kind == "h":
+            yield Heading(number, parse_inline(body))
+        elif kind == "hr":
+            yield Rule()
+        elif kind == "p":
+            yield Paragraph(_parse_lines(body))
+        elif kind == "quote":
+            yield Quote(_parse_lines(body))
+        else:
+            yield ListBlock(kind == "ol", number, [parse_inline(item) for item in body])
+
+
+# Direct HTML: the same output as the block tree, without building nodes.
+# The markdown is escaped once and its inline markup converted in one pass
+# over the whole document: escaping only rewrites &, < and >, which no
+# pattern looks for, and no inline construct spans lines or touches the
+# line prefixes the block scanner reads.
+_TAG = re.compile(r"<[^>\n]*>")
+_LINK_HTML = re.compile(r'<a href="([^"]*)">(.*?)</a>')
+
+
+def _escaped_html(text: str) -> str:
+    """HTML of escaped inline markdown"""
+    if "*" not in text and "`" not in text and "](" not in text:
+        return text
+    # split() hands back every group of every match without a Python
+    # callback per match: text, then (code, label, href, strong, em, text)*
+    parts = _INLINE.split(text)
+    html = [parts[0]]
+    rest = iter(parts[1:])
+    for code, label, href, strong, em, after in zip(rest, rest, rest, rest, rest, rest):
+        if code is not None:
+            html.append("<code>" + code + "</code>")
+        elif strong is not None:
+            html.append("<strong>" + _escaped_html(strong) + "</strong>")
+        elif em is not None:
+            html.append("<em>" + _escaped_html(em) + "</em>")
+        else:
+            html.append('<a href="' + href + '">' + _escaped_html(label) + "</a>")
+        html.append(after)
+    return "".join(html)
+
+
+def _link_text(match: "re.Match[str]") -> str:
+    href, label = match.group(1), match.group(2)
+    return label if href.startswith("#") else f"{label} ({href})"
+
+
+def _as_is(text: str) -> str:
+    return text
+
+
+def _paragraph_html(text: str, inline=_as_is) -> str:
+    text = text.rstrip()
+    if "  \n" not in text:
+        return inline(text)
+    return "<br>\n".join([inline(part.rstrip(" ")) for part in text.split("  \n")])
+
+
+def _anchors(headings: List[str]) -> List[str]:
+    """Heading.anchor of each heading's converted HTML, in one pass"""
+    text = "\n".join(headings)
+    if "<" in text:
+        if "<a " in text:
+            text = _LINK_HTML.sub(_link_text, text)
+        text = _TAG.sub("", text)
+    # Escaped like html.escape() with quotes
+    text = text.lower().replace(" ", "-").replace('"', "&quot;")
+    return text.replace("'", "&#x27;").split("\n")
+
+
+def _block_html(kind: str, body: Any, number: int, inline=_as_is) -> str:
+    """HTML of a scanned block other than a heading; inline converts its
+    text if that is not done yet"""
+    if kind == "p":
+        return "<p>" + _paragraph_html("\n".join(body), inline) + "</p>"
+    if kind == "hr":
+        return "<hr>"
+    if kind == "quote":
+        quote = _paragraph_html("\n".join(body), inline)
+        return f"<blockquote><p>{quote}</p></blockquote>"
+    tag = "ol" if kind == "ol" else "ul"
+    items = "</li><li>".join([inline(item) for item in body])
+    start = f' start="{number}"' if kind == "ol" and number != 1 else ""
+    return f"<{tag}{start}><li>{items}</li></{tag}>"
+
+
+# A line inside a blank-line separated chunk that may start a non-paragraph
+_CHUNK_BLOCK_LINE = re.compile(r"\n[#\-*_•&\d\s]")
+# An indented line: a list item continuation joins it to the item's text
+_CHUNK_INDENT = re.compile(r"(?:^|\n)\s")
+_BULLET_ITEM = re.compile(r"^[-*•][^\S\n]+(.*)$", re.MULTILINE)
+_NUMBERED_ITEM = re.compile(r"^([0-9]{1,9})[.)][^\S\n]+(.*)$", re.MULTILINE)
+
+
+def _list_html(chunk: str) -> Optional[str]:
+    """HTML of a chunk that is one plain bullet or numbered list, else None"""
+    first = chunk[:1]
+    if first in "-*•":
+        items = _BULLET_ITEM.findall(chunk)
+        if len(items) == chunk.count("\n") + 1:
+            items = [item.rstrip() for item in items]
+            return "<ul><li>" + "</li><li>".join(items) + "</li></ul>"
+    elif first in "0123456789":
+        numbered = _NUMBERED_ITEM.findall(chunk)
+        if len(numbered) == chunk.count("\n") + 1:
+            items = "</li><li>".join([item.rstrip() for _, item in numbered])
+            start = int(numbered[0][0])
+            start_attribute = f' start="{start}"' if start != 1 else ""
+            return f"<ol{start_attribute}><li>{items}</li></ol>"
+    return None
+
+
+def html_blocks(markdown: str) -> List[str]:
+    """HTML of each block of markdown, equal to parse_blocks() rendered.
+
+    Chunks between blank lines that are a paragraph, a heading, a rule or a
+    plain list, optionally led by paragraph lines (most of an edition),
+    skip the line scanner entirely. Heading anchors are computed together
+    at the end.
+    """
+    escaped = _escape(markdown)
+    chunks = _escaped_html(escaped).split("\n\n")
+    sources = None
+    blocks: List[str] = []
+    headings: List[tuple] = []  # (position in blocks, level, HTML)
+    for i, chunk in enumerate(chunks):
+        first = chunk[:1]
+        if not first:
+            continue
+        if first not in _BLOCK_STARTS and not first.isspace():
+            block_line = "\n" in chunk and _CHUNK_BLOCK_LINE.search(chunk)
+            if not block_line:
+                text = chunk.rstrip()
+                if "  \n" in text:
+                    text = _paragraph_html(text)
+                blocks.append("<p>" + text + "</p>")
+                continue
+            listed = _list_html(chunk[block_line.start() + 1 :])
+            if listed:
+                lead = _paragraph_html(chunk[: block_line.start()])
+                blocks.append("<p>" + lead + "</p>")
+                blocks.append(listed)
+                continue
+        elif "\n" not in chunk and first in "#-*_":
+            stripped = chunk.rstrip()
+            if first == "#" and (match := _HEADING.match(stripped)):
+                text = match.group(2)
+                if text[-1:] == "#":
+                    text = text.rstrip("#").rstrip()
+                headings.append((len(blocks), match.end(1), text))
+                blocks.append("")
+                continue
+            if first != "#" and _RULE.match(stripped):
+                blocks.append("<hr>")
+                continue
+        listed = _list_html(chunk)
+        if listed:
+            blocks.append(listed)
+            continue
+
+        lines, inline = chunk.split("\n"), _as_is
+        if _CHUNK_INDENT.search(chunk):
+            # Continuations join lines, so convert inline markup after joining
+            if sources is None:
+                sources = escaped.split("\n\n")
+            lines, inline = sources[i].split("\n"), _escaped_html
+        for kind, body, number in _scan(lines, "&gt;"):
+            if kind == "h":
+                headings.append((len(blocks), number, inline(body)))
+                blocks.append("")
+            else:
+                blocks.append(_block_html(kind, body, number, inline))
+
+    if headings:
+        anchors = _anchors([text for _, _, text in headings])
+        for (position, level, text), anchor in zip(headings, anchors):
+            blocks[position] = f'<h{level} id="{anchor}">{text}</h{level}>'
+    return blocks
+
+
+class NewsletterDocument:
+    """Block tree of a newsletter.
+
+    Built once from the compiled markdown; every output format is one walk
+    over the blocks, so HTML, plain text and JSON never re-parse markdown.
+    to_markdown() normalizes (nesting and lazy quote lines are not kept),
+    so the source markdown stays the newsletter content.
+    """
+
+    def __init__(self, blocks: Optional[List[Block]] = None):
+        self.blocks: List[Block] = blocks or []
+
+    @classmethod
+    def from_markdown(cls, markdown: str) -> "NewsletterDocument":
+        """Parse markdown in one pass over its lines"""
+        return cls(list(parse_blocks(markdown.split("\n"))))
+
+    def to_markdown(self) -> str:
+        return "\n\n".join(block.markdown() for block in self.blocks) + "\n"
+
+    def to_html(self) -> str:
+        return "\n".join([block.html() for block in self.blocks])
+
+    def to_text(self) -> str:
+        return "\n\n".join(block.text() for block in self.blocks) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"blocks": [block.to_dict() for block in self.blocks]}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def render_all(self) -> Dict[str, str]:
+        """Every rendition, keyed by RENDITION_FORMATS"""
+        return {
+            "html": self.to_html(),
+            "text": self.to_text(),
+            "json": self.to_json(),
+        }
@@ -2,44 +2,74 @@
 Newsletter export utilities
 """
 
-import os
-from datetime import datetime
-from typing import Dict, Any
-import re
+from typing import Dict, Any, Iterable, Iterator, Optional
 
 from models import Newsletter
+from utils.export_cache import ExportCache
+from utils.markdown_renderer import markdown_renderer
+from utils.newsletter_document import NewsletterDocument
+
+
+EXPORT_EXTENSIONS = {"markdown": "md", "html": "html", "text": "txt", "json": "json"}
 
 
 class NewsletterExporter:
     """Export newsletters to various formats"""
 
-    def __init__(self, export_dir: str = "exports"):
-        self.export_dir = export_dir
-        os.makedirs(export_dir, exist_ok=True)
+    def __init__(self, export_dir: Optional[str] = None):
+        self.cache = ExportCache(export_dir)
+        self.export_dir = self.cache.cache_dir
 
     def export_to_markdown(self, newsletter: Newsletter) -> str:
         """Export newsletter to markdown file"""
-        # Clean filename
-        safe_title = re.sub(r"[^\w\s-]", "", newsletter.title).strip()
-        safe_title = re.sub(r"[-\s]+", "-", safe_title)
-
-        filename = f"{safe_title}-{newsletter.generated_at.strftime('%Y-%m-%d')}.md"
-        filepath = os.path.join(self.export_dir, filename)
-
-        # Write to file
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(newsletter.content)
-
+        filepath = self.export(newsletter, "markdown")["path"]
         print(f"✅ Newsletter exported to: {filepath}")
         return filepath
 
     def export_to_html(self, newsletter: Newsletter) -> str:
         """Export newsletter to HTML file with proper formatting"""
-        # Convert markdown to HTML (basic conversion)
-        html_content = self._markdown_to_html(newsletter.content)
+        filepath = self.export(newsletter, "html")["path"]
+        print(f"✅ HTML newsletter exported to: {filepath}")
+        return filepath
 
-        # Wrap in HTML template
-        html_template = f"""<!DOCTYPE html>
+    def export(self, newsletter: Newsletter, format: str) -> Dict[str, Any]:
+        """Store an export in the content-addressed cache (see ExportCache.store)"""
+        return self.cache.store(
+            self.render(newsletter, format), EXPORT_EXTENSIONS[format]
+        )
+
+    def render(self, newsletter: Newsletter, format: str) -> str:
+        """Complete export document: markdown, html (a page), text or json"""
+        if format == "html":
+            return "".join(self.html_chunks(newsletter))
+        if format == "markdown":
+            return newsletter.content
+        if format in newsletter.renditions:
+            return newsletter.renditions[format]
+        # Saved before renditions were stored
+        document = NewsletterDocument.from_markdown(newsletter.content)
+        return document.to_text() if format == "text" else document.to_json()
+
+    def html_chunks(
+        self, newsletter: Newsletter, markdown_chunks: Optional[Iterable[str]] = None
+    ) -> Iterator[str]:
+        """HTML page of a newsletter, produced piece by piece.
+
+        markdown_chunks (default: the stored HTML rendition, or the content)
+        are converted block by block as they arrive, so a streamed render can
+        be passed straight through.
+        """
+        yield self._html_head(newsletter)
+        if markdown_chunks is None:
+            yield newsletter.renditions.get("html") or self._markdown_to_html(
+                newsletter.content
+            )
+        else:
+            yield from markdown_renderer.render_stream(markdown_chunks)
+        yield self._html_tail(newsletter)
+
+    def _html_head(self, newsletter: Newsletter) -> str:
+        return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -118,62 +148,17 @@ class NewsletterExporter:
         🎨 Template: {newsletter.config.template.value.title()}
     </div>
     
-    {html_content}
+    """
+
+    def _html_tail(self, newsletter: Newsletter) -> str:
+        return f"""
     
     <div class="footer">
-        <p>Generated by AI Watchtower • {datetime.utcnow().year}</p>
+        <p>Generated by AI Watchtower • {newsletter.generated_at.year}</p>
     </div>
 </body>
 </html>"""
 
-        # Save HTML file
-        safe_title = re.sub(r"[^\w\s-]", "", newsletter.title).strip()
-        safe_title = re.sub(r"[-\s]+", "-", safe_title)
-        filename = f"{safe_title}-{newsletter.generated_at.strftime('%Y-%m-%d')}.html"
-        filepath = os.path.join(self.export_dir, filename)
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(html_template)
-
-        print(f"✅ HTML newsletter exported to: {filepath}")
-        return filepath
-
     def _markdown_to_html(self, markdown_content: str) -> str:
-        """Basic markdown to HTML conversion"""
-        html = markdown_content
-
-        # Convert headers
-        html = re.sub(r"^# (.*$)", r"<h1>\1</h1>", html, flags=re.MULTILINE)
-        html = re.sub(r"^## (.*$)", r"<h2>\1</h2>", html, flags=re.MULTILINE)
-        html = re.sub(r"^### (.*$)", r"<h3>\1</h3>", html, flags=re.MULTILINE)
-
-        # Convert links
-        html = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r'<a href="\2">\1</a>', html)
-
-        # Convert bold
-        html = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", html)
-
-        # Convert paragraphs
-        paragraphs = html.split("\n\n")
-        html_paragraphs = []
-
-        for para in paragraphs:
-            para = para.strip()
-            if para and not para.startswith("<h") and not para.startswith("---"):
-                if para.startswith("•") or para.startswith("-"):
-                    # Convert bullet points
-                    items = para.split("\n")
-                    ul_content = "".join(
-                        [
-                            f'<li>{item.lstrip("•- ").strip()}</li>'
-                            for item in items
-                            if item.strip()
-                        ]
-                    )
-                    html_paragraphs.append(f"<ul>{ul_content}</ul>")
-                else:
-                    html_paragraphs.append(f"<p>{para}</p>")
-            else:
-                html_paragraphs.append(para)
-
-        return "\n".join(html_paragraphs)
+        """Markdown to HTML conversion, cached by content"""
+        return markdown_renderer.render(markdown_content)